@@ -0,0 +1,12 @@
+-- Namespace models per league: with --vars '{league_prefix: cfb_}' every model is built as
+-- cfb_<model> (cfb_mart_venue_attendance_patterns) and the ESPN staging models read the
+-- cfb_ source tables. Without the var (NFL) names are unchanged. Seeds are shared.
+
+{% macro generate_alias_name(custom_alias_name=none, node=none) -%}
+    {%- set alias = custom_alias_name if custom_alias_name is not none else node.name -%}
+    {%- if node.resource_type == 'model' -%}
+        {{ var('league_prefix', '') ~ alias | trim }}
+    {%- else -%}
+        {{ alias | trim }}
+    {%- endif -%}
+{%- endmacro %}
@@ -6,40 +6,35 @@ WITH performance AS (
     SELECT * FROM {{ ref('int_team_season_performance') }}
 ),
 
+features AS (
+    SELECT * FROM {{ ref('stg_team_season_features') }}
+),
+
 with_lags AS (
     SELECT
-        team_season_key,
-        team_location,
-        team_name,
-        season_year,
+        p.team_season_key,
+        p.team_location,
+        p.team_name,
+        p.season_year,
         
         -- Current season
-        wins,
-        losses,
-        win_percentage,
-        made_playoffs,
-        won_superbowl,
-        avg_weekly_attendance,
-        total_weekly_attendance,
-        home_games_played,
-        
-        -- Prior season context (using LAG window function)
-        LAG(made_playoffs, 1) OVER (
-            PARTITION BY team_location, team_name 
-            ORDER BY season_year
-        ) AS prior_season_made_playoffs,
-        
-        LAG(avg_weekly_attendance, 1) OVER (
-            PARTITION BY team_location, team_name 
-            ORDER BY season_year
-        ) AS prior_season_avg_attendance,
+        p.wins,
+        p.losses,
+        p.win_percentage,
+        p.made_playoffs,
+        p.won_superbowl,
+        p.avg_weekly_attendance,
+        p.total_weekly_attendance,
+        p.home_games_played,
         
-        LAG(win_percentage, 1) OVER (
-            PARTITION BY team_location, team_name 
-            ORDER BY season_year
-        ) AS prior_season_win_pct
+        -- Prior season context (maintained incrementally by the feature store)
+        f.prior_season_made_playoffs,
+        f.prior_season_avg_attendance,
+        f.prior_season_win_pct
         
-    FROM performance
+    FROM performance p
+    LEFT JOIN features f
+        ON p.team_season_key = f.team_season_key
 )
 
 SELECT
@@ -2,6 +2,10 @@
 -- Question: Does venue type (indoor/outdoor) affect attendance patterns?
 -- Grain: One row per venue (aggregated across all games)
 -- Purpose: Compare attendance stability and averages across venue characteristics
+-- Travel/location columns come from src.etl.build_travel_features, which only covers leagues in
+-- its geocode lookup (NFL). Other leagues run with --vars '{travel_features: false}' and get NULLs.
+
+{%- set travel_features = var('travel_features', true) %}
 
 WITH games_combined AS (
     SELECT
@@ -13,12 +17,23 @@ WITH games_combined AS (
         v.venue_state,
         v.is_indoor_venue,
         t.season_year,
-        t.week_number
+        t.week_number,
+        {% if travel_features -%}
+        tr.away_travel_miles,
+        tr.is_regional_game
+        {%- else -%}
+        NULL AS away_travel_miles,
+        NULL AS is_regional_game
+        {%- endif %}
     FROM {{ ref('stg_espn_games_core') }} c
     JOIN {{ ref('stg_espn_games_venue') }} v
         ON c.game_id = v.game_id
     JOIN {{ ref('stg_espn_games_time') }} t
         ON c.game_id = t.game_id
+    {% if travel_features -%}
+    LEFT JOIN {{ ref('stg_espn_game_travel') }} tr
+        ON c.game_id = tr.game_id
+    {%- endif %}
 ),
 
 venue_stats AS (
@@ -41,14 +56,29 @@ venue_stats AS (
         ROUND(
             ((MAX(attendance) - MIN(attendance)) / AVG(attendance)) * 100,
             1
-        ) AS attendance_variability_pct
+        ) AS attendance_variability_pct,
+        
+        -- Visiting-fan travel
+        ROUND(AVG(away_travel_miles), 1) AS avg_visitor_travel_miles,
+        ROUND(AVG(is_regional_game) * 100, 1) AS regional_game_pct
         
     FROM games_combined
     GROUP BY venue_id, venue_name, venue_city, venue_state, is_indoor_venue
 )
 
 SELECT
-    *,
+    s.*,
+    
+    -- Location
+    {% if travel_features -%}
+    g.venue_latitude,
+    g.venue_longitude,
+    g.regional_venue_count,
+    {%- else -%}
+    NULL AS venue_latitude,
+    NULL AS venue_longitude,
+    NULL AS regional_venue_count,
+    {%- endif %}
     
     -- Categorize venue type
     CASE
@@ -60,5 +90,9 @@ SELECT
     -- Placeholder for: avg_temp, precipitation_days, weather_impact_score
     -- Would enable: "Do outdoor venues in cold climates show higher variability?"
     
-FROM venue_stats
+FROM venue_stats s
+{% if travel_features -%}
+LEFT JOIN {{ ref('stg_venue_geocodes') }} g
+    ON s.venue_id = g.venue_id
+{% endif -%}
 WHERE games_played >= 5  -- Only venues with sufficient game sample
@@ -0,0 +1,25 @@
+-- Staging: ESPN Game Travel Distances (2020-2024)
+-- Grain: One row per game (game_id is unique)
+-- Purpose: Visiting-team travel distance from the travel feature stage (src.etl.build_travel_features)
+
+WITH source AS (
+    SELECT * FROM {{ var('league_prefix', '') }}espn_game_travel
+),
+
+renamed AS (
+    SELECT
+        -- Keys
+        game_id,
+        venue_id,
+        home_team_id,
+        away_team_id,
+        
+        -- Travel (origin = away team's home venue)
+        origin_venue_id AS away_team_origin_venue_id,
+        travel_miles AS away_travel_miles,
+        is_regional_game
+        
+    FROM source
+)
+
+SELECT * FROM renamed
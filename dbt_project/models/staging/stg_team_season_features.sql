@@ -0,0 +1,49 @@
+-- Staging: Team Season Features (2000-2019 Kaggle + later ESPN seasons)
+-- Grain: One row per team per season (team_season_key is unique)
+-- Purpose: Rolling/lagged team features from the feature store (src.etl.build_team_features)
+
+WITH source AS (
+    SELECT * FROM team_season_features
+),
+
+renamed AS (
+    SELECT
+        -- Keys
+        team_season_key,
+        team_location,
+        team_name,
+        season_year,
+        
+        -- Prior season (previous calendar season, NULL if the team did not play it)
+        prior_season_made_playoffs,
+        prior_season_avg_attendance,
+        prior_season_win_pct,
+        
+        -- Rolling means (current season included)
+        attendance_roll3_mean,
+        attendance_roll5_mean,
+        win_pct_roll3_mean,
+        win_pct_roll5_mean,
+        
+        -- Multi-season changes
+        attendance_change_1yr,
+        attendance_change_3yr,
+        win_pct_change_1yr,
+        win_pct_change_3yr,
+        
+        -- League rank within season (1 = highest; change > 0 = climbed)
+        attendance_rank,
+        attendance_rank_change,
+        win_pct_rank,
+        win_pct_rank_change,
+        
+        -- Streaks
+        playoff_streak,
+        winning_season_streak,
+        longest_win_streak,
+        season_end_streak  -- +wins / -losses going into the offseason
+        
+    FROM source
+)
+
+SELECT * FROM renamed
@@ -0,0 +1,22 @@
+-- Staging: Venue Geocodes
+-- Grain: One row per venue (venue_id is unique)
+-- Purpose: Venue coordinates from the bundled city/state lookup, plus nearby-venue counts
+
+WITH source AS (
+    SELECT * FROM {{ var('league_prefix', '') }}venue_geocodes
+),
+
+renamed AS (
+    SELECT
+        -- Keys
+        venue_id,
+        
+        -- Location
+        latitude AS venue_latitude,
+        longitude AS venue_longitude,
+        regional_venue_count  -- other venues within TRAVEL_REGIONAL_MILES
+        
+    FROM source
+)
+
+SELECT * FROM renamed
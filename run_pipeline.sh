@@ -1,24 +1,61 @@
 #!/bin/bash
 set -e  # stop on first failure
 
+# --profile: profile every Python step (same as GAMEDAY_PROFILE=1) into logs/profiles/
+if [ "$1" == "--profile" ]; then
+    export GAMEDAY_PROFILE=1
+fi
+
+# ESPN leagues to pull and load (config.LEAGUES): NFL only unless GAMEDAY_LEAGUES=nfl,cfb.
+# Every league beyond the NFL gets its own venue mart (cfb_mart_venue_attendance_patterns); travel
+# features are NFL-only (the geocode lookup covers NFL markets), so those marts skip the travel joins
+export GAMEDAY_LEAGUES="${GAMEDAY_LEAGUES:-nfl}"
+
 echo "=== GameDay Analytics Pipeline ==="
 
 echo ">> Ingesting historical data (Kaggle)"
 python -m src.etl.ingest_nfl_dataset
 
-echo ">> Ingesting current season data (ESPN)"
+echo ">> Ingesting current season data (ESPN: $GAMEDAY_LEAGUES, concurrently)"
 python -m src.etl.ingest_current_season
 
+echo ">> Backfilling per-game summaries (resumable)"
+python -m src.etl.ingest_game_details
+
+echo ">> Profiling ESPN schema (drift check)"
+python -m src.etl.profile_espn_schema
+
 echo ">> Creating team reference table"
 python -m src.etl.create_team_reference
 
 echo ">> Loading to database"
 python -m src.etl.load_to_database
 
+echo ">> Building travel-distance features (NFL venues)"
+python -m src.etl.build_travel_features
+
+echo ">> Updating team feature store (changed seasons only)"
+python -m src.etl.build_team_features
+
 echo ">> Running dbt transformations"
 cd dbt_project
 dbt seed
 dbt run
 dbt test
+for league in ${GAMEDAY_LEAGUES//,/ }; do
+    if [ "$league" != "nfl" ]; then
+        dbt run --vars "{league_prefix: ${league}_, travel_features: false}" --select +mart_venue_attendance_patterns
+    fi
+done
+cd ..
+
+echo ">> Forecasting attendance (Monte Carlo)"
+python -m src.etl.forecast_attendance
+
+echo ">> Publishing the database to the dashboard (streamlit_app/, stamped with its run id)"
+python -m src.etl.publish_dashboard_db
+
+echo ">> Rendering dashboard figures (cached per pipeline run)"
+python -m src.etl.render_dashboard_figures
 
 echo "=== Pipeline complete ==="
\ No newline at end of file
@@ -0,0 +1,502 @@
+"""
+ETL Script: Pipeline Benchmark Suite
+Author: Linda B. Low-k-dielectric
+Date: Week 5
+Purpose: Time each pipeline stage against synthetic datasets and record throughput + memory
+Note: Each stage runs in a fresh child process so peak RSS is measured per stage rather
+      than accumulating across the run. Results are written to logs/benchmarks/ as JSON
+      and can be diffed against a previous run with --compare. --backends sqlite,duckdb
+      runs the load/validate/dbt/dashboard stages against both engines side by side.
+"""
+
+# Standard library
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+
+# Local
+from src.utils.logging_config import setup_logger
+from src.utils.profiling import run_main
+from src.utils.config import (
+    SYNTHETIC_DATA_PATH,
+    BENCHMARK_LOG_PATH,
+    DBT_PROJECT_DIR,
+    PROJECT_ROOT,
+    ESPN_FILES,
+    KAGGLE_FILES,
+    DB_BACKENDS
+)
+
+# Logger
+logger = setup_logger(__name__)
+
+BENCHMARK_DB_NAMES = {"sqlite": "benchmark.db", "duckdb": "benchmark.duckdb"}
+STAGES = [
+    "espn_parse",
+    "espn_flatten",
+    "load_kaggle",
+    "load_espn",
+    "load_reference",
+    "travel_features",
+    "team_features",
+    "validate",
+    "dbt_seed",
+    "dbt_run",
+    "dashboard"
+]
+# Stages that don't touch the database are only timed once per scale, not per backend
+BACKEND_INDEPENDENT_STAGES = {"espn_parse", "espn_flatten"}
+# Stages that need dbt (dashboard reads the mart tables dbt builds)
+DBT_STAGES = {"dbt_seed", "dbt_run", "dashboard"}
+
+# The Streamlit app's queries (one full read per mart table)
+DASHBOARD_QUERIES = [
+    "SELECT * FROM mart_win_attendance_correlation",
+    "SELECT * FROM mart_playoff_momentum",
+    "SELECT * FROM mart_venue_attendance_patterns"
+]
+
+
+def main():
+    """Run the benchmark suite from command-line parameters."""
+    parser = argparse.ArgumentParser(description="Benchmark ETL stages on synthetic data")
+    parser.add_argument(
+        "--scales", default="20x1",
+        help="Comma-separated SEASONSxLEAGUES list, e.g. 20x1,20x10,20x100"
+    )
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma-separated stage names")
+    parser.add_argument("--backends", default="sqlite", help="Comma-separated: sqlite,duckdb")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per stage (median is reported)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tracemalloc", action="store_true", help="Also record Python allocation peak")
+    parser.add_argument("--compare", type=Path, default=None, help="Previous results file to diff against")
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"Unknown stages: {sorted(unknown)}")
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    unknown = set(backends) - set(DB_BACKENDS)
+    if unknown:
+        parser.error(f"Unknown backends: {sorted(unknown)}")
+
+    results = run_benchmarks(
+        parse_scales(args.scales), stages, args.repeat, args.seed, args.tracemalloc, backends
+    )
+    output_file = save_results(results)
+
+    if len(backends) > 1:
+        log_backend_comparison(results, backends)
+
+    if args.compare:
+        compare_results(load_results(args.compare), results)
+
+    logger.info(f"Benchmark results saved to {output_file}")
+
+
+def parse_scales(spec):
+    """Parse '20x1,20x10' into [(20, 1), (20, 10)]."""
+    scales = []
+    for item in spec.split(","):
+        seasons, leagues = item.lower().split("x")
+        scales.append((int(seasons), int(leagues)))
+    return scales
+
+
+def run_benchmarks(scales, stages, repeat=1, seed=42, trace_memory=False, backends=("sqlite",)):
+    """
+    Run every requested stage at every scale (database stages once per backend).
+
+    Returns:
+        dict: Run metadata plus one entry per (scale, stage)
+    """
+    results = {
+        "run_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+        "tracemalloc": trace_memory,
+        "backends": list(backends),
+        "stages": []
+    }
+
+    for n_seasons, n_leagues in scales:
+        label = f"s{n_seasons}_l{n_leagues}_seed{seed}"
+        dataset_dir = prepare_dataset(n_seasons, n_leagues, seed, label)
+        for backend in backends:
+            db_path = dataset_dir / BENCHMARK_DB_NAMES[backend]
+            # The database plus its journals: SQLite's <db>-wal/<db>-shm/<db>-journal, DuckDB's <db>.wal
+            for suffix in ("", "-wal", "-shm", "-journal", ".wal"):
+                stale = db_path.with_name(db_path.name + suffix)
+                if stale.exists():
+                    stale.unlink()
+
+        logger.info(f"Benchmarking {label}")
+        for stage, backend in stage_backend_pairs(stages, backends):
+            db_path = dataset_dir / BENCHMARK_DB_NAMES[backend]
+            runs = [run_stage_isolated(stage, dataset_dir, db_path, trace_memory) for _ in range(repeat)]
+            if runs[0] is None:
+                continue
+
+            seconds = statistics.median(r["seconds"] for r in runs)
+            record = {
+                "dataset": label,
+                "seasons": n_seasons,
+                "leagues": n_leagues,
+                "stage": stage,
+                "backend": None if stage in BACKEND_INDEPENDENT_STAGES else backend,
+                "seconds": round(seconds, 4),
+                "rows": runs[0]["rows"],
+                "rows_per_sec": round(runs[0]["rows"] / seconds, 1) if seconds else None,
+                "peak_rss_mb": max(r["peak_rss_mb"] for r in runs),
+                "py_peak_mb": max((r["py_peak_mb"] or 0) for r in runs) if trace_memory else None,
+                "input_mb": round(dataset_size_mb(dataset_dir), 2)
+            }
+            results["stages"].append(record)
+            logger.info(
+                f"  {stage:<15} {record['backend'] or '':<7} {record['seconds']:>9.3f}s  "
+                f"{record['rows']:>10,} rows  {record['rows_per_sec'] or 0:>12,.0f} rows/s  "
+                f"{record['peak_rss_mb']:>8.1f} MB RSS"
+            )
+
+    return results
+
+
+def stage_backend_pairs(stages, backends):
+    """
+    Order (stage, backend) runs: parse/flatten once, then every database stage per backend.
+
+    Backends run one after another (all sqlite stages, then all duckdb stages) because
+    later stages read what earlier ones loaded.
+    """
+    pairs = [(stage, backends[0]) for stage in stages if stage in BACKEND_INDEPENDENT_STAGES]
+    for backend in backends:
+        pairs += [(stage, backend) for stage in stages if stage not in BACKEND_INDEPENDENT_STAGES]
+    return pairs
+
+
+def prepare_dataset(n_seasons, n_leagues, seed, label):
+    """Generate the synthetic dataset for a scale unless it already exists."""
+    dataset_dir = SYNTHETIC_DATA_PATH / label
+    expected = [dataset_dir / ESPN_FILES["games_core"]["filename"]]
+    expected += [dataset_dir / config["filename"] for config in KAGGLE_FILES]
+
+    if all(f.exists() for f in expected):
+        logger.info(f"Reusing synthetic dataset: {dataset_dir}")
+        return dataset_dir
+
+    # Imported lazily so the generator's imports don't count against stage memory
+    from src.etl.generate_synthetic_data import generate_dataset
+    return generate_dataset(n_seasons, n_leagues, seed=seed, label=label)
+
+
+def run_stage_isolated(stage, dataset_dir, db_path, trace_memory):
+    """Run a single stage in a fresh spawned process and return its measurements."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(_run_stage, stage, str(dataset_dir), str(db_path), trace_memory).result()
+
+
+def _run_stage(stage, dataset_dir, db_path, trace_memory):
+    """Child-process entry point: import, time and measure one stage."""
+    dataset_dir, db_path = Path(dataset_dir), Path(db_path)
+    stage_fn = STAGE_FUNCTIONS[stage]
+
+    if stage in DBT_STAGES and shutil.which("dbt") is None:
+        logger.warning(f"  {stage}: dbt executable not found - skipping")
+        return None
+
+    # Warm imports outside the timed/traced region
+    import src.etl.load_to_database  # noqa: F401
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    rows = stage_fn(dataset_dir, db_path)
+    seconds = time.perf_counter() - start
+    py_peak = tracemalloc.get_traced_memory()[1] / 1e6 if trace_memory else None
+    if trace_memory:
+        tracemalloc.stop()
+
+    return {
+        "seconds": seconds,
+        "rows": rows,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "py_peak_mb": round(py_peak, 1) if py_peak is not None else None
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Stage implementations: each takes (dataset_dir, db_path) and returns rows processed
+# ─────────────────────────────────────────────────────────────────────
+
+def stage_espn_parse(dataset_dir, db_path):
+    """Parse the ESPN scoreboard JSON into Python objects."""
+    with open(dataset_dir / ESPN_FILES["games_core"]["filename"], "r") as f:
+        return len(json.load(f))
+
+
+def stage_espn_flatten(dataset_dir, db_path):
+    """Parse and flatten ESPN events through every themed games schema."""
+    from src.etl.load_to_database import flatten_espn_data
+    from src.utils import config
+
+    with open(dataset_dir / ESPN_FILES["games_core"]["filename"], "r") as f:
+        events = json.load(f)
+
+    rows = 0
+    for file_config in ESPN_FILES.values():
+        if file_config["filename"] != ESPN_FILES["games_core"]["filename"]:
+            continue
+        rows += len(flatten_espn_data(events, getattr(config, file_config["schema"])))
+    return rows
+
+
+def stage_load_kaggle(dataset_dir, db_path):
+    """Load Kaggle-shaped CSVs into the benchmark database."""
+    from src.etl.load_to_database import create_database, load_kaggle_data
+
+    conn = create_database(db_path)
+    try:
+        load_kaggle_data(conn, raw_path=dataset_dir)
+        return count_rows(conn, [f"kaggle_{c['name']}" for c in KAGGLE_FILES])
+    finally:
+        conn.close()
+
+
+def stage_load_espn(dataset_dir, db_path):
+    """Load ESPN-shaped JSON into the themed benchmark tables."""
+    from src.etl.load_to_database import create_database, load_espn_data
+
+    conn = create_database(db_path)
+    try:
+        load_espn_data(conn, raw_path=dataset_dir)
+        return count_rows(conn, [c["table_name"] for c in ESPN_FILES.values()])
+    finally:
+        conn.close()
+
+
+def stage_load_reference(dataset_dir, db_path):
+    """Load the synthetic team reference table."""
+    from src.etl.load_to_database import create_database, load_reference_data
+
+    conn = create_database(db_path)
+    try:
+        load_reference_data(conn, raw_path=dataset_dir)
+        return count_rows(conn, ["team_reference"])
+    finally:
+        conn.close()
+
+
+def stage_travel_features(dataset_dir, db_path):
+    """Geocode venues and compute per-game travel distances (needed by dbt run)."""
+    from src.etl.build_travel_features import build_travel_features
+    from src.etl.load_to_database import create_database
+    from src.utils.config import TRAVEL_TABLE, VENUE_GEOCODE_TABLE
+
+    conn = create_database(db_path)
+    try:
+        build_travel_features(conn)
+        return count_rows(conn, [TRAVEL_TABLE, VENUE_GEOCODE_TABLE])
+    finally:
+        conn.close()
+
+
+def stage_team_features(dataset_dir, db_path):
+    """Build the team feature store from scratch (needed by dbt run)."""
+    from src.etl.build_team_features import build_team_features
+    from src.etl.load_to_database import create_database
+    from src.utils.config import FEATURE_TABLE
+
+    conn = create_database(db_path)
+    try:
+        build_team_features(conn, full_refresh=True)
+        return count_rows(conn, [FEATURE_TABLE])
+    finally:
+        conn.close()
+
+
+def stage_validate(dataset_dir, db_path):
+    """Run post-load validation against the benchmark database."""
+    from src.etl.load_to_database import create_database, validate_data
+    from src.utils.config import DB_TABLES
+
+    conn = create_database(db_path)
+    try:
+        validate_data(conn)
+        return count_rows(conn, DB_TABLES)
+    finally:
+        conn.close()
+
+
+def stage_dbt_seed(dataset_dir, db_path):
+    """Run `dbt seed` against the benchmark database."""
+    run_dbt("seed", db_path)
+    return 0
+
+
+def stage_dbt_run(dataset_dir, db_path):
+    """Run `dbt run` against the benchmark database; rows = rows in mart tables."""
+    from src.utils.database import connect, list_tables
+
+    run_dbt("run", db_path)
+    conn = connect(db_path, read_only=True)
+    try:
+        return count_rows(conn, list_tables(conn, prefix="mart_"))
+    finally:
+        conn.close()
+
+
+def stage_dashboard(dataset_dir, db_path):
+    """Run the dashboard's mart queries on a fresh read-only connection; rows = rows returned."""
+    from src.utils.database import connect, read_frame
+
+    conn = connect(db_path, read_only=True)
+    try:
+        return sum(len(read_frame(conn, query)) for query in DASHBOARD_QUERIES)
+    finally:
+        conn.close()
+
+
+STAGE_FUNCTIONS = {
+    "espn_parse": stage_espn_parse,
+    "espn_flatten": stage_espn_flatten,
+    "load_kaggle": stage_load_kaggle,
+    "load_espn": stage_load_espn,
+    "load_reference": stage_load_reference,
+    "travel_features": stage_travel_features,
+    "team_features": stage_team_features,
+    "validate": stage_validate,
+    "dbt_seed": stage_dbt_seed,
+    "dbt_run": stage_dbt_run,
+    "dashboard": stage_dashboard
+}
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────
+
+def run_dbt(command, db_path):
+    """Invoke the dbt CLI with the project's profile pointed at db_path (target by backend)."""
+    from src.utils.database import backend_for
+
+    db_path = str(Path(db_path).resolve())
+    if backend_for(db_path) == "duckdb":
+        env, target = {**os.environ, "GAMEDAY_DUCKDB_PATH": db_path}, "duckdb"
+    else:
+        env, target = {**os.environ, "GAMEDAY_DB_PATH": db_path}, "dev"
+    subprocess.run(
+        ["dbt", command, "--project-dir", str(DBT_PROJECT_DIR), "--profiles-dir", str(DBT_PROJECT_DIR),
+         "--target", target],
+        cwd=DBT_PROJECT_DIR, env=env, check=True, capture_output=True
+    )
+
+
+def count_rows(conn, tables):
+    """Sum row counts across tables, ignoring tables that don't exist."""
+    total = 0
+    for table in tables:
+        try:
+            total += conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        except Exception:
+            pass
+    return total
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process and any child processes, in MB."""
+    self_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    child_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    scale = 1 / 1e6 if platform.system() == "Darwin" else 1 / 1e3  # macOS reports bytes
+    return max(self_kb, child_kb) * scale
+
+
+def dataset_size_mb(dataset_dir):
+    """Total size of the input files in a dataset directory."""
+    return sum(f.stat().st_size for f in dataset_dir.iterdir() if f.suffix in (".csv", ".json")) / 1e6
+
+
+def git_commit():
+    """Current git commit hash (or None outside a git checkout)."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(results):
+    """Write results JSON to logs/benchmarks/ and return the file path."""
+    BENCHMARK_LOG_PATH.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_file = BENCHMARK_LOG_PATH / f"benchmark_{stamp}_{results['git_commit'] or 'nogit'}.json"
+    with open(output_file, "w") as f:
+        json.dump(results, f, indent=2)
+    return output_file
+
+
+def load_results(path):
+    """Load a previously saved results file."""
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def log_backend_comparison(results, backends):
+    """Log one line per (dataset, stage) with each backend's time side by side."""
+    logger.info(f"Backend comparison ({' vs '.join(backends)}):")
+    table = {}
+    for record in results["stages"]:
+        if record.get("backend"):
+            table.setdefault((record["dataset"], record["stage"]), {})[record["backend"]] = record["seconds"]
+
+    for (dataset, stage), timings in table.items():
+        cells = "  ".join(
+            f"{backend} {timings[backend]:>8.3f}s" if backend in timings else f"{backend} {'-':>9}"
+            for backend in backends
+        )
+        first, last = timings.get(backends[0]), timings.get(backends[-1])
+        speedup = f"  ({first / last:.1f}x)" if first and last else ""
+        logger.info(f"  {dataset} {stage:<15} {cells}{speedup}")
+
+
+def compare_results(baseline, current):
+    """Log per-stage time and memory deltas between two result sets."""
+    logger.info(f"Comparing against {baseline.get('git_commit')} ({baseline.get('run_at')})")
+    # Results written before backends were added are sqlite runs
+    base = {
+        (r["dataset"], r["stage"], r.get("backend", None if r["stage"] in BACKEND_INDEPENDENT_STAGES else "sqlite")): r
+        for r in baseline["stages"]
+    }
+
+    for record in current["stages"]:
+        previous = base.get((record["dataset"], record["stage"], record.get("backend")))
+        if previous is None:
+            logger.info(f"  {record['dataset']} {record['stage']}: no baseline")
+            continue
+        time_delta = (record["seconds"] - previous["seconds"]) / previous["seconds"] * 100 if previous["seconds"] else 0
+        rss_delta = record["peak_rss_mb"] - previous["peak_rss_mb"]
+        logger.info(
+            f"  {record['dataset']} {record['stage']:<15} {record.get('backend') or '':<7} "
+            f"{previous['seconds']:.3f}s -> {record['seconds']:.3f}s ({time_delta:+.1f}%)  "
+            f"RSS {rss_delta:+.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    run_main(main)
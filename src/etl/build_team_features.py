@@ -0,0 +1,408 @@
+"""
+ETL Script: Team Feature Store
+Author: Linda B. Low-k-dielectric
+Date: Week 5
+Purpose: Keep per-team time-series features - rolling attendance/win means, multi-season
+         deltas, league rank changes, playoff/winning-season streaks and in-season win
+         streaks - in team_season_features, one row per team per season
+Note: Run after load_to_database, before dbt run (stg_team_season_features supplies
+      int_playoff_lag's prior-season context).
+      Seasons: the Kaggle standings/attendance/games, then every later season in the ESPN
+      tables (espn_games_* mapped to the same team keys through team_reference, so
+      relocations and renames line up with the Kaggle names). ESPN pulls are regular season
+      only, so those seasons have no made_playoffs (NULL) and playoff streaks restart there.
+      Wins, losses and attendance come from the ESPN games; a game counts once it has a winner
+      or a non-zero tied score. Without the ESPN tables the store covers the Kaggle seasons.
+      Incremental: every row stores a hash of its inputs (season aggregates plus the ordered
+      game dates and results). A run reads those inputs, finds the earliest season whose
+      hash changed, and recomputes/rewrites only that season onward - a new week or season
+      touches just the latest season's rows, a corrected game date or result its season's.
+      --full-refresh rebuilds everything.
+      Features are computed on a (season x team) matrix, so each one is a single vectorized
+      pass over all teams. "Prior" and "N yr" mean calendar seasons: a team that did not
+      play that season gets NULL, never a value from an older season.
+"""
+
+# Standard library
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+# Third-party
+import numpy as np
+import pandas as pd
+
+# Local
+from src.utils.logging_config import setup_logger
+from src.utils.profiling import run_main
+from src.utils.database import connect, read_frame, write_table, table_exists
+from src.utils.config import FEATURE_TABLE, FEATURE_ROLLING_SEASONS, FEATURE_DELTA_SEASONS
+
+# Logger
+logger = setup_logger(__name__)
+
+KEY_COLUMNS = ["team_location", "team_name", "season_year"]
+STREAK_COLUMNS = ["playoff_streak", "winning_season_streak"]
+# Seasons before the first recomputed one that the windows, deltas and rank changes read
+LOOKBACK_SEASONS = max(max(FEATURE_ROLLING_SEASONS) - 1, max(FEATURE_DELTA_SEASONS), 1)
+
+FEATURE_COLUMNS = (
+    ["team_season_key"] + KEY_COLUMNS
+    + ["wins", "losses", "win_percentage", "made_playoffs", "avg_weekly_attendance"]
+    + ["prior_season_made_playoffs", "prior_season_avg_attendance", "prior_season_win_pct"]
+    + [f"{name}_roll{n}_mean" for n in FEATURE_ROLLING_SEASONS for name in ("attendance", "win_pct")]
+    + [f"{name}_change_{n}yr" for n in FEATURE_DELTA_SEASONS for name in ("attendance", "win_pct")]
+    + ["attendance_rank", "attendance_rank_change", "win_pct_rank", "win_pct_rank_change"]
+    + STREAK_COLUMNS
+    + ["longest_win_streak", "season_end_streak", "input_hash", "features_updated_at"]
+)
+
+# Tables the ESPN-era seasons are read from (skipped unless all are loaded)
+ESPN_TABLES = ["espn_games_time", "espn_games_team_attributes", "espn_games_score_wins",
+               "espn_games_core", "team_reference"]
+
+# One row per team per game: result 1 = win, -1 = loss, 0 = tie; game_date as YYYY-MM-DD text
+KAGGLE_TEAM_GAMES_QUERY = """
+    SELECT year AS season_year, SUBSTR(CAST(game_date AS VARCHAR), 1, 10) AS game_date,
+        home_team_city AS team_location, home_team_name AS team_name,
+        CASE WHEN tie IS NOT NULL THEN 0 WHEN winner = home_team THEN 1 ELSE -1 END AS result
+    FROM kaggle_games
+    UNION ALL
+    SELECT year, SUBSTR(CAST(game_date AS VARCHAR), 1, 10), away_team_city, away_team_name,
+        CASE WHEN tie IS NOT NULL THEN 0 WHEN winner = away_team THEN 1 ELSE -1 END
+    FROM kaggle_games
+"""
+
+# Same grain for the ESPN seasons after the Kaggle ones, plus the game's crowd (NULL if unreported)
+ESPN_TEAM_GAMES_QUERY = """
+    WITH games AS (
+        SELECT
+            t.season_year,
+            SUBSTR(t.date, 1, 10) AS game_date,
+            a.id_home,
+            a.id_away,
+            CAST(w.winner_home AS INTEGER) AS winner_home,
+            CAST(w.winner_away AS INTEGER) AS winner_away,
+            NULLIF(c.attendance, 0) AS attendance
+        FROM espn_games_time t
+        JOIN espn_games_team_attributes a ON t.id = a.id
+        JOIN espn_games_score_wins w ON t.id = w.id
+        LEFT JOIN espn_games_core c ON t.id = c.id
+        WHERE t.season_year > (SELECT MAX(year) FROM kaggle_standings)
+            AND (CAST(w.winner_home AS INTEGER) = 1 OR CAST(w.winner_away AS INTEGER) = 1
+                 OR (w.score_home = w.score_away AND w.score_home NOT IN ('', '0')))
+    ),
+    team_games AS (
+        SELECT season_year, game_date, id_home AS espn_team_id, attendance,
+            CASE WHEN winner_home = 1 THEN 1 WHEN winner_away = 1 THEN -1 ELSE 0 END AS result
+        FROM games
+        UNION ALL
+        SELECT season_year, game_date, id_away, attendance,
+            CASE WHEN winner_away = 1 THEN 1 WHEN winner_home = 1 THEN -1 ELSE 0 END
+        FROM games
+    )
+    SELECT g.season_year, g.game_date, r.team_city AS team_location, r.team_name, g.result, g.attendance
+    FROM team_games g
+    JOIN team_reference r
+        ON CAST(r.espn_team_id AS VARCHAR) = g.espn_team_id
+        AND g.season_year BETWEEN CAST(SUBSTR(r.active_years, 1, 4) AS INTEGER)
+            AND CAST(SUBSTR(r.active_years, -4) AS INTEGER)
+"""
+
+# One row per team per season: the season aggregates the features are computed from
+KAGGLE_INPUTS_QUERY = """
+    WITH attendance AS (
+        SELECT
+            team,
+            team_name,
+            year,
+            AVG(weekly_attendance) AS avg_weekly_attendance,
+            COUNT(weekly_attendance) AS attendance_weeks
+        FROM kaggle_attendance
+        GROUP BY team, team_name, year
+    )
+    SELECT
+        s.team AS team_location,
+        s.team_name,
+        s.year AS season_year,
+        s.wins,
+        s.loss AS losses,
+        CASE WHEN s.playoffs = 'Playoffs' THEN 1 ELSE 0 END AS made_playoffs,
+        a.avg_weekly_attendance,
+        a.attendance_weeks
+    FROM kaggle_standings s
+    LEFT JOIN attendance a
+        ON s.team = a.team AND s.team_name = a.team_name AND s.year = a.year
+"""
+
+ESPN_INPUTS_QUERY = f"""
+    SELECT
+        team_location,
+        team_name,
+        season_year,
+        CAST(SUM(CASE WHEN result = 1 THEN 1 ELSE 0 END) AS INTEGER) AS wins,
+        CAST(SUM(CASE WHEN result = -1 THEN 1 ELSE 0 END) AS INTEGER) AS losses,
+        NULL AS made_playoffs,
+        AVG(attendance) AS avg_weekly_attendance,
+        COUNT(attendance) AS attendance_weeks
+    FROM ({ESPN_TEAM_GAMES_QUERY}) team_games
+    GROUP BY team_location, team_name, season_year
+"""
+
+
+def main():
+    """Build or update the team feature store."""
+    parser = argparse.ArgumentParser(description="Build or incrementally update team_season_features")
+    parser.add_argument("--db-path", type=Path, default=None, help="Database file (default: DB_BACKEND's)")
+    parser.add_argument("--full-refresh", action="store_true", help="Recompute every season")
+    args = parser.parse_args()
+
+    conn = connect(args.db_path)
+    try:
+        build_team_features(conn, args.full_refresh)
+    finally:
+        conn.close()
+
+
+def build_team_features(conn, full_refresh=False):
+    """
+    Recompute features from the earliest season whose inputs changed since the last run.
+
+    Args:
+        conn: Database connection
+        full_refresh (bool): Ignore the stored rows and rebuild the whole table
+
+    Returns:
+        DataFrame: The rows written (empty when the store was already current)
+    """
+    logger.info("Updating team feature store")
+    inputs_query, games_query = source_queries(conn)
+    inputs = read_frame(conn, inputs_query)
+    games = read_frame(conn, games_query)
+    inputs["input_hash"] = input_hashes(inputs, games)
+
+    stored = None if full_refresh else load_stored(conn)
+    watermark = first_changed_season(inputs, stored)
+    if watermark is None:
+        logger.info(f"  {FEATURE_TABLE} is current ({len(inputs):,} team-seasons, no input changes)")
+        return pd.DataFrame(columns=FEATURE_COLUMNS)
+
+    window = inputs[inputs["season_year"] >= watermark - LOOKBACK_SEASONS].reset_index(drop=True)
+    seeds = None
+    if stored is not None and len(window):
+        seeds = stored[stored["season_year"] == window["season_year"].min() - 1]
+    features = season_features(window, seeds)
+    features = features[features["season_year"] >= watermark]
+
+    features = features.merge(game_streaks(games[games["season_year"] >= watermark]), on=KEY_COLUMNS, how="left")
+    for column in ["longest_win_streak", "season_end_streak"]:
+        features[column] = features[column].astype("Int64")
+    features["features_updated_at"] = datetime.now().isoformat(timespec="seconds")
+    features = features[FEATURE_COLUMNS]
+
+    save_features(conn, features, None if stored is None else watermark)
+    if stored is None:
+        logger.info(f"  Rebuilt {FEATURE_TABLE}: {len(features):,} rows")
+    else:
+        logger.info(
+            f"  Updated {FEATURE_TABLE}: {len(features):,} rows for seasons {watermark}+ "
+            f"({len(window) - len(features):,} lookback rows read, not rewritten)"
+        )
+    return features
+
+
+def source_queries(conn):
+    """Season-input and team-game queries: the Kaggle seasons, plus the ESPN ones when loaded."""
+    missing = [table for table in ESPN_TABLES if not table_exists(conn, table)]
+    if missing:
+        logger.info(f"  ESPN tables not loaded ({', '.join(missing)}) - Kaggle seasons only")
+        return KAGGLE_INPUTS_QUERY, KAGGLE_TEAM_GAMES_QUERY
+    games_query = f"""
+        {KAGGLE_TEAM_GAMES_QUERY}
+        UNION ALL
+        SELECT season_year, game_date, team_location, team_name, result FROM ({ESPN_TEAM_GAMES_QUERY}) espn_team_games
+    """
+    return f"{KAGGLE_INPUTS_QUERY} UNION ALL {ESPN_INPUTS_QUERY}", games_query
+
+
+def input_hashes(inputs, games):
+    """
+    Per-row hash of the season aggregates and the team-season's ordered game results, as hex text
+    so both backends store it losslessly.
+    """
+    values = inputs.drop(columns=KEY_COLUMNS).astype("float64")
+    aggregates = pd.util.hash_pandas_object(values, index=False).to_numpy()
+    results = inputs[KEY_COLUMNS].merge(game_result_hashes(games), on=KEY_COLUMNS, how="left")
+    combined = pd.DataFrame({
+        "aggregates": aggregates,
+        "results": results["results_hash"].fillna(0).astype("uint64").to_numpy()
+    })
+    return pd.util.hash_pandas_object(combined, index=False).map("{:016x}".format)
+
+
+def game_result_hashes(games):
+    """
+    One hash per team-season over its games in date order (date, result and position of each),
+    so a corrected date or result changes it even when the season totals do not.
+    """
+    games = games.sort_values(KEY_COLUMNS + ["game_date"], kind="stable").reset_index(drop=True)
+    games["result"] = games["result"].astype("int64")  # DuckDB returns int32
+    games["game_number"] = games.groupby(KEY_COLUMNS, sort=False).cumcount()
+    row_hashes = pd.util.hash_pandas_object(games[["game_date", "result", "game_number"]], index=False).to_numpy()
+    starts = np.flatnonzero(games["game_number"].to_numpy() == 0)
+    hashes = games.loc[starts, KEY_COLUMNS].reset_index(drop=True)
+    hashes["results_hash"] = np.bitwise_xor.reduceat(row_hashes, starts) if len(starts) else []
+    return hashes
+
+
+def load_stored(conn):
+    """Stored keys, input hashes and streaks; None when the table is missing or its columns changed."""
+    if not table_exists(conn, FEATURE_TABLE):
+        return None
+    columns = list(read_frame(conn, f"SELECT * FROM {FEATURE_TABLE} LIMIT 0").columns)
+    if columns != FEATURE_COLUMNS:
+        logger.info(f"  {FEATURE_TABLE} columns differ from the current feature set - rebuilding")
+        return None
+    return read_frame(conn, f"SELECT {', '.join(KEY_COLUMNS + ['input_hash'] + STREAK_COLUMNS)} FROM {FEATURE_TABLE}")
+
+
+def first_changed_season(inputs, stored):
+    """Earliest season with new, changed or removed input rows (None when nothing changed)."""
+    if stored is None:
+        return int(inputs["season_year"].min()) if len(inputs) else None
+    merged = inputs[KEY_COLUMNS + ["input_hash"]].merge(
+        stored[KEY_COLUMNS + ["input_hash"]], on=KEY_COLUMNS, how="outer", suffixes=("", "_stored")
+    )
+    changed = merged["input_hash"] != merged["input_hash_stored"]
+    return int(merged.loc[changed, "season_year"].min()) if changed.any() else None
+
+
+def season_features(window, seeds=None):
+    """
+    Season-grain features for every row of `window`.
+
+    Inputs are laid out as (season x team) matrices with NaN where a team has no row, so
+    rolling windows, shifts and ranks run column-wise over all teams at once. `seeds` holds
+    the stored streaks of the season before the window (streaks are the only features
+    that look back further than LOOKBACK_SEASONS).
+    """
+    codes = window.groupby(["team_location", "team_name"], sort=True).ngroup().to_numpy()
+    first_season = int(window["season_year"].min()) if len(window) else 0
+    rows = window["season_year"].to_numpy() - first_season
+    shape = (rows.max() + 1 if len(rows) else 0, codes.max() + 1 if len(codes) else 0)
+
+    def matrix(values):
+        grid = np.full(shape, np.nan)
+        grid[rows, codes] = np.asarray(values, dtype="float64")
+        return pd.DataFrame(grid)
+
+    def column(grid):
+        return np.asarray(grid, dtype="float64")[rows, codes]
+
+    win_pct = round_half_up(window["wins"] / (window["wins"] + window["losses"]), 3)
+    attendance = matrix(window["avg_weekly_attendance"])
+    win = matrix(win_pct)
+    playoffs = matrix(window["made_playoffs"])
+
+    features = window[KEY_COLUMNS].copy()
+    features["team_season_key"] = (
+        features["team_location"] + "_" + features["team_name"] + "_" + features["season_year"].astype(str)
+    )
+    features["wins"] = window["wins"]
+    features["losses"] = window["losses"]
+    features["win_percentage"] = win_pct
+    features["made_playoffs"] = pd.array(window["made_playoffs"].astype("float64"), dtype="Int64")
+    features["avg_weekly_attendance"] = window["avg_weekly_attendance"]
+    features["input_hash"] = window["input_hash"]
+
+    features["prior_season_made_playoffs"] = pd.array(column(playoffs.shift(1)), dtype="Int64")
+    features["prior_season_avg_attendance"] = column(attendance.shift(1))
+    features["prior_season_win_pct"] = column(win.shift(1))
+
+    for n in FEATURE_ROLLING_SEASONS:
+        features[f"attendance_roll{n}_mean"] = np.round(column(attendance.rolling(n, min_periods=1).mean()), 1)
+        features[f"win_pct_roll{n}_mean"] = np.round(column(win.rolling(n, min_periods=1).mean()), 3)
+    for n in FEATURE_DELTA_SEASONS:
+        features[f"attendance_change_{n}yr"] = np.round(column(attendance - attendance.shift(n)), 1)
+        features[f"win_pct_change_{n}yr"] = np.round(column(win - win.shift(n)), 3)
+
+    # League rank within the season (1 = highest); change is positive when a team climbed
+    for name, grid in [("attendance", attendance), ("win_pct", win)]:
+        rank = grid.rank(axis=1, ascending=False, method="min")
+        features[f"{name}_rank"] = pd.array(column(rank), dtype="Int64")
+        features[f"{name}_rank_change"] = pd.array(column(rank.shift(1) - rank), dtype="Int64")
+
+    carry = np.zeros((len(STREAK_COLUMNS), shape[1]))
+    if seeds is not None and len(seeds):
+        team_codes = window[["team_location", "team_name"]].assign(code=codes).drop_duplicates()
+        seeded = seeds.merge(team_codes, on=["team_location", "team_name"])
+        for i, streak in enumerate(STREAK_COLUMNS):
+            carry[i, seeded["code"].to_numpy()] = seeded[streak].fillna(0).to_numpy()
+    features["playoff_streak"] = pd.array(column(run_lengths(playoffs.to_numpy() == 1, carry[0])), dtype="Int64")
+    features["winning_season_streak"] = pd.array(column(run_lengths(win.to_numpy() > 0.5, carry[1])), dtype="Int64")
+    return features
+
+
+def run_lengths(flags, carry=0):
+    """
+    Length of the run of True ending at each row of a (season x team) matrix, 0 where False.
+
+    `carry` is each team's run length going into the first row.
+    """
+    position = np.arange(len(flags))[:, None]
+    last_break = np.maximum.accumulate(np.where(flags, -1, position), axis=0)
+    runs = position - last_break
+    return np.where(last_break < 0, runs + carry, runs)
+
+
+def game_streaks(games):
+    """
+    Longest win streak per team-season and the streak it ended on (+wins / -losses, 0 after a tie).
+
+    Games are sorted by date within each team-season; run lengths come from one pass over the
+    sorted arrays, reset at every team-season boundary.
+    """
+    games = games.assign(game_date=pd.to_datetime(games["game_date"]))
+    games = games.sort_values(KEY_COLUMNS + ["game_date"], kind="stable").reset_index(drop=True)
+    position = np.arange(len(games))
+    group_start = position - games.groupby(KEY_COLUMNS, sort=False).cumcount().to_numpy()
+    result = games["result"].to_numpy()
+
+    def runs(flags):
+        last_break = np.maximum.accumulate(np.where(flags, -1, position))
+        return position - np.maximum(last_break, group_start - 1)
+
+    games["win_run"] = runs(result == 1)
+    games["loss_run"] = runs(result == -1)
+    streaks = games.groupby(KEY_COLUMNS, as_index=False).agg(
+        longest_win_streak=("win_run", "max"),
+        end_win_run=("win_run", "last"),
+        end_loss_run=("loss_run", "last")
+    )
+    streaks["season_end_streak"] = streaks["end_win_run"] - streaks["end_loss_run"]
+    return streaks[KEY_COLUMNS + ["longest_win_streak", "season_end_streak"]]
+
+
+def round_half_up(values, digits):
+    """Round halves up, as SQL ROUND does for these non-negative ratios, so values match the dbt models."""
+    scale = 10 ** digits
+    return np.floor(values * scale + 0.5) / scale
+
+
+def save_features(conn, features, watermark=None):
+    """Replace the table (watermark None) or its rows from `watermark` on, then ensure its indexes."""
+    if watermark is None:
+        write_table(conn, features, FEATURE_TABLE, if_exists="replace")
+    else:
+        conn.execute(f"DELETE FROM {FEATURE_TABLE} WHERE season_year >= ?", [watermark])
+        write_table(conn, features, FEATURE_TABLE, if_exists="append")
+    conn.execute(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{FEATURE_TABLE}_team_season "
+        f"ON {FEATURE_TABLE} (team_location, team_name, season_year)"
+    )
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{FEATURE_TABLE}_season ON {FEATURE_TABLE} (season_year)")
+    conn.commit()
+
+
+if __name__ == "__main__":
+    run_main(main)
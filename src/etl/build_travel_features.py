@@ -0,0 +1,176 @@
+"""
+ETL Script: Travel-Distance Features
+Author: Linda B. Low-k-dielectric
+Date: Week 5
+Purpose: Geocode ESPN venues from the bundled city/state lookup (data/reference/city_geocodes.csv),
+         index them spatially, and compute how far the visiting team travelled for every game
+Note: Run after load_to_database, before dbt run. Writes espn_game_travel (one row per game)
+      and venue_geocodes (one row per venue), staged by stg_espn_game_travel and
+      stg_venue_geocodes and joined into the marts.
+      The visitor's origin is its own home venue (team.venue.id on the competitor, else the
+      venue it hosts most games at). All distances come from one vectorized haversine over
+      the games array - no per-game Python.
+      --league builds another league's tables, for leagues with travel_features in LEAGUES. The
+      lookup covers NFL markets only, so cfb is skipped rather than written as all-NULL travel;
+      its venue mart is built with travel_features: false and leaves those columns NULL.
+"""
+
+# Standard library
+import argparse
+from pathlib import Path
+
+# Third-party
+import numpy as np
+import pandas as pd
+
+# Local
+from src.utils.logging_config import setup_logger
+from src.utils.profiling import run_main
+from src.utils.database import connect, read_frame, write_table
+from src.utils.geo import GridIndex, haversine_miles
+from src.utils.leagues import league_table
+from src.utils.config import (
+    GEOCODE_LOOKUP,
+    TRAVEL_TABLE,
+    VENUE_GEOCODE_TABLE,
+    TRAVEL_REGIONAL_MILES,
+    TRAVEL_INDEX_CELL_DEGREES,
+    LEAGUES,
+    DEFAULT_LEAGUE
+)
+
+# Logger
+logger = setup_logger(__name__)
+
+TRAVEL_LEAGUES = [league for league, settings in LEAGUES.items() if settings["travel_features"]]
+
+GAMES_QUERY = """
+    SELECT
+        v.id AS game_id,
+        v.venue_id,
+        v.venue_address_city AS venue_city,
+        v.venue_address_state AS venue_state,
+        v.team_venue_id_away AS away_team_venue_id,
+        a.id_home AS home_team_id,
+        a.id_away AS away_team_id
+    FROM {prefix}espn_games_venue v
+    LEFT JOIN {prefix}espn_games_team_attributes a ON v.id = a.id
+"""
+
+
+def main():
+    """Build the travel feature tables."""
+    parser = argparse.ArgumentParser(description="Build game travel-distance features")
+    parser.add_argument("--db-path", type=Path, default=None, help="Database file (default: DB_BACKEND's)")
+    parser.add_argument("--league", default=DEFAULT_LEAGUE, choices=sorted(TRAVEL_LEAGUES),
+                        help="League whose tables to build (leagues the geocode lookup covers)")
+    args = parser.parse_args()
+
+    conn = connect(args.db_path)
+    try:
+        build_travel_features(conn, league=args.league)
+    finally:
+        conn.close()
+
+
+def build_travel_features(conn, geocode_file=None, league=DEFAULT_LEAGUE):
+    """
+    Geocode venues, index them, and write per-game travel distances.
+
+    Returns:
+        tuple: (game travel DataFrame, venue geocode DataFrame)
+
+    Raises:
+        ValueError: The geocode lookup doesn't cover the league's venues
+    """
+    if league not in TRAVEL_LEAGUES:
+        raise ValueError(f"No travel features for {league}: the geocode lookup covers {', '.join(TRAVEL_LEAGUES)} venues only")
+    logger.info(f"Building travel-distance features ({league})")
+    games = read_frame(conn, GAMES_QUERY.format(prefix=LEAGUES[league]["table_prefix"]))
+    for column in ["home_team_id", "away_team_id"]:
+        games[column] = pd.to_numeric(games[column], errors="coerce").astype("Int64")
+
+    venues = geocode_venues(games, load_geocodes(geocode_file))
+    index = GridIndex(venues["venue_id"], venues["latitude"], venues["longitude"], TRAVEL_INDEX_CELL_DEGREES)
+    # Other venues within driving range (shared/nearby markets compete for the same fans)
+    venues["regional_venue_count"] = pd.array([
+        len(index.query_radius(lat, lon, TRAVEL_REGIONAL_MILES)[0]) - 1 if not np.isnan(lat) else None
+        for lat, lon in zip(venues["latitude"], venues["longitude"])
+    ], dtype="Int64")
+    logger.info(f"  Indexed {len(index)} of {len(venues)} venues in {len(index.cell_runs)} grid cells")
+
+    travel = game_travel(games, venues)
+    measured = travel["travel_miles"].notna()
+    logger.info(
+        f"  {measured.sum():,} of {len(travel):,} games measured "
+        f"(median {travel['travel_miles'].median():,.0f} mi, {travel['is_regional_game'].sum():,} regional)"
+    )
+
+    travel_table, geocode_table = league_table(TRAVEL_TABLE, league), league_table(VENUE_GEOCODE_TABLE, league)
+    write_table(conn, travel, travel_table, if_exists="replace")
+    write_table(conn, venues, geocode_table, if_exists="replace")
+    logger.info(f"  Wrote {travel_table} and {geocode_table}")
+    return travel, venues
+
+
+def load_geocodes(geocode_file=None):
+    """The bundled city/state -> latitude/longitude table."""
+    geocode_file = geocode_file or GEOCODE_LOOKUP["path"] / GEOCODE_LOOKUP["filename"]
+    geocodes = pd.read_csv(geocode_file, keep_default_na=False, dtype={"city": str, "state": str})
+    geocodes["geo_key"] = geo_key(geocodes["city"], geocodes["state"])
+    return geocodes.drop_duplicates("geo_key")
+
+
+def geo_key(cities, states):
+    """Normalized city|state lookup key (case and surrounding whitespace ignored)."""
+    return cities.fillna("").str.strip().str.casefold() + "|" + states.fillna("").str.strip().str.casefold()
+
+
+def geocode_venues(games, geocodes):
+    """One row per venue with coordinates (NaN where the lookup has no match)."""
+    venues = games.drop_duplicates("venue_id")[["venue_id", "venue_city", "venue_state"]].reset_index(drop=True)
+    venues["geo_key"] = geo_key(venues["venue_city"], venues["venue_state"])
+    venues = venues.merge(geocodes[["geo_key", "latitude", "longitude"]], on="geo_key", how="left")
+
+    missing = venues[venues["latitude"].isna()]
+    if len(missing):
+        sample = ", ".join(f"{c}, {s}" for c, s in zip(missing["venue_city"][:10], missing["venue_state"][:10]))
+        logger.warning(f"  {len(missing)} venues not in {GEOCODE_SEED['filename']}: {sample}")
+    return venues.drop(columns="geo_key")
+
+
+def game_travel(games, venues):
+    """
+    Visitor travel distance per game in one vectorized pass.
+
+    The origin venue is the away competitor's own venue id when the payload carries one that
+    we can geocode, else the venue that team hosts most of its games at.
+    """
+    coords = venues.set_index("venue_id")[["latitude", "longitude"]]
+    located = set(coords.index[coords["latitude"].notna()])
+
+    home_venue = (
+        games.dropna(subset=["home_team_id"])
+        .groupby(["home_team_id", "venue_id"]).size().rename("games").reset_index()
+        .sort_values(["home_team_id", "games", "venue_id"], ascending=[True, False, True])
+        .drop_duplicates("home_team_id")
+        .set_index("home_team_id")["venue_id"]
+    )
+    origin = games["away_team_venue_id"].where(
+        games["away_team_venue_id"].isin(located),
+        games["away_team_id"].map(home_venue)
+    )
+
+    origin_coords = coords.reindex(origin).to_numpy()
+    venue_coords = coords.reindex(games["venue_id"]).to_numpy()
+    miles = haversine_miles(origin_coords[:, 0], origin_coords[:, 1], venue_coords[:, 0], venue_coords[:, 1])
+
+    travel = games[["game_id", "venue_id", "home_team_id", "away_team_id"]].copy()
+    travel["origin_venue_id"] = origin.to_numpy()
+    travel["travel_miles"] = np.round(miles, 1)
+    travel["is_regional_game"] = pd.Series(miles <= TRAVEL_REGIONAL_MILES, dtype="Int64").mask(np.isnan(miles))
+    return travel
+
+
+if __name__ == "__main__":
+    run_main(main)
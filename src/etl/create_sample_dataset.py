@@ -0,0 +1,227 @@
+"""
+ETL Script: Stratified Sample Dataset
+Author: Linda B. Low-k-dielectric
+Date: Week 5
+Purpose: Cut a small, referentially consistent dev/test dataset from data/raw into data/sample/stratified
+         (Kaggle CSVs, ESPN events + teams, team_reference) so the full ETL + dbt cycle
+         runs in seconds
+Note: Deterministic for a given source, --fraction and --seed.
+      Teams are stratified by conference/division (relocated franchises travel together via
+      espn_team_id). Seasons are a contiguous window per source era (Kaggle years, ESPN
+      years), so prior-season LAGs still line up. A game or event is kept only when both
+      teams are in the sample and its season is in the window, so every team referenced
+      anywhere in the sample resolves in team_reference, and every venue kept belongs to
+      a sampled home team.
+"""
+
+# Standard library
+import argparse
+import json
+import math
+from pathlib import Path
+
+# Third-party
+import numpy as np
+import pandas as pd
+
+# Local
+from src.utils.logging_config import setup_logger
+from src.utils.profiling import run_main
+from src.utils.json_stream import iter_json_records
+from src.utils.raw_archive import event_season
+from src.utils.config import (
+    RAW_DATA_PATH,
+    SAMPLE_OUTPUT_PATH,
+    KAGGLE_FILES,
+    ESPN_FILES,
+    TEAM_REFERENCE_FILES,
+    SAMPLE_FRACTION,
+    SAMPLE_SEED,
+    SAMPLE_MIN_TEAMS_PER_DIVISION,
+    SAMPLE_MIN_SEASONS,
+    SAMPLE_MANIFEST
+)
+
+# Logger
+logger = setup_logger(__name__)
+
+
+def main():
+    """Write a stratified sample of the raw data."""
+    parser = argparse.ArgumentParser(description="Create a deterministic stratified sample dataset")
+    parser.add_argument("--source", type=Path, default=RAW_DATA_PATH, help="Raw data directory")
+    parser.add_argument("--output", type=Path, default=SAMPLE_OUTPUT_PATH, help="Sample output directory")
+    parser.add_argument("--fraction", type=float, default=SAMPLE_FRACTION, help="Target share of source rows")
+    parser.add_argument("--seed", type=int, default=SAMPLE_SEED)
+    args = parser.parse_args()
+
+    if not 0 < args.fraction <= 1:
+        parser.error("--fraction must be in (0, 1]")
+    create_sample(args.source, args.output, args.fraction, args.seed)
+
+
+def create_sample(source=RAW_DATA_PATH, output=SAMPLE_OUTPUT_PATH, fraction=SAMPLE_FRACTION, seed=SAMPLE_SEED):
+    """
+    Sample teams and seasons, then filter every source to them.
+
+    Returns:
+        dict: The manifest written alongside the sample
+    """
+    logger.info(f"Creating {fraction:.0%} sample of {source} (seed {seed}) -> {output}")
+    output.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    reference = load_reference(source)
+    teams = sample_teams(reference, math.sqrt(fraction), rng)
+    team_share = len(teams) / reference["espn_team_id"].nunique()
+
+    eras = {
+        "kaggle": kaggle_years(source),
+        "espn": espn_years(source)
+    }
+    season_share = min(1.0, fraction / team_share)
+    seasons = sorted(set().union(*(season_window(years, season_share, rng) for years in eras.values())))
+
+    selected = reference[reference["espn_team_id"].isin(teams)]
+    identities = set(zip(selected["team_city"], selected["team_name"]))
+    logger.info(f"  Teams: {len(teams)} franchises ({len(identities)} city/name identities)")
+    logger.info(f"  Seasons: {seasons}")
+
+    counts = {}
+    counts.update(sample_kaggle(source, output, identities, seasons))
+    counts.update(sample_espn(source, output, teams, seasons))
+    counts["team_reference"] = write_reference(selected, output, len(reference))
+
+    manifest = {
+        "source": str(source),
+        "fraction": fraction,
+        "seed": seed,
+        "espn_team_ids": sorted(int(t) for t in teams),
+        "seasons": seasons,
+        "rows": counts
+    }
+    with open(output / SAMPLE_MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    for name, (kept, total) in counts.items():
+        logger.info(f"  {name}: {kept:,} of {total:,} rows ({kept / max(total, 1):.1%})")
+    logger.info("Sample dataset complete")
+    return manifest
+
+
+def load_reference(source):
+    """team_reference.csv from the source directory, falling back to the dbt seed."""
+    ref_file = source / TEAM_REFERENCE_FILES["output"]["filename"]
+    if not ref_file.exists():
+        seed_config = TEAM_REFERENCE_FILES["seed"]
+        ref_file = seed_config["path"] / seed_config["filename"]
+    return pd.read_csv(ref_file)
+
+
+def sample_teams(reference, share, rng):
+    """
+    Pick franchises (espn_team_id) per conference/division.
+
+    At least SAMPLE_MIN_TEAMS_PER_DIVISION per division so division games survive the
+    both-teams-sampled rule.
+    """
+    teams = []
+    divisions = reference.drop_duplicates("espn_team_id").sort_values(["conference", "division", "espn_team_id"])
+    for _, division in divisions.groupby(["conference", "division"], sort=True):
+        ids = division["espn_team_id"].to_numpy()
+        k = min(len(ids), max(SAMPLE_MIN_TEAMS_PER_DIVISION, round(share * len(ids))))
+        teams.extend(rng.choice(ids, size=k, replace=False).tolist())
+    return set(teams)
+
+
+def season_window(years, share, rng):
+    """A contiguous run of seasons covering `share` of an era (deterministic start)."""
+    if not years:
+        return []
+    length = min(len(years), max(SAMPLE_MIN_SEASONS, round(share * len(years))))
+    start = int(rng.integers(0, len(years) - length + 1))
+    return years[start:start + length]
+
+
+def kaggle_years(source):
+    """Seasons present in the Kaggle standings."""
+    standings = source / next(c["filename"] for c in KAGGLE_FILES if c["name"] == "standings")
+    if not standings.exists():
+        return []
+    return sorted(pd.read_csv(standings, usecols=["year"])["year"].unique().tolist())
+
+
+def espn_years(source):
+    """Seasons present in the ESPN events (streamed, no full load)."""
+    games_file = source / ESPN_FILES["games_core"]["filename"]
+    if not games_file.exists():
+        return []
+    return sorted({event_season(event) for event in iter_json_records(games_file)})
+
+
+def sample_kaggle(source, output, identities, seasons):
+    """Filter the Kaggle CSVs to sampled (city, name) identities and seasons, values untouched."""
+    # (city column, name column) pairs that must all be sampled identities, per file
+    identity_columns = {
+        "attendance": [("team", "team_name")],
+        "standings": [("team", "team_name")],
+        "games": [("home_team_city", "home_team_name"), ("away_team_city", "away_team_name")]
+    }
+    counts = {}
+    for file_config in KAGGLE_FILES:
+        source_file = source / file_config["filename"]
+        if not source_file.exists():
+            logger.warning(f"  File not found: {source_file}")
+            continue
+
+        # Read as text so kept rows are written back exactly as they came in
+        df = pd.read_csv(source_file, dtype=str, keep_default_na=False)
+        keep = df["year"].astype(int).isin(seasons)
+        for city_column, name_column in identity_columns[file_config["name"]]:
+            keep &= pd.Series(list(zip(df[city_column], df[name_column])), index=df.index).isin(identities)
+
+        df[keep].to_csv(output / file_config["filename"], index=False)
+        counts[f"kaggle_{file_config['name']}"] = (int(keep.sum()), len(df))
+    return counts
+
+
+def sample_espn(source, output, teams, seasons):
+    """Stream ESPN events/teams, keeping events between two sampled teams in sampled seasons."""
+    counts = {}
+    team_ids = {str(t) for t in teams}
+    season_set = set(seasons)
+
+    games_file = source / ESPN_FILES["games_core"]["filename"]
+    if games_file.exists():
+        kept = total = 0
+        with open(output / games_file.name, "w") as f:
+            f.write("[\n")
+            for event in iter_json_records(games_file):
+                total += 1
+                competitors = event.get("competitions", [{}])[0].get("competitors", [])
+                ids = {str(c.get("team", {}).get("id")) for c in competitors}
+                if event_season(event) in season_set and ids and ids <= team_ids:
+                    f.write((",\n" if kept else "") + json.dumps(event))
+                    kept += 1
+            f.write("\n]\n")
+        counts["espn_games"] = (kept, total)
+
+    teams_file = source / ESPN_FILES["teams"]["filename"]
+    if teams_file.exists():
+        all_teams = list(iter_json_records(teams_file))
+        sampled = [t for t in all_teams if str(t.get("team", {}).get("id")) in team_ids]
+        with open(output / teams_file.name, "w") as f:
+            json.dump(sampled, f, indent=2)
+        counts["espn_teams"] = (len(sampled), len(all_teams))
+    return counts
+
+
+def write_reference(selected, output, total):
+    """Write the sampled team_reference rows."""
+    ref_config = TEAM_REFERENCE_FILES["output"]
+    selected.to_csv(output / ref_config["filename"], index=False)
+    return (len(selected), total)
+
+
+if __name__ == "__main__":
+    run_main(main)
@@ -16,6 +16,7 @@ import pandas as pd
 
 # Local
 from src.utils.logging_config import setup_logger
+from src.utils.profiling import run_main
 from src.utils.config import TEAM_REFERENCE_FILES, ESPN_FILES
 
 # Logger
@@ -93,4 +94,4 @@ def save_reference_table(df):
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run_main(main)
\ No newline at end of file
@@ -0,0 +1,375 @@
+"""
+ETL Script: Single-Scan Data Quality Engine
+Author: Linda B. Low-k-dielectric
+Date: Week 5
+Purpose: Compile the declarative checks in config.DATA_QUALITY_CHECKS into one aggregate
+         query per table, run tables concurrently on read-only connections, and skip
+         tables whose content fingerprint hasn't changed since they were last checked
+Note: Referential checks against dbt models (stg_*) stay in dbt test; the
+      reference_coverage checks here run against the raw team_reference table.
+      Fingerprints are recorded by the loaders at write time (record_fingerprint), so
+      anything that rewrites a raw table must record a new fingerprint too. A table's cache
+      key also covers the tables its checks read (reference_coverage -> team_reference).
+"""
+
+# Standard library
+import hashlib
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+# Third-party
+import pandas as pd
+
+# Local
+from src.utils.logging_config import setup_logger
+from src.utils.database import is_duckdb, DATABASE_ERRORS
+from src.utils.config import (
+    DATA_QUALITY_CHECKS,
+    QUALITY_CHECK_WORKERS,
+    TABLE_FINGERPRINTS_TABLE,
+    QUALITY_CACHE_TABLE
+)
+
+# Logger
+logger = setup_logger(__name__)
+
+
+def run_quality_checks(conn, checks=DATA_QUALITY_CHECKS, max_workers=QUALITY_CHECK_WORKERS, use_cache=True):
+    """
+    Run configured checks for every table.
+
+    Args:
+        conn: Writable SQLite/DuckDB connection (used for fingerprints and the result cache)
+        checks (dict): table -> list of check definitions
+        max_workers (int): Tables checked concurrently
+        use_cache (bool): Reuse results for tables whose fingerprint is unchanged
+
+    Returns:
+        dict: table -> {"fingerprint", "cached", "row_count", "results": [...]} (or {"error": msg})
+    """
+    ensure_metadata_tables(conn)
+    db_path = database_file(conn)
+    fingerprints = load_fingerprints(conn)
+
+    pending, report = {}, {}
+    for table, table_checks in checks.items():
+        fingerprint = content_fingerprint(table, table_checks, fingerprints)
+        cached = load_cached_results(conn, table, fingerprint, table_checks) if use_cache else None
+        if cached is not None:
+            report[table] = {"fingerprint": fingerprint, "cached": True, **cached}
+        else:
+            pending[table] = table_checks
+
+    if db_path and len(pending) > 1:
+        # sqlite3 releases the GIL while a query runs, so threads scan tables in parallel;
+        # DuckDB cursors are independent connections to the same database
+        if is_duckdb(conn):
+            worker, target = run_table_checks_cursor, conn
+        else:
+            worker, target = run_table_checks_readonly, db_path
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+            futures = {
+                table: pool.submit(worker, target, table, table_checks)
+                for table, table_checks in pending.items()
+            }
+            outcomes = {table: future.result() for table, future in futures.items()}
+    else:
+        outcomes = {table: run_table_checks(conn, table, table_checks) for table, table_checks in pending.items()}
+
+    for table, outcome in outcomes.items():
+        fingerprint = content_fingerprint(table, checks[table], fingerprints)
+        report[table] = {"fingerprint": fingerprint, "cached": False, **outcome}
+        if "results" in outcome and fingerprint:
+            save_cached_results(conn, table, fingerprint, checks[table], outcome)
+
+    log_report(report, checks)
+    return report
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Check compilation: each check contributes SELECT expressions + an evaluator
+# ─────────────────────────────────────────────────────────────────────
+
+def compile_checks(table, checks):
+    """
+    Compile a table's checks into one aggregate SELECT.
+
+    Returns:
+        tuple: (sql, evaluators) where each evaluator maps the result row dict to a check result
+    """
+    expressions = ["COUNT(*) AS row_count"]
+    evaluators = []
+
+    for i, check in enumerate(checks):
+        compiler = CHECK_COMPILERS[check["check"]]
+        check_expressions, evaluator = compiler(check, f"c{i}")
+        expressions.extend(check_expressions)
+        evaluators.append(evaluator)
+
+    sql = "SELECT\n    " + ",\n    ".join(expressions) + f"\nFROM {table} t"
+    return sql, evaluators
+
+
+def compile_row_count(check, alias):
+    """Table must have at least `min` rows."""
+    minimum = check.get("min", 1)
+
+    def evaluate(row):
+        return result(check, "row_count", row["row_count"], f">= {minimum}", row["row_count"] >= minimum)
+    return [], evaluate
+
+
+def compile_null_rate(check, alias):
+    """Fraction of NULLs in `column` must not exceed `max`."""
+    column, maximum = check["column"], check.get("max", 0.0)
+    expressions = [f"SUM(CASE WHEN t.{column} IS NULL THEN 1 ELSE 0 END) AS {alias}_nulls"]
+
+    def evaluate(row):
+        rate = row[f"{alias}_nulls"] / row["row_count"] if row["row_count"] else 0.0
+        return result(check, column, round(rate, 4), f"<= {maximum}", rate <= maximum)
+    return expressions, evaluate
+
+
+def compile_range(check, alias):
+    """Non-NULL values of `column` must fall within [min, max]."""
+    column = check["column"]
+    low, high = check.get("min"), check.get("max")
+    max_violations = check.get("max_violations", 0)
+
+    conditions = []
+    if low is not None:
+        conditions.append(f"t.{column} < {low}")
+    if high is not None:
+        conditions.append(f"t.{column} > {high}")
+    expressions = [
+        f"SUM(CASE WHEN {' OR '.join(conditions)} THEN 1 ELSE 0 END) AS {alias}_violations",
+        f"MIN(t.{column}) AS {alias}_min",
+        f"MAX(t.{column}) AS {alias}_max"
+    ]
+
+    def evaluate(row):
+        violations = row[f"{alias}_violations"] or 0
+        observed = f"{violations} outside [{low}, {high}] (min={row[f'{alias}_min']}, max={row[f'{alias}_max']})"
+        return result(check, column, observed, f"<= {max_violations} violations", violations <= max_violations)
+    return expressions, evaluate
+
+
+def compile_unique(check, alias):
+    """Key formed by `columns` must not repeat."""
+    columns = check["columns"]
+    max_duplicates = check.get("max_duplicates", 0)
+    key = " || '|' || ".join(f"COALESCE(CAST(t.{c} AS TEXT), '<null>')" for c in columns)
+    expressions = [f"COUNT(*) - COUNT(DISTINCT {key}) AS {alias}_duplicates"]
+
+    def evaluate(row):
+        duplicates = row[f"{alias}_duplicates"]
+        return result(check, ",".join(columns), duplicates, f"<= {max_duplicates} duplicates",
+                      duplicates <= max_duplicates)
+    return expressions, evaluate
+
+
+def compile_reference_coverage(check, alias):
+    """Every row must match the reference table on `on` (and active_years if year_column is set)."""
+    reference = check["reference"]
+    max_unmatched = check.get("max_unmatched", 0)
+
+    conditions = [f"CAST(r.{ref_col} AS TEXT) = CAST(t.{col} AS TEXT)" for col, ref_col in check["on"].items()]
+    if check.get("year_column"):
+        # Same active_years convention as v_attendance_historical.sql
+        conditions.append(
+            f"CAST(t.{check['year_column']} AS TEXT) BETWEEN "
+            f"SUBSTR(r.active_years, 1, 4) AND SUBSTR(r.active_years, -4)"
+        )
+    expressions = [
+        f"SUM(CASE WHEN NOT EXISTS (SELECT 1 FROM {reference} r WHERE {' AND '.join(conditions)}) "
+        f"THEN 1 ELSE 0 END) AS {alias}_unmatched"
+    ]
+
+    def evaluate(row):
+        unmatched = row[f"{alias}_unmatched"] or 0
+        label = f"{','.join(check['on'])} -> {reference}"
+        return result(check, label, unmatched, f"<= {max_unmatched} unmatched", unmatched <= max_unmatched)
+    return expressions, evaluate
+
+
+CHECK_COMPILERS = {
+    "row_count": compile_row_count,
+    "null_rate": compile_null_rate,
+    "range": compile_range,
+    "unique": compile_unique,
+    "reference_coverage": compile_reference_coverage
+}
+
+
+def result(check, target, observed, expected, passed):
+    """Uniform check result record."""
+    return {
+        "check": check["check"],
+        "target": target,
+        "observed": observed,
+        "expected": expected,
+        "passed": bool(passed)
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Execution
+# ─────────────────────────────────────────────────────────────────────
+
+def run_table_checks(conn, table, checks):
+    """Run one table's compiled checks as a single scan on an existing connection."""
+    try:
+        sql, evaluators = compile_checks(table, checks)
+        cursor = conn.execute(sql)
+        columns = [d[0] for d in cursor.description]
+        row = dict(zip(columns, cursor.fetchone()))
+        return {"row_count": row["row_count"], "results": [evaluate(row) for evaluate in evaluators]}
+    except DATABASE_ERRORS as e:
+        return {"error": str(e)}
+
+
+def run_table_checks_readonly(db_path, table, checks):
+    """Run one table's checks on its own read-only connection (thread worker)."""
+    conn = sqlite3.connect(f"{Path(db_path).as_uri()}?mode=ro", uri=True)
+    try:
+        return run_table_checks(conn, table, checks)
+    finally:
+        conn.close()
+
+
+def run_table_checks_cursor(conn, table, checks):
+    """Run one table's checks on a DuckDB cursor of a shared connection (thread worker)."""
+    cursor = conn.cursor()
+    try:
+        return run_table_checks(cursor, table, checks)
+    finally:
+        cursor.close()
+
+
+def database_file(conn):
+    """File path behind a connection ('' for in-memory databases)."""
+    return conn.execute("PRAGMA database_list").fetchone()[2]
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Fingerprints and result cache
+# ─────────────────────────────────────────────────────────────────────
+
+def ensure_metadata_tables(conn):
+    """Create the fingerprint and cache tables if missing."""
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {TABLE_FINGERPRINTS_TABLE} ("
+        "table_name TEXT PRIMARY KEY, fingerprint TEXT, row_count INTEGER, loaded_at TEXT)"
+    )
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {QUALITY_CACHE_TABLE} ("
+        "table_name TEXT, fingerprint TEXT, checks_hash TEXT, results TEXT, checked_at TEXT, "
+        "PRIMARY KEY (table_name, checks_hash))"
+    )
+    conn.commit()
+
+
+def new_fingerprint(columns):
+    """Start a content hash for a table with the given columns."""
+    hasher = hashlib.sha1()
+    hasher.update("|".join(map(str, columns)).encode())
+    return hasher
+
+
+def update_fingerprint(hasher, df):
+    """Fold a DataFrame (or one chunk of it) into a content hash."""
+    hasher.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return hasher
+
+
+def frame_fingerprint(df):
+    """Content hash of a whole DataFrame."""
+    return update_fingerprint(new_fingerprint(df.columns), df).hexdigest()
+
+
+def record_fingerprint(conn, table, fingerprint, row_count):
+    """Record the content fingerprint of a freshly loaded table."""
+    ensure_metadata_tables(conn)
+    conn.execute(
+        f"INSERT OR REPLACE INTO {TABLE_FINGERPRINTS_TABLE} VALUES (?, ?, ?, ?)",
+        (table, fingerprint, int(row_count), datetime.now().isoformat(timespec="seconds"))
+    )
+    conn.commit()
+
+
+def invalidate_fingerprint(conn, table):
+    """Forget a table's fingerprint after an in-place update (forces a re-check)."""
+    ensure_metadata_tables(conn)
+    conn.execute(f"DELETE FROM {TABLE_FINGERPRINTS_TABLE} WHERE table_name = ?", (table,))
+    conn.commit()
+
+
+def load_fingerprints(conn):
+    """table -> fingerprint recorded at load time."""
+    return dict(conn.execute(f"SELECT table_name, fingerprint FROM {TABLE_FINGERPRINTS_TABLE}").fetchall())
+
+
+def content_fingerprint(table, checks, fingerprints):
+    """
+    Fingerprint of everything a table's checks read: the table plus any reference tables.
+
+    None (no caching) when the table or one of its reference tables has no fingerprint.
+    """
+    tables = [table] + sorted({check["reference"] for check in checks if check.get("reference")})
+    parts = [fingerprints.get(name) for name in tables]
+    if not all(parts):
+        return None
+    if len(parts) == 1:
+        return parts[0]
+    return hashlib.sha1("|".join(f"{name}={part}" for name, part in zip(tables, parts)).encode()).hexdigest()
+
+
+def checks_hash(checks):
+    """Stable hash of a table's check definitions (changing a check invalidates the cache)."""
+    return hashlib.sha1(json.dumps(checks, sort_keys=True).encode()).hexdigest()
+
+
+def load_cached_results(conn, table, fingerprint, checks):
+    """Previous outcome for this exact content + check set, or None."""
+    if not fingerprint:
+        return None
+    row = conn.execute(
+        f"SELECT results FROM {QUALITY_CACHE_TABLE} "
+        "WHERE table_name = ? AND fingerprint = ? AND checks_hash = ?",
+        (table, fingerprint, checks_hash(checks))
+    ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def save_cached_results(conn, table, fingerprint, checks, outcome):
+    """Cache an outcome keyed by table content fingerprint and check definitions."""
+    conn.execute(
+        f"INSERT OR REPLACE INTO {QUALITY_CACHE_TABLE} VALUES (?, ?, ?, ?, ?)",
+        (table, fingerprint, checks_hash(checks), json.dumps(outcome), datetime.now().isoformat(timespec="seconds"))
+    )
+    conn.commit()
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Reporting
+# ─────────────────────────────────────────────────────────────────────
+
+def log_report(report, checks):
+    """Log one line per table plus one line per failed check."""
+    for table in checks:
+        entry = report[table]
+        if "error" in entry:
+            logger.warning(f"  {table}: could not check ({entry['error']})")
+            continue
+
+        results = entry["results"]
+        failed = [r for r in results if not r["passed"]]
+        source = "cached - content unchanged" if entry["cached"] else "checked"
+        status = "OK" if not failed else f"{len(failed)} FAILED"
+        logger.info(f"  {table}: {entry['row_count']} records, {len(results)} checks {status} ({source})")
+
+        for r in failed:
+            logger.error(f"    {r['check']} {r['target']}: observed {r['observed']}, expected {r['expected']}")
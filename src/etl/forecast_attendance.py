@@ -0,0 +1,364 @@
+"""
+ETL Script: Monte Carlo Attendance Forecast
+Author: Linda B. Low-k-dielectric
+Date: Week 5
+Purpose: Forecast per-team home attendance for the next few seasons and write percentile
+         bands (plus share of venue capacity) to forecast_attendance for the dashboard
+Note: Run after `dbt run` - team dynamics are fit from int_team_season_performance, the
+      starting level, home venue and capacity from the ESPN venue tables.
+
+Model (all teams and scenarios advance together as NumPy arrays; the only Python loops
+are over scenario batches and forecast seasons):
+    strength_h  = 0.5 + rho * (strength_h-1 - 0.5) + sigma_w * z        team quality
+    wins_h      ~ Binomial(games, strength_h)
+    log(demand_h) = log(demand_h-1) + alpha + beta * (win_pct_h-1 - 0.5) + sigma_team * z
+    game_g      = min(demand_h * exp(sigma_game * z_g), venue capacity)   per home game
+alpha/beta/rho/sigma_w are league-wide fits; sigma_team is each franchise's volatility
+shrunk toward the league's. Capacity is the largest crowd the venue has reported, so
+teams already selling out have a ceiling and only downside risk.
+"""
+
+# Standard library
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Third-party
+import numpy as np
+import pandas as pd
+
+# Local
+from src.utils.logging_config import setup_logger
+from src.utils.profiling import run_main
+from src.utils.database import connect, read_frame, write_table, DATABASE_ERRORS
+from src.utils.config import (
+    FORECAST_TABLE,
+    FORECAST_SIMULATIONS,
+    FORECAST_BATCH_SIZE,
+    FORECAST_HORIZON_SEASONS,
+    FORECAST_SEED,
+    FORECAST_PERCENTILES,
+    FORECAST_GAMES_PER_SEASON,
+    FORECAST_HOME_GAMES,
+    FORECAST_GAME_SIGMA,
+    FORECAST_SHRINKAGE_SEASONS,
+    FORECAST_SELLOUT_SHARE
+)
+
+# Logger
+logger = setup_logger(__name__)
+
+TEAM_HISTORY_QUERY = """
+    SELECT
+        r.espn_team_id,
+        p.team_location,
+        p.team_name,
+        p.season_year,
+        p.win_percentage,
+        p.avg_weekly_attendance
+    FROM int_team_season_performance p
+    JOIN stg_team_reference r
+        ON p.team_location = r.team_location
+        AND p.team_name = r.team_name
+    WHERE p.avg_weekly_attendance IS NOT NULL
+"""
+
+# Home games with a reported crowd (stg_espn_games_core drops attendance = 0)
+VENUE_GAMES_QUERY = """
+    SELECT
+        a.id_home AS espn_team_id,
+        t.season_year,
+        v.venue_id,
+        v.venue_name,
+        c.attendance
+    FROM stg_espn_games_core c
+    JOIN stg_espn_games_venue v ON c.game_id = v.game_id
+    JOIN stg_espn_games_time t ON c.game_id = t.game_id
+    JOIN espn_games_team_attributes a ON c.game_id = a.id
+    WHERE NOT c.is_neutral_site
+"""
+
+TEAM_RESULTS_QUERY = """
+    SELECT
+        t.season_year,
+        a.id_home,
+        a.id_away,
+        w.winner_home,
+        w.winner_away
+    FROM espn_games_score_wins w
+    JOIN espn_games_team_attributes a ON w.id = a.id
+    JOIN stg_espn_games_time t ON w.id = t.game_id
+"""
+
+
+def main():
+    """Fit, simulate and write the attendance forecast table."""
+    parser = argparse.ArgumentParser(description="Monte Carlo attendance forecast")
+    parser.add_argument("--db-path", type=Path, default=None, help="Database file (default: DB_BACKEND's)")
+    parser.add_argument("--simulations", type=int, default=FORECAST_SIMULATIONS)
+    parser.add_argument("--horizon", type=int, default=FORECAST_HORIZON_SEASONS, help="Seasons to forecast")
+    parser.add_argument("--seed", type=int, default=FORECAST_SEED)
+    args = parser.parse_args()
+
+    conn = connect(args.db_path)
+    try:
+        forecast_attendance(conn, args.simulations, args.horizon, args.seed)
+    finally:
+        conn.close()
+
+
+def forecast_attendance(conn, simulations=FORECAST_SIMULATIONS, horizon=FORECAST_HORIZON_SEASONS,
+                        seed=FORECAST_SEED, batch_size=FORECAST_BATCH_SIZE):
+    """
+    Fit the team and venue models, simulate, and replace the forecast table.
+
+    Returns:
+        pd.DataFrame: One row per team per forecast season
+    """
+    logger.info(f"Forecasting attendance: {simulations:,} scenarios x {horizon} seasons (seed {seed})")
+
+    history = read_frame(conn, TEAM_HISTORY_QUERY)
+    if history.empty:
+        raise ValueError("int_team_season_performance is empty - run `dbt run` first")
+    params, teams = fit_team_model(history)
+    logger.info(
+        f"  Team model: alpha={params['alpha']:+.4f} beta={params['beta']:+.4f} "
+        f"rho={params['rho']:.3f} sigma_w={params['sigma_w']:.3f} ({len(teams)} franchises)"
+    )
+
+    venues = fit_venue_model(*load_venue_history(conn))
+    state = starting_state(teams, venues)
+    logger.info(f"  Venue model: {state['venue_id'].notna().sum()} of {len(state)} teams with ESPN home venues")
+
+    rng = np.random.default_rng(seed)
+    draws = simulate_seasons(state, params, simulations, horizon, rng, batch_size)
+    forecast = summarize(state, draws, seed)
+
+    write_table(conn, forecast, FORECAST_TABLE, if_exists="replace")
+    logger.info(f"  Wrote {len(forecast)} rows to {FORECAST_TABLE}")
+    return forecast
+
+
+def fit_team_model(history):
+    """
+    League-wide attendance/win dynamics plus per-franchise volatility.
+
+    Attendance: year-over-year log change regressed on last season's win % (both
+    consecutive seasons of the same franchise). Wins: AR(1) on win % around .500, with
+    the binomial noise of a finite schedule taken out so it isn't counted twice.
+
+    Returns:
+        tuple: (params dict, per-franchise frame with last Kaggle-era season and sigma_team)
+    """
+    history = history.sort_values(["espn_team_id", "season_year"]).reset_index(drop=True)
+    grouped = history.groupby("espn_team_id")
+    log_attendance = np.log(history["avg_weekly_attendance"].astype(float))
+    consecutive = (history["season_year"] - grouped["season_year"].shift()) == 1
+    prior_win = grouped["win_percentage"].shift() - 0.5
+    change = log_attendance - log_attendance.groupby(history["espn_team_id"]).shift()
+    pairs = consecutive & change.notna() & prior_win.notna()
+    if pairs.sum() < 3:
+        raise ValueError("Need at least three consecutive team-seasons to fit the forecast model")
+
+    x = np.column_stack([np.ones(pairs.sum()), prior_win[pairs]])
+    (alpha, beta), *_ = np.linalg.lstsq(x, change[pairs], rcond=None)
+    residual = change[pairs] - x @ np.array([alpha, beta])
+    league_var = float(np.var(residual, ddof=2))
+
+    win_now = history["win_percentage"][pairs] - 0.5
+    rho = float(np.dot(prior_win[pairs], win_now) / np.dot(prior_win[pairs], prior_win[pairs]))
+    win_var = float(np.var(win_now - rho * prior_win[pairs]))
+    binomial_var = 0.25 / FORECAST_GAMES_PER_SEASON
+    sigma_w = float(np.sqrt(max(win_var - binomial_var, 0.0)))
+
+    # Per-franchise volatility, shrunk toward the league value by pseudo-seasons
+    team_ids = history["espn_team_id"][pairs]
+    n = team_ids.value_counts()
+    team_var = (residual ** 2).groupby(team_ids).sum()
+    sigma_team = np.sqrt((team_var + FORECAST_SHRINKAGE_SEASONS * league_var) / (n + FORECAST_SHRINKAGE_SEASONS))
+
+    teams = grouped.tail(1).set_index("espn_team_id")
+    teams["sigma_team"] = sigma_team.reindex(teams.index).fillna(np.sqrt(league_var))
+
+    params = {"alpha": float(alpha), "beta": float(beta), "rho": rho, "sigma_w": sigma_w}
+    return params, teams
+
+
+def load_venue_history(conn):
+    """ESPN home games and team results (None, None when the ESPN tables are missing)."""
+    try:
+        games = read_frame(conn, VENUE_GAMES_QUERY)
+        results = read_frame(conn, TEAM_RESULTS_QUERY)
+    except DATABASE_ERRORS as e:
+        reason = str(e).strip().splitlines()[-1]
+        logger.warning(f"  ESPN venue tables unavailable ({reason}) - forecasting from Kaggle levels, no capacity cap")
+        return None, None
+    return games, results
+
+
+def fit_venue_model(games, results):
+    """
+    Per-team starting point from the latest ESPN season.
+
+    Returns:
+        pd.DataFrame: Indexed by espn_team_id - start season, home venue, capacity,
+                      demand level, home games, per-game spread and win %
+    """
+    if games is None or games.empty:
+        return None
+
+    games = games.assign(espn_team_id=pd.to_numeric(games["espn_team_id"], errors="coerce"))
+    games = games.dropna(subset=["espn_team_id"]).astype({"espn_team_id": int})
+    capacity = games.groupby("venue_id")["attendance"].max()
+
+    latest = games[games["season_year"] == games.groupby("espn_team_id")["season_year"].transform("max")]
+    venues = (
+        latest.groupby(["espn_team_id", "venue_id", "venue_name"]).size()
+        .rename("home_games").reset_index()
+        .sort_values(["espn_team_id", "home_games"], ascending=[True, False])
+        .drop_duplicates("espn_team_id")
+        .set_index("espn_team_id")
+    )
+
+    # Games at the team's main venue only (international/relocated one-offs excluded)
+    at_home = latest[latest["venue_id"].to_numpy() == venues["venue_id"].reindex(latest["espn_team_id"]).to_numpy()]
+    by_team = at_home.groupby("espn_team_id")
+    venues["start_season"] = latest.groupby("espn_team_id")["season_year"].max()
+    venues["venue_capacity"] = venues["venue_id"].map(capacity).astype(float)
+    venues["level"] = by_team["attendance"].mean()
+    venues["sigma_game"] = np.log(at_home["attendance"].astype(float)).groupby(at_home["espn_team_id"]).std()
+
+    if results is not None and not results.empty:
+        team_games = pd.concat([
+            pd.DataFrame({"espn_team_id": results["id_home"], "season_year": results["season_year"],
+                          "won": results["winner_home"]}),
+            pd.DataFrame({"espn_team_id": results["id_away"], "season_year": results["season_year"],
+                          "won": results["winner_away"]})
+        ], ignore_index=True)
+        team_games["espn_team_id"] = pd.to_numeric(team_games["espn_team_id"], errors="coerce")
+        win_pct = team_games.astype({"won": float}).groupby(["espn_team_id", "season_year"])["won"].mean()
+        keys = pd.MultiIndex.from_arrays([venues.index, venues["start_season"]])
+        venues["win_percentage"] = win_pct.reindex(keys).to_numpy()
+
+    return venues
+
+
+def starting_state(teams, venues):
+    """
+    Combine the Kaggle-era team fit with the ESPN venue fit.
+
+    Teams with an ESPN home venue start from its latest season; the rest start from their
+    last Kaggle season with no capacity ceiling.
+    """
+    state = pd.DataFrame({
+        "team_location": teams["team_location"],
+        "team_name": teams["team_name"],
+        "start_season": teams["season_year"],
+        "level": teams["avg_weekly_attendance"].astype(float),
+        "win_percentage": teams["win_percentage"].astype(float),
+        "sigma_team": teams["sigma_team"],
+        "venue_id": None,
+        "venue_name": None,
+        "venue_capacity": np.nan,
+        "home_games": FORECAST_HOME_GAMES,
+        "sigma_game": FORECAST_GAME_SIGMA
+    }, index=teams.index)
+
+    if venues is not None:
+        venues = venues.reindex(state.index)
+        has_venue = venues["level"].notna()
+        for column in ["start_season", "level", "win_percentage", "venue_id", "venue_name",
+                       "venue_capacity", "home_games", "sigma_game"]:
+            if column in venues:
+                state[column] = state[column].where(~(has_venue & venues[column].notna()), venues[column])
+
+    state["home_games"] = state["home_games"].astype(int)
+    state["start_season"] = state["start_season"].astype(int)
+    state["sigma_game"] = state["sigma_game"].fillna(FORECAST_GAME_SIGMA)
+    return state
+
+
+def simulate_seasons(state, params, simulations, horizon, rng, batch_size=FORECAST_BATCH_SIZE):
+    """
+    Simulate `simulations` scenarios of `horizon` seasons for every team at once.
+
+    Each batch is a (teams, scenarios) array per season and a (teams, scenarios, games)
+    array for the per-game draws; batching caps memory at batch_size scenarios.
+
+    Returns:
+        dict: 'attendance' (avg per home game) and 'wins', each (teams, simulations, horizon)
+    """
+    n_teams = len(state)
+    capacity = state["venue_capacity"].to_numpy(float)[:, None, None]
+    home_games = state["home_games"].to_numpy()
+    game_mask = np.arange(home_games.max())[None, None, :] < home_games[:, None, None]
+    sigma_team = state["sigma_team"].to_numpy(float)[:, None]
+    sigma_game = state["sigma_game"].to_numpy(float)[:, None, None]
+
+    attendance = np.empty((n_teams, simulations, horizon), dtype=np.float32)
+    wins = np.empty((n_teams, simulations, horizon), dtype=np.int16)
+
+    for start in range(0, simulations, batch_size):
+        n = min(batch_size, simulations - start)
+        batch = slice(start, start + n)
+        log_demand = np.repeat(np.log(state["level"].to_numpy(float))[:, None], n, axis=1)
+        strength = np.repeat(state["win_percentage"].to_numpy(float)[:, None], n, axis=1)
+        last_win_pct = strength.copy()
+
+        for h in range(horizon):
+            strength = np.clip(
+                0.5 + params["rho"] * (strength - 0.5) + params["sigma_w"] * rng.standard_normal((n_teams, n)),
+                0.02, 0.98
+            )
+            season_wins = rng.binomial(FORECAST_GAMES_PER_SEASON, strength)
+            log_demand += (params["alpha"] + params["beta"] * (last_win_pct - 0.5)
+                           + sigma_team * rng.standard_normal((n_teams, n)))
+
+            # np.fmin ignores NaN capacity (no ceiling for teams without a venue)
+            game_noise = sigma_game * rng.standard_normal((n_teams, n, game_mask.shape[2]))
+            games = np.fmin(np.exp(log_demand[:, :, None] + game_noise), capacity)
+            attendance[:, batch, h] = (games * game_mask).sum(axis=2) / home_games[:, None]
+            wins[:, batch, h] = season_wins
+            last_win_pct = season_wins / FORECAST_GAMES_PER_SEASON
+
+    return {"attendance": attendance, "wins": wins}
+
+
+def summarize(state, draws, seed):
+    """Percentile bands per team per forecast season, as one long frame."""
+    attendance, wins = draws["attendance"], draws["wins"]
+    n_teams, simulations, horizon = attendance.shape
+    capacity = state["venue_capacity"].to_numpy(float)[:, None]
+
+    bands = np.percentile(attendance, FORECAST_PERCENTILES, axis=1)          # (P, teams, horizon)
+    share = attendance / capacity[:, :, None]
+    share_bands = np.percentile(share, [5, 50, 95], axis=1)
+    sellout = np.where(np.isnan(capacity), np.nan, (share >= FORECAST_SELLOUT_SHARE).mean(axis=1))
+
+    team_idx = np.repeat(np.arange(n_teams), horizon)
+    step = np.tile(np.arange(horizon), n_teams)
+    forecast = pd.DataFrame({
+        "espn_team_id": state.index.to_numpy()[team_idx],
+        "team_location": state["team_location"].to_numpy()[team_idx],
+        "team_name": state["team_name"].to_numpy()[team_idx],
+        "venue_id": state["venue_id"].to_numpy()[team_idx],
+        "venue_name": state["venue_name"].to_numpy()[team_idx],
+        "venue_capacity": state["venue_capacity"].to_numpy()[team_idx],
+        "season_year": state["start_season"].to_numpy()[team_idx] + step + 1,
+        "horizon": step + 1,
+        "attendance_mean": attendance.mean(axis=1)[team_idx, step].round(0)
+    })
+    for p, band in zip(FORECAST_PERCENTILES, bands):
+        forecast[f"attendance_p{p:02d}"] = band[team_idx, step].round(0)
+    for p, band in zip([5, 50, 95], share_bands):
+        forecast[f"pct_capacity_p{p:02d}"] = (band[team_idx, step] * 100).round(1)
+    forecast["prob_sellout"] = sellout[team_idx, step].round(3)
+    forecast["wins_p50"] = np.median(wins, axis=1)[team_idx, step]
+    forecast["simulations"] = simulations
+    forecast["forecast_seed"] = seed
+    forecast["forecast_generated_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    return forecast
+
+
+if __name__ == "__main__":
+    run_main(main)
@@ -0,0 +1,512 @@
+"""
+ETL Script: Synthetic Scale-Out Data Generator
+Author: Linda B. Low-k-dielectric
+Date: Week 5
+Purpose: Generate deterministic Kaggle-shaped CSVs and ESPN-shaped scoreboard JSON
+         for N seasons x M leagues, so the pipeline can be exercised at 10x-1000x volume
+Note: Output lands in data/synthetic/<label>/ using the same filenames as data/raw/,
+      so any loader that takes a raw_path can read it unchanged.
+"""
+
+# Standard library
+import argparse
+import json
+from datetime import date, timedelta
+
+# Third-party
+import numpy as np
+import pandas as pd
+
+# Local
+from src.utils.logging_config import setup_logger
+from src.utils.profiling import run_main
+from src.utils.config import (
+    SYNTHETIC_DATA_PATH,
+    SYNTHETIC_START_YEAR,
+    SYNTHETIC_WEEKS_PER_SEASON,
+    SYNTHETIC_BASE_GAME_ID,
+    SYNTHETIC_BASE_VENUE_ID,
+    KAGGLE_FILES,
+    ESPN_FILES,
+    TEAM_REFERENCE_FILES
+)
+
+# Logger
+logger = setup_logger(__name__)
+
+# Current franchise identities (latest row per espn_team_id in team_reference_seed.csv)
+# Columns: espn_team_id, city, name, abbreviation, conference, division,
+#          venue_name, venue_city, venue_state, venue_indoor
+LEAGUE_TEMPLATE = [
+    (2, "Buffalo", "Bills", "BUF", "AFC", "East", "Highmark Stadium", "Orchard Park", "NY", 0),
+    (15, "Miami", "Dolphins", "MIA", "AFC", "East", "Hard Rock Stadium", "Miami Gardens", "FL", 0),
+    (17, "New England", "Patriots", "NE", "AFC", "East", "Gillette Stadium", "Foxborough", "MA", 0),
+    (20, "New York", "Jets", "NYJ", "AFC", "East", "MetLife Stadium", "East Rutherford", "NJ", 0),
+    (33, "Baltimore", "Ravens", "BAL", "AFC", "North", "M&T Bank Stadium", "Baltimore", "MD", 0),
+    (4, "Cincinnati", "Bengals", "CIN", "AFC", "North", "Paycor Stadium", "Cincinnati", "OH", 0),
+    (5, "Cleveland", "Browns", "CLE", "AFC", "North", "Cleveland Browns Stadium", "Cleveland", "OH", 0),
+    (23, "Pittsburgh", "Steelers", "PIT", "AFC", "North", "Acrisure Stadium", "Pittsburgh", "PA", 0),
+    (34, "Houston", "Texans", "HOU", "AFC", "South", "NRG Stadium", "Houston", "TX", 1),
+    (11, "Indianapolis", "Colts", "IND", "AFC", "South", "Lucas Oil Stadium", "Indianapolis", "IN", 1),
+    (30, "Jacksonville", "Jaguars", "JAX", "AFC", "South", "EverBank Stadium", "Jacksonville", "FL", 0),
+    (10, "Tennessee", "Titans", "TEN", "AFC", "South", "Nissan Stadium", "Nashville", "TN", 0),
+    (7, "Denver", "Broncos", "DEN", "AFC", "West", "Empower Field at Mile High", "Denver", "CO", 0),
+    (12, "Kansas City", "Chiefs", "KC", "AFC", "West", "GEHA Field at Arrowhead Stadium", "Kansas City", "MO", 0),
+    (13, "Las Vegas", "Raiders", "LV", "AFC", "West", "Allegiant Stadium", "Las Vegas", "NV", 1),
+    (24, "Los Angeles", "Chargers", "LAC", "AFC", "West", "SoFi Stadium", "Inglewood", "CA", 1),
+    (6, "Dallas", "Cowboys", "DAL", "NFC", "East", "AT&T Stadium", "Arlington", "TX", 1),
+    (19, "New York", "Giants", "NYG", "NFC", "East", "MetLife Stadium", "East Rutherford", "NJ", 0),
+    (21, "Philadelphia", "Eagles", "PHI", "NFC", "East", "Lincoln Financial Field", "Philadelphia", "PA", 0),
+    (28, "Washington", "Commanders", "WSH", "NFC", "East", "Northwest Stadium", "Landover", "MD", 0),
+    (3, "Chicago", "Bears", "CHI", "NFC", "North", "Soldier Field", "Chicago", "IL", 0),
+    (8, "Detroit", "Lions", "DET", "NFC", "North", "Ford Field", "Detroit", "MI", 1),
+    (9, "Green Bay", "Packers", "GB", "NFC", "North", "Lambeau Field", "Green Bay", "WI", 0),
+    (16, "Minnesota", "Vikings", "MIN", "NFC", "North", "U.S. Bank Stadium", "Minneapolis", "MN", 1),
+    (1, "Atlanta", "Falcons", "ATL", "NFC", "South", "Mercedes-Benz Stadium", "Atlanta", "GA", 1),
+    (29, "Carolina", "Panthers", "CAR", "NFC", "South", "Bank of America Stadium", "Charlotte", "NC", 0),
+    (18, "New Orleans", "Saints", "NO", "NFC", "South", "Caesars Superdome", "New Orleans", "LA", 1),
+    (27, "Tampa Bay", "Buccaneers", "TB", "NFC", "South", "Raymond James Stadium", "Tampa", "FL", 0),
+    (22, "Arizona", "Cardinals", "ARI", "NFC", "West", "State Farm Stadium", "Glendale", "AZ", 1),
+    (14, "Los Angeles", "Rams", "LAR", "NFC", "West", "SoFi Stadium", "Inglewood", "CA", 1),
+    (25, "San Francisco", "49ers", "SF", "NFC", "West", "Levi's Stadium", "Santa Clara", "CA", 0),
+    (26, "Seattle", "Seahawks", "SEA", "NFC", "West", "Lumen Field", "Seattle", "WA", 0),
+]
+
+TEMPLATE_COLUMNS = [
+    "espn_team_id", "team_city", "team_name", "abbreviation", "conference", "division",
+    "venue_name", "venue_city", "venue_state", "venue_indoor"
+]
+
+# ID spacing keeps game/team/venue ids stable regardless of how many seasons or leagues are generated
+LEAGUE_TEAM_ID_STRIDE = 100
+LEAGUE_GAME_ID_STRIDE = 1_000_000
+SEASON_GAME_ID_STRIDE = 1_000
+
+GAME_DAYS = [("Sun", 0, 0.85), ("Mon", 1, 0.08), ("Thu", -3, 0.07)]
+KICKOFF_TIMES = [("1:00PM", "18:00"), ("4:05PM", "21:05"), ("4:25PM", "21:25"), ("8:20PM", "01:20")]
+NETWORKS = ["CBS", "FOX", "NBC", "ESPN", "ABC", "NFL NET", "Prime Video"]
+PLAYOFF_TEAMS_PER_CONFERENCE = 6
+
+
+def main():
+    """Generate a synthetic dataset from command-line parameters."""
+    parser = argparse.ArgumentParser(description="Generate synthetic Kaggle + ESPN data")
+    parser.add_argument("--seasons", type=int, default=20, help="Seasons per league")
+    parser.add_argument("--leagues", type=int, default=1, help="Number of 32-team leagues")
+    parser.add_argument("--start-year", type=int, default=SYNTHETIC_START_YEAR)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--label", default=None, help="Output folder name (default: s<N>_l<M>)")
+    args = parser.parse_args()
+
+    generate_dataset(args.seasons, args.leagues, args.start_year, args.seed, args.label)
+
+
+def generate_dataset(n_seasons, n_leagues, start_year=SYNTHETIC_START_YEAR, seed=42, label=None):
+    """
+    Generate a full synthetic dataset and write it to disk.
+
+    Args:
+        n_seasons (int): Seasons to simulate per league
+        n_leagues (int): Number of independent 32-team leagues
+        start_year (int): First season year
+        seed (int): Base random seed (same seed -> byte-identical output)
+        label (str): Output folder name under data/synthetic/
+
+    Returns:
+        Path: Directory containing the generated files
+    """
+    label = label or f"s{n_seasons}_l{n_leagues}"
+    output_dir = SYNTHETIC_DATA_PATH / label
+    output_dir.mkdir(parents=True, exist_ok=True)
+    years = list(range(start_year, start_year + n_seasons))
+
+    logger.info(f"Generating synthetic data: {n_seasons} seasons x {n_leagues} leagues (seed={seed})")
+
+    kaggle_frames = {config["name"]: [] for config in KAGGLE_FILES}
+    league_teams = [build_league_teams(league_idx) for league_idx in range(n_leagues)]
+    games_file = output_dir / ESPN_FILES["games_core"]["filename"]
+    n_events = 0
+
+    with open(games_file, "w") as f:
+        f.write("[")
+        for league_idx, teams in enumerate(league_teams):
+            for year in years:
+                rng = np.random.default_rng([seed, league_idx, year])
+                schedule = simulate_season(rng, teams, year, league_idx, start_year)
+
+                attendance, games, standings = build_kaggle_frames(rng, schedule, teams, year)
+                kaggle_frames["attendance"].append(attendance)
+                kaggle_frames["games"].append(games)
+                kaggle_frames["standings"].append(standings)
+
+                for event in build_espn_events(rng, schedule, teams):
+                    f.write(",\n" if n_events else "\n")
+                    json.dump(event, f)
+                    n_events += 1
+        f.write("\n]")
+    logger.info(f"  Wrote {n_events} ESPN events to {games_file}")
+
+    for config in KAGGLE_FILES:
+        df = pd.concat(kaggle_frames[config["name"]], ignore_index=True)
+        df.to_csv(output_dir / config["filename"], index=False, na_rep="NA")
+        logger.info(f"  Wrote {len(df)} rows to {config['filename']}")
+
+    save_espn_teams(league_teams, output_dir)
+    save_team_reference(league_teams, years, output_dir)
+
+    logger.info(f"Synthetic dataset ready: {output_dir}")
+    return output_dir
+
+
+def build_league_teams(league_idx):
+    """Build the team/venue table for one league (league 0 uses real franchise names)."""
+    teams = pd.DataFrame(LEAGUE_TEMPLATE, columns=TEMPLATE_COLUMNS)
+    teams["espn_team_id"] = teams["espn_team_id"] + league_idx * LEAGUE_TEAM_ID_STRIDE
+
+    if league_idx > 0:
+        suffix = f" L{league_idx + 1}"
+        teams["team_name"] = teams["team_name"] + suffix
+        teams["abbreviation"] = teams["abbreviation"] + str(league_idx + 1)
+        teams["venue_name"] = teams["venue_name"] + suffix
+
+    # Shared stadiums (MetLife, SoFi) get one venue id
+    venue_codes = pd.factorize(teams["venue_name"])[0]
+    teams["venue_id"] = SYNTHETIC_BASE_VENUE_ID + league_idx * LEAGUE_TEAM_ID_STRIDE + venue_codes
+    teams["display_name"] = teams["team_city"] + " " + teams["team_name"]
+
+    # Stable per-league colors and venue capacities (independent of season seed)
+    rng = np.random.default_rng([league_idx, len(teams)])
+    teams["color"] = [f"{c:06x}" for c in rng.integers(0, 0xFFFFFF, len(teams))]
+    teams["alternate_color"] = [f"{c:06x}" for c in rng.integers(0, 0xFFFFFF, len(teams))]
+    teams["capacity"] = rng.integers(61_000, 82_000, len(teams))
+    return teams
+
+
+def simulate_season(rng, teams, year, league_idx, start_year):
+    """
+    Simulate one regular season (17 weeks, one bye per team).
+
+    Returns:
+        pd.DataFrame: One row per game with team indexes, scores, attendance and kickoff info
+    """
+    n_teams = len(teams)
+    strength = rng.normal(0, 1, n_teams)
+
+    # Byes in pairs across weeks 5-14 so every other week has an even number of teams
+    bye_weeks = 5 + (rng.permutation(n_teams) // 2) % 10
+
+    home_idx, away_idx, weeks = [], [], []
+    home_games = np.zeros(n_teams, dtype=int)
+    for week in range(1, SYNTHETIC_WEEKS_PER_SEASON + 1):
+        active = rng.permutation(np.flatnonzero(bye_weeks != week))
+        first, second = active[0::2], active[1::2]
+
+        # Give home field to whichever side has hosted fewer games so far
+        swap = home_games[first] > home_games[second]
+        home, away = np.where(swap, second, first), np.where(swap, first, second)
+        home_games[home] += 1
+
+        home_idx.append(home)
+        away_idx.append(away)
+        weeks.append(np.full(len(home), week))
+
+    schedule = pd.DataFrame({
+        "home_idx": np.concatenate(home_idx),
+        "away_idx": np.concatenate(away_idx),
+        "week": np.concatenate(weeks)
+    })
+    n_games = len(schedule)
+
+    # Scores: Poisson around a strength differential, home field worth ~2.5 points
+    diff = strength[schedule["home_idx"]] - strength[schedule["away_idx"]]
+    home_score = rng.poisson(np.clip(22 + 3.5 * diff + 1.25, 3, None))
+    away_score = rng.poisson(np.clip(22 - 3.5 * diff - 1.25, 3, None))
+    tied = home_score == away_score
+    home_score = home_score + np.where(tied & (rng.random(n_games) < 0.5), 3, 0)
+    away_score = away_score + np.where(home_score == away_score, 3, 0)
+    schedule["home_score"] = home_score
+    schedule["away_score"] = away_score
+
+    # Attendance: fill rate of the home venue, nudged by home team strength
+    capacity = teams["capacity"].to_numpy()[schedule["home_idx"]]
+    fill = np.clip(rng.normal(0.93 + 0.02 * strength[schedule["home_idx"]], 0.05), 0.35, 1.08)
+    schedule["attendance"] = (capacity * fill).astype(np.int64)
+
+    # Kickoff day/time and calendar date (week 1 Sunday = first Sunday on/after Sep 7)
+    day_choice = rng.choice(len(GAME_DAYS), n_games, p=[p for _, _, p in GAME_DAYS])
+    time_choice = rng.integers(0, len(KICKOFF_TIMES), n_games)
+    week1_sunday = date(year, 9, 7) + timedelta(days=(6 - date(year, 9, 7).weekday()) % 7)
+    schedule["game_date"] = [
+        week1_sunday + timedelta(days=7 * (int(w) - 1) + GAME_DAYS[d][1])
+        for w, d in zip(schedule["week"], day_choice)
+    ]
+    schedule["day"] = [GAME_DAYS[d][0] for d in day_choice]
+    schedule["time_idx"] = time_choice
+
+    schedule["year"] = year
+    schedule["game_id"] = (
+        SYNTHETIC_BASE_GAME_ID
+        + league_idx * LEAGUE_GAME_ID_STRIDE
+        + (year - start_year) * SEASON_GAME_ID_STRIDE
+        + np.arange(n_games)
+    )
+    schedule["strength_home"] = strength[schedule["home_idx"]]
+    return schedule
+
+
+def build_kaggle_frames(rng, schedule, teams, year):
+    """Convert a simulated season into Kaggle attendance, games and standings frames."""
+    n_games = len(schedule)
+    home = teams.iloc[schedule["home_idx"]].reset_index(drop=True)
+    away = teams.iloc[schedule["away_idx"]].reset_index(drop=True)
+    home_won = schedule["home_score"] > schedule["away_score"]
+
+    games = pd.DataFrame({
+        "year": year,
+        "week": schedule["week"],
+        "home_team": home["display_name"],
+        "away_team": away["display_name"],
+        "winner": np.where(home_won, home["display_name"], away["display_name"]),
+        "tie": pd.NA,
+        "day": schedule["day"],
+        "date": [f"{d.strftime('%B')} {d.day}" for d in schedule["game_date"]],
+        "time": [KICKOFF_TIMES[t][0] for t in schedule["time_idx"]],
+        "pts_win": np.maximum(schedule["home_score"], schedule["away_score"]),
+        "pts_loss": np.minimum(schedule["home_score"], schedule["away_score"]),
+        "yds_win": rng.normal(380, 60, n_games).astype(int),
+        "turnovers_win": rng.poisson(1.0, n_games),
+        "yds_loss": rng.normal(310, 60, n_games).astype(int),
+        "turnovers_loss": rng.poisson(1.8, n_games),
+        "home_team_name": home["team_name"],
+        "home_team_city": home["team_city"],
+        "away_team_name": away["team_name"],
+        "away_team_city": away["team_city"]
+    })
+
+    # One row per team per game played (home and away perspectives)
+    team_games = pd.concat([
+        pd.DataFrame({
+            "team_idx": schedule["home_idx"], "week": schedule["week"], "is_home": True,
+            "attendance": schedule["attendance"],
+            "points_for": schedule["home_score"], "points_against": schedule["away_score"]
+        }),
+        pd.DataFrame({
+            "team_idx": schedule["away_idx"], "week": schedule["week"], "is_home": False,
+            "attendance": schedule["attendance"],
+            "points_for": schedule["away_score"], "points_against": schedule["home_score"]
+        })
+    ], ignore_index=True)
+    team_games["won"] = team_games["points_for"] > team_games["points_against"]
+    team_games["home_attendance"] = team_games["attendance"].where(team_games["is_home"], 0)
+    team_games["away_attendance"] = team_games["attendance"].where(~team_games["is_home"], 0)
+
+    season = team_games.groupby("team_idx").agg(
+        wins=("won", "sum"),
+        games=("won", "size"),
+        points_for=("points_for", "sum"),
+        points_against=("points_against", "sum"),
+        home=("home_attendance", "sum"),
+        away=("away_attendance", "sum")
+    ).reindex(range(len(teams)), fill_value=0)
+    season["total"] = season["home"] + season["away"]
+
+    # Weekly attendance grid: every team x every week, NA on bye weeks
+    grid = pd.MultiIndex.from_product(
+        [range(len(teams)), range(1, SYNTHETIC_WEEKS_PER_SEASON + 1)], names=["team_idx", "week"]
+    )
+    weekly = (
+        team_games.set_index(["team_idx", "week"])["attendance"]
+        .reindex(grid)
+        .astype("Int64")
+        .reset_index()
+    )
+    idx = weekly["team_idx"].to_numpy()
+    attendance = pd.DataFrame({
+        "team": teams["team_city"].to_numpy()[idx],
+        "team_name": teams["team_name"].to_numpy()[idx],
+        "year": year,
+        "total": season["total"].to_numpy()[idx],
+        "home": season["home"].to_numpy()[idx],
+        "away": season["away"].to_numpy()[idx],
+        "week": weekly["week"],
+        "weekly_attendance": weekly["attendance"]
+    })
+
+    standings = build_standings(rng, season, teams, year)
+    return attendance, games, standings
+
+
+def build_standings(rng, season, teams, year):
+    """Build the Kaggle standings frame from per-team season totals."""
+    n_teams = len(teams)
+    differential = season["points_for"] - season["points_against"]
+    margin = (differential / season["games"]).round(1)
+    sos = rng.normal(0, 1.5, n_teams).round(1)
+
+    standings = pd.DataFrame({
+        "team": teams["team_city"],
+        "team_name": teams["team_name"],
+        "year": year,
+        "wins": season["wins"].to_numpy(),
+        "loss": (season["games"] - season["wins"]).to_numpy(),
+        "points_for": season["points_for"].to_numpy(),
+        "points_against": season["points_against"].to_numpy(),
+        "points_differential": differential.to_numpy(),
+        "margin_of_victory": margin.to_numpy(),
+        "strength_of_schedule": sos,
+        "simple_rating": (margin.to_numpy() + sos).round(1),
+        "offensive_ranking": rng.normal(0, 4, n_teams).round(1),
+        "defensive_ranking": rng.normal(0, 4, n_teams).round(1)
+    })
+
+    # Playoffs: top N per conference by wins (simple_rating breaks ties)
+    ranked = standings.assign(conference=teams["conference"]).sort_values(
+        ["conference", "wins", "simple_rating"], ascending=[True, False, False]
+    )
+    playoff_idx = ranked.groupby("conference").head(PLAYOFF_TEAMS_PER_CONFERENCE).index
+    standings["playoffs"] = np.where(standings.index.isin(playoff_idx), "Playoffs", "No Playoffs")
+
+    champion = standings.loc[playoff_idx, "simple_rating"].idxmax()
+    standings["sb_winner"] = np.where(standings.index == champion, "Won Superbowl", "No Superbowl")
+    return standings
+
+
+def build_espn_events(rng, schedule, teams):
+    """
+    Yield ESPN scoreboard event dicts for a simulated season.
+
+    Every path referenced by the ESPN_GAMES_*_SCHEMA definitions in config.py is populated,
+    plus a handful of the excluded fields (uids, links) so payload size is realistic.
+    """
+    n_games = len(schedule)
+    zero_attendance = rng.random(n_games) < 0.02  # ESPN reports 0 for some games
+    networks = rng.integers(0, len(NETWORKS), (n_games, 2))
+    team_records = teams.to_dict("records")
+
+    for i, game in enumerate(schedule.itertuples(index=False)):
+        home = team_records[game.home_idx]
+        away = team_records[game.away_idx]
+        game_id = str(game.game_id)
+        kickoff = KICKOFF_TIMES[game.time_idx][1]
+        kickoff_date = game.game_date + timedelta(days=1) if kickoff < "06:00" else game.game_date
+        start = f"{kickoff_date.isoformat()}T{kickoff}Z"
+        net1, net2 = NETWORKS[networks[i, 0]], NETWORKS[networks[i, 1]]
+
+        yield {
+            "id": game_id,
+            "uid": f"s:20~l:28~e:{game_id}",
+            "date": start,
+            "name": f"{away['display_name']} at {home['display_name']}",
+            "shortName": f"{away['abbreviation']} @ {home['abbreviation']}",
+            "season": {"year": int(game.year), "type": 2, "slug": "regular-season"},
+            "week": {"number": int(game.week)},
+            "competitions": [{
+                "id": game_id,
+                "uid": f"s:20~l:28~e:{game_id}~c:{game_id}",
+                "date": start,
+                "attendance": 0 if zero_attendance[i] else int(game.attendance),
+                "type": {"id": "1", "abbreviation": "STD"},
+                "timeValid": True,
+                "neutralSite": False,
+                "conferenceCompetition": bool(home["conference"] == away["conference"]),
+                "playByPlayAvailable": True,
+                "recent": False,
+                "venue": {
+                    "id": str(home["venue_id"]),
+                    "fullName": home["venue_name"],
+                    "address": {"city": home["venue_city"], "state": home["venue_state"], "country": "USA"},
+                    "indoor": bool(home["venue_indoor"])
+                },
+                "competitors": [
+                    build_espn_competitor(rng, home, "home", 0, game.home_score, game.away_score),
+                    build_espn_competitor(rng, away, "away", 1, game.away_score, game.home_score)
+                ],
+                "notes": [],
+                "broadcasts": [{"market": "national", "names": [net1, net2]}],
+                "broadcast": f"{net1}/{net2}",
+                "geoBroadcasts": [{
+                    "type": {"id": "1", "shortName": "TV"},
+                    "market": {"id": "1", "type": "National"},
+                    "media": {"shortName": net1},
+                    "lang": "en",
+                    "region": "us"
+                }],
+                "format": {"regulation": {"periods": 4}},
+                "startDate": start,
+                "headlines": [{
+                    "type": "Recap",
+                    "description": f"{home['team_name'] if game.home_score > game.away_score else away['team_name']} "
+                                   f"win {max(game.home_score, game.away_score)}-{min(game.home_score, game.away_score)}.",
+                    "shortLinkText": f"{away['team_name']} vs. {home['team_name']}"
+                }]
+            }],
+            "status": {"type": {"id": "3", "name": "STATUS_FINAL", "state": "post", "completed": True}}
+        }
+
+
+def build_espn_competitor(rng, team, home_away, order, score, opponent_score):
+    """Build one ESPN competitor entry with quarter linescores that sum to the final score."""
+    quarters = rng.multinomial(int(score), [0.22, 0.28, 0.22, 0.28])
+    team_id = str(team["espn_team_id"])
+    return {
+        "id": team_id,
+        "uid": f"s:20~l:28~t:{team_id}",
+        "type": "team",
+        "order": order,
+        "homeAway": home_away,
+        "winner": bool(score > opponent_score),
+        "team": {
+            "id": team_id,
+            "uid": f"s:20~l:28~t:{team_id}",
+            "location": team["team_city"],
+            "name": team["team_name"],
+            "abbreviation": team["abbreviation"],
+            "displayName": team["display_name"],
+            "shortDisplayName": team["team_name"],
+            "color": team["color"],
+            "alternateColor": team["alternate_color"],
+            "isActive": True,
+            "venue": {"id": str(team["venue_id"])},
+            "logo": f"https://a.espncdn.com/i/teamlogos/nfl/500/scoreboard/{team['abbreviation'].lower()}.png"
+        },
+        "score": str(score),
+        "linescores": [{"value": float(q)} for q in quarters]
+    }
+
+
+def save_espn_teams(league_teams, output_dir):
+    """Write ESPN teams payload (list of {'team': {...}}) for all leagues."""
+    teams = pd.concat(league_teams, ignore_index=True)
+    payload = [
+        {"team": {
+            "id": str(row.espn_team_id),
+            "abbreviation": row.abbreviation,
+            "displayName": row.display_name,
+            "shortDisplayName": row.team_name,
+            "location": row.team_city,
+            "name": row.team_name,
+            "color": row.color,
+            "isActive": True,
+            "logo": f"https://a.espncdn.com/i/teamlogos/nfl/500/{row.abbreviation.lower()}.png"
+        }}
+        for row in teams.itertuples(index=False)
+    ]
+    output_file = output_dir / ESPN_FILES["teams"]["filename"]
+    with open(output_file, "w") as f:
+        json.dump(payload, f, indent=2)
+    logger.info(f"  Wrote {len(payload)} teams to {output_file.name}")
+
+
+def save_team_reference(league_teams, years, output_dir):
+    """Write a team_reference.csv covering every synthetic team for the generated years."""
+    teams = pd.concat(league_teams, ignore_index=True)
+    reference = teams[["team_city", "team_name", "espn_team_id", "conference", "division"]].assign(
+        active_years=f"{years[0]}-{years[-1]}"
+    )
+    output_file = output_dir / TEAM_REFERENCE_FILES["output"]["filename"]
+    reference.to_csv(output_file, index=False)
+    logger.info(f"  Wrote {len(reference)} team mappings to {output_file.name}")
+
+
+if __name__ == "__main__":
+    run_main(main)
@@ -2,11 +2,19 @@
 ETL Script: Current Season Data Ingestion
 Author: Linda B. Low-k-dielectric
 Date: Week 1
-Purpose: Pull current NFL season data (2020-2024) from ESPN API
+Purpose: Pull current season data (2020-2024) for each league in config.LEAGUES from ESPN API
+Note: Each pull is also appended to the compressed raw archive (data/raw/archive/espn_games/),
+      one block per season/week that changed, so past pulls are kept and a single season or
+      week can be re-read without touching the rest (src/utils/raw_archive.py).
+      Leagues are fetched concurrently and share one connection budget (src/utils/leagues.py);
+      a non-default league's pull goes to data/raw/<league>/ with its own archive.
 """
 
 # Standard library
+import argparse
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
@@ -15,78 +23,184 @@ import requests
 
 # Local
 from src.utils.logging_config import setup_logger
-from src.utils.config import RAW_DATA_PATH, ESPN_TEAMS_URL, ESPN_SCOREBOARD_URL
+from src.utils.profiling import run_main
+from src.utils.json_stream import iter_json_records
+from src.utils.raw_archive import append_events, archive_summary
+from src.utils.leagues import ConnectionBudget, parse_leagues, league_base_url, league_raw_path
+from src.utils.config import (
+    RAW_DATA_PATH,
+    RAW_ARCHIVE_PATH,
+    LEAGUES,
+    DEFAULT_LEAGUE,
+    PIPELINE_LEAGUES,
+    LEAGUE_HTTP_CONNECTIONS,
+    LEAGUE_REQUEST_TIMEOUT_SECONDS
+)
 
 # Logger
 logger = setup_logger(__name__)
 
+_thread_local = threading.local()
+
 def main():
-    """Fetch current season NFL data from ESPN API."""
-    logger.info("Starting current season data ingestion from ESPN")
-    
-    ensure_directories()
-    teams = fetch_teams()
-    games = fetch_games_for_seasons([2020, 2021, 2022, 2023, 2024])
+    """Fetch current season data for each configured league from the ESPN API."""
+    parser = argparse.ArgumentParser(description="Pull ESPN teams and games")
+    parser.add_argument("--leagues", default=",".join(PIPELINE_LEAGUES),
+                        help=f"Comma-separated leagues ({', '.join(LEAGUES)})")
+    parser.add_argument("--api-root", default=None,
+                        help="Serve every league from this root instead (e.g. http://127.0.0.1:8765 for the stub)")
+    parser.add_argument("--raw-path", type=Path, default=RAW_DATA_PATH, help="Raw output directory")
+    parser.add_argument("--connections", type=int, default=LEAGUE_HTTP_CONNECTIONS,
+                        help="Concurrent requests shared by all leagues")
+    parser.add_argument("--from-file", type=Path, default=None,
+                        help="Archive an existing espn_games.json pull (for the first --leagues league) instead of fetching")
+    args = parser.parse_args()
+    try:
+        leagues = parse_leagues(args.leagues)
+    except ValueError as e:
+        parser.error(str(e))
     
-    save_data(teams, "espn_teams.json")
-    save_data(games, "espn_games.json")
+    if args.from_file:
+        league_path = league_raw_path(args.raw_path, leagues[0])
+        ensure_directories(league_path)
+        logger.info(f"Archiving existing {leagues[0]} pull: {args.from_file}")
+        archive_games(iter_json_records(args.from_file), league_path / RAW_ARCHIVE_PATH.name)
+        return
     
+    logger.info(f"Starting current season data ingestion from ESPN ({', '.join(leagues)})")
+    ingest_leagues(leagues, args.raw_path, args.api_root, args.connections)
     logger.info("Current season ingestion complete")
 
-def ensure_directories():
+def ensure_directories(raw_path=RAW_DATA_PATH):
     """Create necessary directories."""
-    RAW_DATA_PATH.mkdir(parents=True, exist_ok=True)
-    logger.debug(f"Ensured directory exists: {RAW_DATA_PATH}")
+    raw_path.mkdir(parents=True, exist_ok=True)
+    logger.debug(f"Ensured directory exists: {raw_path}")
 
-def fetch_teams():
-    """Fetch NFL team data from ESPN API."""
-    logger.info(f"Fetching teams from ESPN API")
+def ingest_leagues(leagues, raw_path=RAW_DATA_PATH, api_root=None, connections=LEAGUE_HTTP_CONNECTIONS):
+    """
+    Fetch, save and archive every league concurrently under one shared connection budget.
     
-    response = requests.get(ESPN_TEAMS_URL)
-    response.raise_for_status()
+    Returns:
+        dict: league -> {"teams": n, "games": n}
+    """
+    budget = ConnectionBudget(connections)
+    with ThreadPoolExecutor(max_workers=len(leagues), thread_name_prefix="league") as pool:
+        futures = {
+            league: pool.submit(ingest_league, league, budget, raw_path, api_root)
+            for league in leagues
+        }
+        results = {league: future.result() for league, future in futures.items()}
+    
+    logger.info(
+        f"Fetched {len(leagues)} league(s) with at most {budget.peak} of {budget.connections} "
+        f"connections in use (" + ", ".join(f"{k}: {v}" for k, v in sorted(budget.peak_by_league.items())) + ")"
+    )
+    return results
+
+def ingest_league(league, budget, raw_path=RAW_DATA_PATH, api_root=None):
+    """Fetch one league's teams and games, save the latest pull and archive it."""
+    base_url = league_base_url(league, api_root)
+    league_path = league_raw_path(raw_path, league)
+    ensure_directories(league_path)
+    
+    with budget.league(league):
+        teams = fetch_teams(base_url, league, budget)
+        games = fetch_games_for_seasons(LEAGUES[league]["seasons"], base_url, league, budget)
+    
+    save_data(teams, "espn_teams.json", league_path)
+    save_data(games, "espn_games.json", league_path)
+    archive_games(games, league_path / RAW_ARCHIVE_PATH.name)
+    return {"teams": len(teams), "games": len(games)}
+
+def fetch_teams(base_url=LEAGUES[DEFAULT_LEAGUE]["base_url"], league=DEFAULT_LEAGUE, budget=None):
+    """Fetch a league's team data from ESPN API."""
+    logger.info(f"[{league}] Fetching teams from ESPN API")
     
-    data = response.json()
+    budget = budget or ConnectionBudget(1)
+    with budget.slot(league):
+        data = get_json(f"{base_url}/teams", LEAGUES[league]["teams_params"])
     teams = data['sports'][0]['leagues'][0]['teams']
     
-    logger.info(f"Retrieved {len(teams)} teams")
+    logger.info(f"[{league}] Retrieved {len(teams)} teams")
     return teams
 
-def fetch_games_for_seasons(years):
+def fetch_games_for_seasons(years, base_url=LEAGUES[DEFAULT_LEAGUE]["base_url"], league=DEFAULT_LEAGUE, budget=None):
     """
     Fetch game data for multiple seasons.
-    Note: ESPN API has rate limits - using basic approach for portfolio demo.
+    
+    One scoreboard request per season (or per season week, for leagues with "weeks"),
+    issued concurrently within the league's share of the connection budget. Games are
+    returned in season/week order whatever order the responses arrive in.
     """
-    all_games = []
+    league_config = LEAGUES[league]
+    budget = budget or ConnectionBudget(1)
+    pages = [
+        (year, week)
+        for year in years
+        for week in (league_config["weeks"] or [None])
+    ]
     
-    for year in years:
-        logger.info(f"Fetching games for {year} season")
-        
-        # Get regular season games (seasontype=2)
-        url = f"{ESPN_SCOREBOARD_URL}?dates={year}&seasontype=2&limit=300"
-        
+    def fetch_page(page):
+        year, week = page
+        params = {"dates": year, **league_config["scoreboard_params"]}
+        if week is not None:
+            params["week"] = week
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
-            
-            if 'events' in data:
-                games = data['events']
-                all_games.extend(games)
-                logger.info(f"  Retrieved {len(games)} games for {year}")
+            with budget.slot(league):
+                data = get_json(f"{base_url}/scoreboard", params)
+            return data.get('events', [])
         except Exception as e:
-            logger.error(f"Error fetching {year} season: {e}")
+            logger.error(f"[{league}] Error fetching {year} season" + (f" week {week}" if week else "") + f": {e}")
+            return []
+    
+    with ThreadPoolExecutor(max_workers=budget.connections) as pool:
+        results = list(pool.map(fetch_page, pages))
+    
+    all_games = []
+    for year in years:
+        season_games = [game for (page_year, _), games in zip(pages, results) if page_year == year for game in games]
+        all_games.extend(season_games)
+        logger.info(f"[{league}]   Retrieved {len(season_games)} games for {year}")
     
-    logger.info(f"Total games retrieved: {len(all_games)}")
+    logger.info(f"[{league}] Total games retrieved: {len(all_games)}")
     return all_games
 
-def save_data(data, filename):
-    """Save data to JSON file."""
-    output_file = RAW_DATA_PATH / filename
+def get_json(url, params=None):
+    """GET a JSON payload on this thread's session."""
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = _thread_local.session = requests.Session()
+    
+    response = session.get(url, params=params, timeout=LEAGUE_REQUEST_TIMEOUT_SECONDS)
+    response.raise_for_status()
+    return response.json()
+
+def save_data(data, filename, raw_path=RAW_DATA_PATH):
+    """Save the latest pull to a compact JSON file (history lives in the raw archive)."""
+    output_file = raw_path / filename
     
     with open(output_file, 'w') as f:
-        json.dump(data, f, indent=2)
+        json.dump(data, f, separators=(",", ":"))
     
     logger.info(f"Saved data to {output_file}")
 
+
+def archive_games(games, archive_dir=RAW_ARCHIVE_PATH):
+    """Append changed season/week blocks of a pull to the raw archive."""
+    written = append_events(games, "espn_games", archive_dir)
+    summary = archive_summary("espn_games", archive_dir)
+    
+    if written:
+        weeks = ", ".join(f"{e['season']}w{e['week']}" for e in written[:8]) + (" ..." if len(written) > 8 else "")
+        logger.info(f"Archived {len(written)} changed season/week blocks ({weeks})")
+    else:
+        logger.info("Archive unchanged - pull matches the latest archived blocks")
+    for season, stats in sorted(summary["seasons"].items()):
+        logger.info(
+            f"  {season}: {stats['weeks']} weeks, {stats['records']} games, "
+            f"{stats['bytes'] / 1e3:,.0f} KB ({stats['raw_bytes'] / max(stats['bytes'], 1):.1f}x compressed)"
+        )
+    return written
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run_main(main)
\ No newline at end of file
@@ -0,0 +1,302 @@
+"""
+ETL Script: Per-Game Summary/Boxscore Ingestion
+Author: Linda B. Low-k-dielectric
+Date: Week 5
+Purpose: Backfill ESPN game summaries (boxscore team stats) for every event in espn_games.json
+Note: ingest_current_season only pulls season-level scoreboard pages. This script enqueues
+      every event id into a SQLite work queue, fetches /summary?event=<id> with bounded
+      concurrency and checkpoints results in batches - a crashed backfill picks up where
+      it stopped on the next run. Runs offline against the stub:
+          python -m src.utils.espn_stub_server --snapshots data/raw
+          python -m src.etl.ingest_game_details --base-url http://127.0.0.1:8765/nfl
+"""
+
+# Standard library
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Third-party
+import requests
+
+# Local
+from src.utils.logging_config import setup_logger
+from src.utils.profiling import run_main
+from src.utils.json_stream import iter_json_records
+from src.utils.config import (
+    RAW_DATA_PATH,
+    ESPN_SUMMARY_URL,
+    GAME_DETAIL_QUEUE_PATH,
+    GAME_DETAIL_WORKERS,
+    GAME_DETAIL_BATCH_SIZE,
+    GAME_DETAIL_MAX_ATTEMPTS,
+    GAME_DETAIL_RETRIES,
+    GAME_DETAIL_TIMEOUT_SECONDS
+)
+
+# Logger
+logger = setup_logger(__name__)
+
+QUEUE_TABLE = "game_detail_queue"
+SUMMARIES_TABLE = "game_summaries"
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_thread_local = threading.local()
+
+
+def main():
+    """Enqueue all known events and work the queue until it is empty."""
+    parser = argparse.ArgumentParser(description="Resumable ESPN game summary backfill")
+    parser.add_argument("--events-file", type=Path, default=RAW_DATA_PATH / "espn_games.json")
+    parser.add_argument("--queue-db", type=Path, default=GAME_DETAIL_QUEUE_PATH)
+    parser.add_argument("--base-url", default=None, help="Override ESPN base URL (e.g. a local stub)")
+    parser.add_argument("--workers", type=int, default=GAME_DETAIL_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=GAME_DETAIL_BATCH_SIZE)
+    parser.add_argument("--limit", type=int, default=None, help="Process at most N events this run")
+    parser.add_argument("--retry-failed", action="store_true", help="Re-queue events parked as failed")
+    parser.add_argument("--status", action="store_true", help="Only report queue status")
+    args = parser.parse_args()
+
+    summary_url = f"{args.base_url.rstrip('/')}/summary" if args.base_url else ESPN_SUMMARY_URL
+
+    logger.info("Starting per-game summary ingestion")
+    conn = open_queue(args.queue_db)
+    try:
+        if not args.status:
+            if args.events_file.exists():
+                added = enqueue_events(conn, args.events_file)
+                logger.info(f"Enqueued {added} new events from {args.events_file.name}")
+            else:
+                logger.warning(f"Events file not found: {args.events_file} (working existing queue)")
+
+            if args.retry_failed:
+                requeued = requeue_failed(conn)
+                logger.info(f"Re-queued {requeued} failed events")
+
+            run_backfill(conn, summary_url, args.workers, args.batch_size, args.limit)
+
+        log_queue_status(conn)
+    finally:
+        conn.close()
+
+
+def open_queue(queue_path=GAME_DETAIL_QUEUE_PATH):
+    """
+    Open (or create) the work queue database.
+
+    Queue rows stay 'pending' until their summary is committed, so anything in flight
+    when a run dies is simply picked up again next time.
+    """
+    queue_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(queue_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {QUEUE_TABLE} (
+            event_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            updated_at TEXT
+        )
+    """)
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{QUEUE_TABLE}_status ON {QUEUE_TABLE} (status)")
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {SUMMARIES_TABLE} (
+            event_id TEXT PRIMARY KEY,
+            payload TEXT NOT NULL,
+            fetched_at TEXT NOT NULL
+        )
+    """)
+    conn.commit()
+    return conn
+
+
+def enqueue_events(conn, events_file):
+    """Add every event id from a raw events file (already-queued ids are left alone)."""
+    before = conn.total_changes
+    conn.executemany(
+        f"INSERT OR IGNORE INTO {QUEUE_TABLE} (event_id) VALUES (?)",
+        ((str(event["id"]),) for event in iter_json_records(events_file) if event.get("id"))
+    )
+    conn.commit()
+    return conn.total_changes - before
+
+
+def requeue_failed(conn):
+    """Give parked events a fresh set of attempts."""
+    cursor = conn.execute(
+        f"UPDATE {QUEUE_TABLE} SET status = 'pending', attempts = 0 WHERE status = 'failed'"
+    )
+    conn.commit()
+    return cursor.rowcount
+
+
+def pending_events(conn, limit=None):
+    """Event ids still to fetch, in a stable order."""
+    query = f"SELECT event_id FROM {QUEUE_TABLE} WHERE status = 'pending' ORDER BY event_id"
+    if limit:
+        query += f" LIMIT {int(limit)}"
+    return [row[0] for row in conn.execute(query)]
+
+
+def run_backfill(conn, summary_url, workers=GAME_DETAIL_WORKERS, batch_size=GAME_DETAIL_BATCH_SIZE, limit=None):
+    """
+    Fetch summaries for pending events and checkpoint them in batches.
+
+    At most workers * 2 requests are in flight; completed results are written in one
+    transaction every batch_size events (and on the way out, including Ctrl+C).
+
+    Returns:
+        dict: fetched / failed counts for this run
+    """
+    todo = pending_events(conn, limit)
+    if not todo:
+        logger.info("Queue is empty - nothing to fetch")
+        return {"fetched": 0, "failed": 0}
+
+    logger.info(f"Fetching {len(todo)} summaries ({workers} workers, batch size {batch_size})")
+    stats = {"fetched": 0, "failed": 0}
+    buffer = []
+    started = time.perf_counter()
+    remaining = iter(todo)
+    in_flight = set()
+
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        for event_id in remaining:
+            in_flight.add(pool.submit(fetch_summary, summary_url, event_id))
+            if len(in_flight) >= workers * 2:
+                break
+
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                buffer.append(future.result())
+                next_id = next(remaining, None)
+                if next_id is not None:
+                    in_flight.add(pool.submit(fetch_summary, summary_url, next_id))
+
+            if len(buffer) >= batch_size:
+                write_batch(conn, buffer, stats)
+                buffer = []
+                log_progress(stats, len(todo), started)
+    except KeyboardInterrupt:
+        logger.warning("Interrupted - checkpointing completed results")
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    finally:
+        if buffer:
+            write_batch(conn, buffer, stats)
+        pool.shutdown(wait=True)
+
+    log_progress(stats, len(todo), started)
+    return stats
+
+
+def fetch_summary(summary_url, event_id):
+    """
+    Fetch one game summary, retrying transient errors with exponential backoff.
+
+    Returns:
+        tuple: (event_id, payload text or None, error message or None)
+    """
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = _thread_local.session = requests.Session()
+
+    error = None
+    for attempt in range(GAME_DETAIL_RETRIES + 1):
+        if attempt:
+            time.sleep(0.5 * 2 ** (attempt - 1))
+        try:
+            response = session.get(
+                summary_url, params={"event": event_id}, timeout=GAME_DETAIL_TIMEOUT_SECONDS
+            )
+            if response.status_code in RETRY_STATUS_CODES:
+                error = f"HTTP {response.status_code}"
+                continue
+            response.raise_for_status()
+            json.loads(response.text)  # store only payloads that parse
+            return event_id, response.text, None
+        except (requests.HTTPError, ValueError) as e:
+            return event_id, None, f"{type(e).__name__}: {e}"
+        except requests.RequestException as e:
+            # Connection/timeout and any other transport error (redirect loops, broken
+            # chunked bodies, bad URLs): retry, then count as a failed attempt
+            error = f"{type(e).__name__}: {e}"
+    return event_id, None, error
+
+
+def write_batch(conn, results, stats):
+    """Store fetched payloads and advance the queue in a single transaction."""
+    now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    fetched = [(event_id, payload, now) for event_id, payload, error in results if error is None]
+    failed = [
+        (error, now, GAME_DETAIL_MAX_ATTEMPTS, event_id)
+        for event_id, payload, error in results if error is not None
+    ]
+
+    with conn:
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {SUMMARIES_TABLE} (event_id, payload, fetched_at) VALUES (?, ?, ?)",
+            fetched
+        )
+        conn.executemany(
+            f"UPDATE {QUEUE_TABLE} SET status = 'done', attempts = attempts + 1, "
+            f"last_error = NULL, updated_at = ? WHERE event_id = ?",
+            [(now, event_id) for event_id, _, _ in fetched]
+        )
+        conn.executemany(
+            f"UPDATE {QUEUE_TABLE} SET attempts = attempts + 1, last_error = ?, updated_at = ?, "
+            f"status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END WHERE event_id = ?",
+            failed
+        )
+
+    stats["fetched"] += len(fetched)
+    stats["failed"] += len(failed)
+    for error, _, _, event_id in failed[:3]:
+        logger.warning(f"  {event_id}: {error}")
+
+
+def log_progress(stats, total, started):
+    """Log checkpoint progress and throughput."""
+    processed = stats["fetched"] + stats["failed"]
+    elapsed = time.perf_counter() - started
+    rate = processed / elapsed if elapsed else 0.0
+    logger.info(
+        f"  Checkpoint: {processed}/{total} processed "
+        f"({stats['fetched']} fetched, {stats['failed']} failed) - {rate:.1f} events/s"
+    )
+
+
+def queue_status(conn):
+    """Counts by queue status."""
+    return dict(conn.execute(f"SELECT status, COUNT(*) FROM {QUEUE_TABLE} GROUP BY status").fetchall())
+
+
+def log_queue_status(conn):
+    """Log the queue summary."""
+    status = queue_status(conn)
+    logger.info(
+        f"Queue status: {status.get('done', 0)} done, {status.get('pending', 0)} pending, "
+        f"{status.get('failed', 0)} failed"
+    )
+
+
+def iter_summaries(queue_path=GAME_DETAIL_QUEUE_PATH):
+    """Yield (event_id, summary dict) for every stored payload."""
+    conn = sqlite3.connect(queue_path)
+    try:
+        for event_id, payload in conn.execute(f"SELECT event_id, payload FROM {SUMMARIES_TABLE}"):
+            yield event_id, json.loads(payload)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    run_main(main)
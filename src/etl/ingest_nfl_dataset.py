@@ -14,6 +14,7 @@ from kaggle.api.kaggle_api_extended import KaggleApi
 
 # Local
 from src.utils.logging_config import setup_logger
+from src.utils.profiling import run_main
 from src.utils.config import RAW_DATA_PATH, KAGGLE_DATASET_ID
 
 # Logger
@@ -78,4 +79,4 @@ def download_dataset(api):
     logger.info("Download complete")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run_main(main)
\ No newline at end of file
@@ -0,0 +1,213 @@
+"""
+ETL Script: Season-Partitioned Database Load
+Author: Linda B. Low-k-dielectric
+Date: Week 5
+Purpose: Load the same raw tables as load_to_database into one SQLite file per season range
+         (data/processed/partitions/seasons_2000_2004.db, ...) plus shared.db
+Note: Sources are read and split once; each partition file is then written by its own
+      process into a temp file and swapped in atomically, so partitions load in parallel and
+      a refresh of recent seasons (--seasons 2024) leaves the historical files untouched.
+      Read back with src.utils.partitions.open_partitioned(years=...).
+"""
+
+# Standard library
+import argparse
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+# Third-party
+import pandas as pd
+
+# Local
+from src.utils.logging_config import setup_logger
+from src.utils.profiling import run_main
+from src.utils.json_stream import iter_json_records
+from src.utils.partitions import partition_bounds, partition_file
+from src.utils.raw_archive import event_season
+from src.etl.load_to_database import add_season_dates, flatten_with_schema
+from src.etl.data_quality import frame_fingerprint, record_fingerprint
+from src.utils.database import write_table
+from src.utils.config import (
+    RAW_DATA_PATH,
+    KAGGLE_FILES,
+    ESPN_FILES,
+    ESPN_TEAMS_SCHEMA,
+    TEAM_REFERENCE_FILES,
+    PARTITION_PATH,
+    PARTITION_SHARED_DB,
+    PARTITION_ORIGIN_YEAR,
+    PARTITION_SPAN_YEARS,
+    PARTITION_WORKERS,
+    PARTITION_YEAR_COLUMNS
+)
+
+# Logger
+logger = setup_logger(__name__)
+
+
+def main():
+    """Build (or refresh) the season-partitioned database files."""
+    parser = argparse.ArgumentParser(description="Load raw data into season-partitioned SQLite files")
+    parser.add_argument("--raw-path", type=Path, default=RAW_DATA_PATH)
+    parser.add_argument("--partition-dir", type=Path, default=PARTITION_PATH)
+    parser.add_argument("--span", type=int, default=PARTITION_SPAN_YEARS, help="Seasons per partition file")
+    parser.add_argument("--workers", type=int, default=PARTITION_WORKERS)
+    parser.add_argument(
+        "--seasons", default=None,
+        help="Comma-separated seasons to refresh (only their partitions are rewritten)"
+    )
+    args = parser.parse_args()
+
+    seasons = [int(s) for s in args.seasons.split(",")] if args.seasons else None
+    load_partitioned(args.raw_path, args.partition_dir, args.span, args.workers, seasons)
+
+
+def load_partitioned(raw_path=RAW_DATA_PATH, partition_dir=PARTITION_PATH, span=PARTITION_SPAN_YEARS,
+                     workers=PARTITION_WORKERS, seasons=None):
+    """
+    Split every source by season range and write the partition files in parallel.
+
+    Args:
+        raw_path (Path): Directory with the raw Kaggle/ESPN/reference files
+        partition_dir (Path): Output directory
+        span (int): Seasons per partition file
+        workers (int): Partition files written concurrently
+        seasons (list): Only rewrite the partitions holding these seasons (shared.db is
+            rebuilt on full loads only)
+
+    Returns:
+        dict: partition file name -> {table: rows}
+    """
+    partition_dir.mkdir(parents=True, exist_ok=True)
+    wanted = {partition_bounds(s, span) for s in seasons} if seasons else None
+    logger.info(
+        f"Loading season partitions ({span} season(s) per file) into {partition_dir}"
+        + (f" - refreshing {sorted(wanted)}" if wanted else "")
+    )
+
+    buckets = {}
+    split_kaggle(raw_path, span, wanted, buckets)
+    split_espn_games(raw_path, span, wanted, buckets)
+
+    jobs = {
+        partition_file(first, last, partition_dir): frames
+        for (first, last), frames in sorted(buckets.items())
+    }
+    if seasons is None:
+        jobs[partition_dir / PARTITION_SHARED_DB] = shared_frames(raw_path)
+
+    summary = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        futures = {path: pool.submit(write_partition, str(path), frames) for path, frames in jobs.items()}
+        for path, future in futures.items():
+            summary[path.name] = future.result()
+            logger.info(f"  {path.name}: {sum(summary[path.name].values()):,} rows in {len(summary[path.name])} tables")
+
+    logger.info(f"Partitioned load complete: {len(summary)} files written")
+    return summary
+
+
+def split_kaggle(raw_path, span, wanted, buckets):
+    """Read each Kaggle CSV once and split it by the season range of its `year` column."""
+    for file_config in KAGGLE_FILES:
+        file_path = raw_path / file_config["filename"]
+        table_name = f"kaggle_{file_config['name']}"
+        if not file_path.exists():
+            logger.warning(f"  File not found: {file_path}")
+            continue
+
+        dtypes = file_config.get("dtypes")
+        try:
+            df = pd.read_csv(file_path, dtype=dtypes)
+        except ValueError as e:
+            logger.warning(f"  {table_name}: dtype map rejected ({e}) - falling back to inferred dtypes")
+            df = pd.read_csv(file_path)
+        if file_config.get("season_date"):
+            df = add_season_dates(df, file_config["season_date"])
+
+        year_column = PARTITION_YEAR_COLUMNS[table_name]
+        first_years = (df[year_column].astype(int) - PARTITION_ORIGIN_YEAR) // span * span + PARTITION_ORIGIN_YEAR
+        for first, part in df.groupby(first_years, sort=True):
+            bounds = (int(first), int(first) + span - 1)
+            if wanted is None or bounds in wanted:
+                buckets.setdefault(bounds, {})[table_name] = part.reset_index(drop=True)
+        logger.info(f"  Split {len(df):,} rows of {table_name}")
+
+
+def split_espn_games(raw_path, span, wanted, buckets):
+    """Stream ESPN events, route each to its season's partition and flatten it there."""
+    games_file = ESPN_FILES["games_core"]["filename"]
+    file_path = raw_path / games_file
+    if not file_path.exists():
+        logger.warning(f"  File not found: {file_path}")
+        return
+
+    tables = [
+        (file_config["table_name"], getattr(config, file_config["schema"]))
+        for file_config in ESPN_FILES.values()
+        if file_config["filename"] == games_file
+    ]
+    rows, events = {}, 0
+    for event in iter_json_records(file_path):
+        bounds = partition_bounds(event_season(event), span)
+        if wanted is not None and bounds not in wanted:
+            continue
+        events += 1
+        partition_rows = rows.setdefault(bounds, {})
+        for table_name, schema in tables:
+            partition_rows.setdefault(table_name, []).append(flatten_with_schema(event, schema))
+
+    for bounds, tables_rows in rows.items():
+        for table_name, table_rows in tables_rows.items():
+            buckets.setdefault(bounds, {})[table_name] = pd.DataFrame(table_rows)
+    logger.info(f"  Split {events:,} ESPN events into {len(rows)} partition(s)")
+
+
+def shared_frames(raw_path):
+    """Tables that aren't season-scoped: ESPN teams and the team reference mapping."""
+    frames = {}
+    teams_file = raw_path / ESPN_FILES["teams"]["filename"]
+    if teams_file.exists():
+        frames[ESPN_FILES["teams"]["table_name"]] = pd.DataFrame(
+            [flatten_with_schema(team, ESPN_TEAMS_SCHEMA) for team in iter_json_records(teams_file)]
+        )
+    ref_config = TEAM_REFERENCE_FILES["output"]
+    ref_file = raw_path / ref_config["filename"]
+    if ref_file.exists():
+        frames[ref_config["table_name"]] = pd.read_csv(ref_file)
+    return frames
+
+
+def write_partition(path, frames):
+    """
+    Write one partition file (process worker).
+
+    Built in a temp file and swapped in with os.replace, so readers never see a half-written
+    partition and a failed refresh leaves the previous file in place.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        for table_name, df in frames.items():
+            write_table(conn, df, table_name)
+            year_column = PARTITION_YEAR_COLUMNS.get(table_name)
+            if year_column:
+                conn.execute(f"CREATE INDEX idx_{table_name}_{year_column} ON {table_name} ({year_column})")
+            record_fingerprint(conn, table_name, frame_fingerprint(df), len(df))
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, path)
+    return {table_name: len(df) for table_name, df in frames.items()}
+
+
+if __name__ == "__main__":
+    run_main(main)
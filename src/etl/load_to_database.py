@@ -3,11 +3,16 @@ ETL Script: Multi-Source Database Loading
 Author: Linda B. Low-k-dielectric
 Date: Week 2
 Purpose: Load and integrate Kaggle, ESPN, and reference data into SQLite database
+Note: ESPN data is loaded per league (config.LEAGUES). With several leagues, each league's
+      JSON is read and flattened in its own process and the frames are written here as
+      each finishes, so the database only ever has one writer.
 """
 
 # Standard library
+import argparse
 import json
-import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
 from pathlib import Path
 
 # Third-party
@@ -15,17 +20,40 @@ import pandas as pd
 
 # Local
 from src.utils.logging_config import setup_logger
+from src.utils.profiling import run_main
+from src.utils import config
+from src.utils.database import (
+    connect, backend_for, default_db_path, read_frame, write_table, table_exists, is_duckdb, DATABASE_ERRORS
+)
+from src.etl.data_quality import (
+    run_quality_checks,
+    new_fingerprint,
+    update_fingerprint,
+    frame_fingerprint,
+    record_fingerprint,
+    invalidate_fingerprint
+)
+from src.utils.raw_archive import read_index, iter_archive_events
+from src.utils.leagues import parse_leagues, league_table, league_raw_path, league_quality_checks
+from src.etl.ingest_game_details import iter_summaries
 from src.utils.config import (
     RAW_DATA_PATH, 
     PROCESSED_DATA_PATH, 
-    DB_PATH,
     KAGGLE_FILES,
+    KAGGLE_CHUNK_THRESHOLD_MB,
+    KAGGLE_CHUNK_ROWS,
     ESPN_FILES,
     ESPN_TEAMS_SCHEMA,
+    DATA_QUALITY_CHECKS,
+    LEAGUES,
+    DEFAULT_LEAGUE,
+    PIPELINE_LEAGUES,
+    GAME_DETAIL_QUEUE_PATH,
+    GAME_DETAIL_TEAM_STATS_TABLE,
+    RAW_ARCHIVE_PATH,
     TEAM_REFERENCE_FILES,
     SQL_SETUP_DIR,
-    VIEW_FILES,
-    DB_TABLES
+    VIEW_FILES
 )
 
 # Logger
@@ -34,17 +62,44 @@ logger = setup_logger(__name__)
 
 def main():
     """Load all data sources into integrated SQLite database."""
-    logger.info("Starting multi-source database load")
+    parser = argparse.ArgumentParser(description="Load raw data into the analytics database")
+    parser.add_argument("--raw-path", type=Path, default=RAW_DATA_PATH, help="Raw input directory (e.g. data/sample/stratified)")
+    parser.add_argument("--db-path", type=Path, default=None, help="Database file (default: DB_BACKEND's)")
+    parser.add_argument("--seasons", type=int, nargs="+", default=None,
+                        help="Only reload these ESPN seasons, read from the raw archive")
+    parser.add_argument("--weeks", type=int, nargs="+", default=None, help="With --seasons: only these weeks")
+    parser.add_argument("--leagues", default=",".join(PIPELINE_LEAGUES),
+                        help=f"Comma-separated ESPN leagues to load ({', '.join(LEAGUES)})")
+    args = parser.parse_args()
+    if args.weeks and not args.seasons:
+        parser.error("--weeks needs --seasons")
+    try:
+        leagues = parse_leagues(args.leagues)
+    except ValueError as e:
+        parser.error(str(e))
     
     ensure_directories()
-    conn = create_database()
+    conn = create_database(args.db_path)
+    
+    if args.seasons:
+        try:
+            for league in leagues:
+                archive_dir = league_raw_path(args.raw_path, league) / RAW_ARCHIVE_PATH.name
+                reload_espn_seasons(conn, args.seasons, args.weeks, archive_dir=archive_dir, league=league)
+            validate_data(conn, leagues)
+        finally:
+            conn.close()
+        return
+    
+    logger.info("Starting multi-source database load")
     
     try:
-        load_kaggle_data(conn)
-        load_espn_data(conn)
-        load_reference_data(conn)
+        load_kaggle_data(conn, raw_path=args.raw_path)
+        load_league_data(conn, leagues, raw_path=args.raw_path)
+        load_game_detail_data(conn, queue_path=args.raw_path / GAME_DETAIL_QUEUE_PATH.name)
+        load_reference_data(conn, raw_path=args.raw_path)
         create_integrated_views(conn)
-        validate_data(conn)
+        validate_data(conn, leagues)
         
         logger.info("Database load complete")
     finally:
@@ -57,41 +112,160 @@ def ensure_directories():
     logger.debug(f"Ensured directory exists: {PROCESSED_DATA_PATH}")
 
 
-def create_database():
-    """Create SQLite database connection."""
-    if DB_PATH.exists():
-        logger.info(f"Connecting to existing database: {DB_PATH}")
+def create_database(db_path=None):
+    """Create database connection (SQLite, or DuckDB for a .duckdb path / GAMEDAY_DB_BACKEND=duckdb)."""
+    db_path = Path(db_path or default_db_path())
+    backend = backend_for(db_path)
+    if db_path.exists():
+        logger.info(f"Connecting to existing {backend} database: {db_path}")
     else:
-        logger.info(f"Creating new database: {DB_PATH}")
+        logger.info(f"Creating new {backend} database: {db_path}")
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(db_path)
     return conn
 
 
-def load_kaggle_data(conn):
-    """Load historical Kaggle CSV files into database."""
+def load_kaggle_data(conn, raw_path=RAW_DATA_PATH):
+    """
+    Load historical Kaggle CSV files into database.
+    
+    Returns:
+        dict: Memory report per table (rows, chunks, total and peak in-memory MB)
+    """
     logger.info("Loading Kaggle historical data (2000-2019)")
     
+    memory_report = {}
+    
     for file_config in KAGGLE_FILES:
-        file_path = RAW_DATA_PATH / file_config["filename"]
+        file_path = raw_path / file_config["filename"]
         table_name = f"kaggle_{file_config['name']}"
         
         if not file_path.exists():
             logger.warning(f"  File not found: {file_path}")
             continue
         
+        dtypes = file_config.get("dtypes")
         try:
-            df = pd.read_csv(file_path)  # Pandas will error if not CSV
-            df.to_sql(table_name, conn, if_exists='replace', index=False)
-            logger.info(f"  Loaded {len(df)} records into {table_name}")
+            try:
+                report = load_kaggle_file(conn, file_path, table_name, dtypes, file_config.get("season_date"))
+            except ValueError as e:
+                # Source drifted from the dtype map (e.g. new NA in an int column) - load it anyway
+                logger.warning(f"  {table_name}: dtype map rejected ({e}) - falling back to inferred dtypes")
+                report = load_kaggle_file(conn, file_path, table_name, None, file_config.get("season_date"))
+            
+            memory_report[table_name] = report
+            logger.info(
+                f"  Loaded {report['rows']} records into {table_name} "
+                f"({report['chunks']} chunk(s), {report['memory_mb']:.2f} MB in memory, "
+                f"peak chunk {report['peak_chunk_mb']:.2f} MB)"
+            )
         except Exception as e:
             logger.error(f"  Error loading {file_path}: {e}")
+    
+    return memory_report
+
+
+def load_kaggle_file(conn, file_path, table_name, dtypes=None, season_date=None):
+    """
+    Stream one Kaggle CSV into a table with lean dtypes.
+    
+    Files above KAGGLE_CHUNK_THRESHOLD_MB are read KAGGLE_CHUNK_ROWS at a time, so peak
+    memory is bounded by one chunk rather than the whole file.
+    
+    Args:
+        conn: Database connection (SQLite or DuckDB)
+        file_path (Path): CSV file
+        table_name (str): Destination table (replaced)
+        dtypes (dict): Column -> dtype map, or None to let pandas infer
+        season_date (str): Optional 'Month Day' column to parse into game_date
+    
+    Returns:
+        dict: rows, chunks, memory_mb (sum over chunks), peak_chunk_mb
+    """
+    size_mb = file_path.stat().st_size / 1e6
+    chunksize = KAGGLE_CHUNK_ROWS if size_mb > KAGGLE_CHUNK_THRESHOLD_MB else None
+    
+    reader = pd.read_csv(file_path, dtype=dtypes, chunksize=chunksize)  # Pandas will error if not CSV
+    chunks = reader if chunksize else [reader]
+    
+    report = {"rows": 0, "chunks": 0, "memory_mb": 0.0, "peak_chunk_mb": 0.0}
+    fingerprint = None
+    # Forget the old fingerprint first: a failed or partial replace must not serve cached checks
+    invalidate_fingerprint(conn, table_name)
+    for chunk in chunks:
+        if season_date:
+            chunk = add_season_dates(chunk, season_date)
+        
+        write_table(conn, chunk, table_name, if_exists='replace' if report["chunks"] == 0 else 'append')
+        fingerprint = update_fingerprint(fingerprint or new_fingerprint(chunk.columns), chunk)
+        
+        chunk_mb = float(chunk.memory_usage(deep=True).sum()) / 1e6
+        report["rows"] += len(chunk)
+        report["chunks"] += 1
+        report["memory_mb"] += chunk_mb
+        report["peak_chunk_mb"] = max(report["peak_chunk_mb"], chunk_mb)
+    
+    if fingerprint:
+        record_fingerprint(conn, table_name, fingerprint.hexdigest(), report["rows"])
+    return report
+
+
+def add_season_dates(df, column):
+    """
+    Parse Kaggle 'September 3' style dates into a game_date column.
+    
+    The source omits the year; January/February games belong to the season's
+    following calendar year (playoffs).
+    """
+    parsed = pd.to_datetime(
+        df[column].astype(str) + " " + df["year"].astype(str),
+        format="%B %d %Y",
+        errors="coerce"
+    )
+    df["game_date"] = parsed.where(parsed.dt.month > 2, parsed + pd.DateOffset(years=1))
+    return df
+
+
+
+def load_league_data(conn, leagues=(DEFAULT_LEAGUE,), raw_path=RAW_DATA_PATH):
+    """
+    Load the ESPN tables of several leagues, reading and flattening them concurrently.
+    
+    Each league is parsed in its own process (flattening is pure Python, so threads would
+    serialize on the GIL); the frames are written on this connection as leagues finish.
+    """
+    leagues = list(leagues)
+    if len(leagues) == 1:
+        load_espn_data(conn, raw_path=raw_path, league=leagues[0])
+        return
+    
+    logger.info(f"Loading ESPN data for {len(leagues)} leagues concurrently ({', '.join(leagues)})")
+    with ProcessPoolExecutor(max_workers=len(leagues), mp_context=get_context("spawn")) as pool:
+        futures = {pool.submit(espn_frames, raw_path, None, league): league for league in leagues}
+        for future in as_completed(futures):
+            write_espn_frames(conn, future.result(), futures[future])
+
 
+def load_espn_data(conn, raw_path=RAW_DATA_PATH, archive_dir=None, league=DEFAULT_LEAGUE):
+    """Load one league's ESPN JSON data into database (games fall back to the raw archive)."""
+    write_espn_frames(conn, espn_frames(raw_path, archive_dir, league), league)
 
 
-def load_espn_data(conn):
-    """Load current ESPN JSON data into database."""
-    logger.info("Loading ESPN current season data (2020-2024)")
+def espn_frames(raw_path=RAW_DATA_PATH, archive_dir=None, league=DEFAULT_LEAGUE):
+    """
+    Read and flatten one league's ESPN JSON into one DataFrame per table.
+    
+    Args:
+        raw_path (Path): Raw directory (the league's pulls are in league_raw_path(raw_path, league))
+        archive_dir (Path): Raw archive to fall back to (default: the league's own)
+        league (str): League key in config.LEAGUES
+    
+    Returns:
+        list: (table name, DataFrame) per ESPN_FILES entry that could be loaded
+    """
+    logger.info(f"Loading ESPN current season data (2020-2024) - {league}")
+    league_path = league_raw_path(raw_path, league)
+    archive_dir = archive_dir or league_path / RAW_ARCHIVE_PATH.name
     
     # Import all themed schemas
     from src.utils.config import (
@@ -115,24 +289,111 @@ def load_espn_data(conn):
         "ESPN_GAMES_VENUE_SCHEMA": ESPN_GAMES_VENUE_SCHEMA
     }
     
+    frames = []
+    archived_games = None
     for data_type, config in ESPN_FILES.items():
-        file_path = RAW_DATA_PATH / config["filename"]
+        file_path = league_path / config["filename"]
+        table_name = league_table(config["table_name"], league)
+        from_archive = (not file_path.exists() and config["filename"] == ESPN_FILES["games_core"]["filename"]
+                        and read_index("espn_games", archive_dir))
         
-        if not file_path.exists():
+        if not file_path.exists() and not from_archive:
             logger.warning(f"  {data_type}: File not found: {file_path}")
             continue
         
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)  # Will error if not valid JSON
+            if from_archive:
+                if archived_games is None:
+                    logger.info(f"  {file_path.name} not found - reading latest pulls from {archive_dir}")
+                    archived_games = list(iter_archive_events(archive_dir=archive_dir))
+                data = archived_games
+            else:
+                with open(file_path, 'r') as f:
+                    data = json.load(f)  # Will error if not valid JSON
             
             schema = schemas[config["schema"]]
             flat_data = flatten_espn_data(data, schema)
-            df = pd.DataFrame(flat_data)
-            df.to_sql(config["table_name"], conn, if_exists='replace', index=False)
-            logger.info(f"  Loaded {len(df)} records into {config['table_name']}")
+            frames.append((table_name, pd.DataFrame(flat_data)))
         except Exception as e:
             logger.error(f"  Error loading {data_type} from {file_path}: {e}")
+    return frames
+
+
+def write_espn_frames(conn, frames, league=DEFAULT_LEAGUE):
+    """
+    Write flattened ESPN frames (replacing each table) and record their fingerprints.
+    
+    A table's old fingerprint is dropped before its write and the new one recorded only
+    after it succeeds, so a failed write forces the quality checks to re-run.
+    """
+    for table_name, df in frames:
+        try:
+            invalidate_fingerprint(conn, table_name)
+            write_table(conn, df, table_name)
+            record_fingerprint(conn, table_name, frame_fingerprint(df), len(df))
+            logger.info(f"  Loaded {len(df)} records into {table_name}")
+        except Exception as e:
+            logger.error(f"  Error writing {table_name} ({league}): {e}")
+
+
+def reload_espn_seasons(conn, seasons, weeks=None, archive_dir=RAW_ARCHIVE_PATH, league=DEFAULT_LEAGUE):
+    """
+    Replace the ESPN game rows of some seasons (or weeks) with their latest archived pull.
+
+    Only the archive blocks for those seasons/weeks are read and decompressed. Rows are
+    replaced by game id: every id the tables currently hold for the scope (per
+    espn_games_time) plus every id in the archived blocks, so games dropped upstream
+    disappear too.
+    """
+    scope = f"seasons {sorted(seasons)}" + (f" weeks {sorted(weeks)}" if weeks else "")
+    logger.info(f"Reloading ESPN {league} {scope} from {archive_dir}")
+    
+    events = list(iter_archive_events(seasons, weeks, archive_dir=archive_dir))
+    if not events:
+        logger.warning(f"  No archived games for {scope}")
+        return 0
+    
+    time_table = league_table(ESPN_FILES["games_time"]["table_name"], league)
+    stale_ids = set()
+    try:
+        time_rows = read_frame(conn, f"SELECT id, season_year, week_number FROM {time_table}")
+        in_scope = time_rows["season_year"].isin(seasons)
+        if weeks:
+            in_scope &= time_rows["week_number"].isin(weeks)
+        stale_ids = set(time_rows.loc[in_scope, "id"].astype(str))
+    except DATABASE_ERRORS:
+        logger.info(f"  {time_table} not loaded yet - appending")
+    
+    new_ids = {str(event.get("id", "")) for event in events}
+    conn.execute("DROP TABLE IF EXISTS _reload_ids")
+    conn.execute("CREATE TEMP TABLE _reload_ids (id VARCHAR)")
+    conn.executemany("INSERT INTO _reload_ids VALUES (?)", [(i,) for i in stale_ids | new_ids])
+    
+    for file_config in ESPN_FILES.values():
+        if file_config["filename"] != ESPN_FILES["games_core"]["filename"]:
+            continue
+        table = league_table(file_config["table_name"], league)
+        df = pd.DataFrame(flatten_espn_data(events, getattr(config, file_config["schema"])))
+        if not table_exists(conn, table):
+            write_table(conn, df, table, if_exists="replace")
+            conn.commit()
+        else:
+            # Delete + append as one transaction: a failed append must not drop the old rows
+            if is_duckdb(conn):
+                conn.begin()
+            try:
+                conn.execute(f"DELETE FROM {table} WHERE CAST(id AS VARCHAR) IN (SELECT id FROM _reload_ids)")
+                write_table(conn, df, table, if_exists="append")
+                conn.commit()
+            except DATABASE_ERRORS:
+                conn.rollback()
+                logger.error(f"  {table}: reload failed - table left unchanged")
+                raise
+        invalidate_fingerprint(conn, table)
+        logger.info(f"  {table}: replaced {len(stale_ids):,} rows with {len(df):,}")
+    
+    conn.execute("DROP TABLE IF EXISTS _reload_ids")
+    return len(events)
 
 
 def flatten_espn_data(data, schema):
@@ -163,12 +424,55 @@ def flatten_with_schema(data, schema):
     return result
 
 
-def load_reference_data(conn):
+def load_game_detail_data(conn, queue_path=GAME_DETAIL_QUEUE_PATH):
+    """Load boxscore team stats from the game summary backfill (ingest_game_details)."""
+    if not queue_path.exists():
+        logger.info("  No game summaries found - skipping (run: python -m src.etl.ingest_game_details)")
+        return
+
+    logger.info("Loading ESPN game summary boxscores")
+    try:
+        rows = [
+            row
+            for event_id, summary in iter_summaries(queue_path)
+            for row in flatten_game_summary(event_id, summary)
+        ]
+        df = pd.DataFrame(rows, columns=[
+            "game_id", "team_id", "team_abbreviation", "home_away", "stat_name", "stat_label", "stat_display"
+        ])
+        df["stat_value"] = pd.to_numeric(df["stat_display"], errors="coerce")
+        invalidate_fingerprint(conn, GAME_DETAIL_TEAM_STATS_TABLE)
+        write_table(conn, df, GAME_DETAIL_TEAM_STATS_TABLE)
+        record_fingerprint(conn, GAME_DETAIL_TEAM_STATS_TABLE, frame_fingerprint(df), len(df))
+        logger.info(f"  Loaded {len(df)} team stat rows into {GAME_DETAIL_TEAM_STATS_TABLE}")
+    except Exception as e:
+        logger.error(f"  Error loading game summaries from {queue_path}: {e}")
+
+
+def flatten_game_summary(event_id, summary):
+    """One row per (game, team, boxscore statistic) from an ESPN summary payload."""
+    rows = []
+    for team_box in summary.get("boxscore", {}).get("teams", []):
+        team = team_box.get("team", {})
+        for stat in team_box.get("statistics", []):
+            rows.append((
+                str(event_id),
+                team.get("id"),
+                team.get("abbreviation"),
+                team_box.get("homeAway"),
+                stat.get("name"),
+                stat.get("label"),
+                stat.get("displayValue")
+            ))
+    return rows
+
+
+def load_reference_data(conn, raw_path=None):
     """Load team reference mapping table."""
     logger.info("Loading team reference data")
     
     ref_config = TEAM_REFERENCE_FILES["output"]
-    ref_file = ref_config["path"] / ref_config["filename"]
+    ref_file = (raw_path or ref_config["path"]) / ref_config["filename"]
     
     if not ref_file.exists():
         logger.error(f"  Reference file not found: {ref_file}")
@@ -177,7 +481,9 @@ def load_reference_data(conn):
     
     try:
         df = pd.read_csv(ref_file)
-        df.to_sql(ref_config["table_name"], conn, if_exists='replace', index=False)
+        invalidate_fingerprint(conn, ref_config["table_name"])
+        write_table(conn, df, ref_config["table_name"])
+        record_fingerprint(conn, ref_config["table_name"], frame_fingerprint(df), len(df))
         logger.info(f"  Loaded {len(df)} team mapping entries")
     except Exception as e:
         logger.error(f"  Error loading reference data: {e}")
@@ -192,29 +498,29 @@ def create_integrated_views(conn):
         file_path = SQL_SETUP_DIR / view_file
         with open(file_path, 'r') as f:
             sql = f.read()
-        cursor.execute(sql)
+        try:
+            cursor.execute(sql)
+        except DATABASE_ERRORS as e:
+            # DuckDB binds views at creation time, so a view over a missing table fails here
+            logger.warning(f"  Skipped view {view_file.replace('.sql', '')}: {e}")
+            continue
         logger.info(f"  Created view: {view_file.replace('.sql', '')}")
     
     conn.commit()
 
 
-def validate_data(conn):
-    """Validate loaded data with record counts.
+def validate_data(conn, leagues=(DEFAULT_LEAGUE,)):
+    """Validate loaded data against config.DATA_QUALITY_CHECKS (plus each extra league's ESPN tables).
     
-    Note: Referential integrity checks (e.g., team mapping coverage)
+    Each table's checks (row counts, null rates, ranges, key uniqueness, team reference
+    coverage) run as a single aggregate scan; unchanged tables reuse cached results.
+    
+    Note: Referential integrity checks against the dbt models (e.g., stg_team_reference)
     are handled by dbt test (assert_kaggle_teams_have_reference_mapping).
     """
     logger.info("Validating loaded data")
-    
-    cursor = conn.cursor()
-    
-    for table in DB_TABLES:
-        try:
-            result = cursor.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
-            logger.info(f"  {table}: {result[0]} records")
-        except sqlite3.OperationalError:
-            logger.warning(f"  {table}: Table not found")
+    return run_quality_checks(conn, {**DATA_QUALITY_CHECKS, **league_quality_checks(leagues)})
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run_main(main)
\ No newline at end of file
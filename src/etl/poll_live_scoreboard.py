@@ -0,0 +1,313 @@
+"""
+ETL Script: Live Scoreboard Polling (in-season mode)
+Author: Linda B. Low-k-dielectric
+Date: Week 5
+Purpose: Poll the current week's ESPN scoreboard on an adaptive interval and apply only
+         changed game rows to the themed espn_games_* tables
+Note: Built on the same flattening schemas as load_to_database. Each poll diffs events by
+      id against the last snapshot, per table, so a score change rewrites the score/stats
+      rows but leaves venue, publicity, etc. untouched. Runs against a local stub:
+          python -m src.utils.espn_stub_server --snapshots <dir>
+          python -m src.etl.poll_live_scoreboard --base-url http://127.0.0.1:8765/nfl
+"""
+
+# Standard library
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Third-party
+import pandas as pd
+import requests
+
+# Local
+from src.utils.logging_config import setup_logger
+from src.utils.profiling import run_main
+from src.utils.database import write_table, table_exists, is_duckdb, DATABASE_ERRORS
+from src.utils import config
+from src.utils.config import (
+    ESPN_FILES,
+    ESPN_SCOREBOARD_URL,
+    LIVE_POLL_MIN_SECONDS,
+    LIVE_POLL_MAX_SECONDS,
+    LIVE_POLL_TIMEOUT_SECONDS
+)
+from src.etl.load_to_database import create_database, flatten_with_schema
+from src.etl.data_quality import invalidate_fingerprint
+
+# Logger
+logger = setup_logger(__name__)
+
+
+def main():
+    """Poll the live scoreboard until stopped (or --max-polls / --until-final)."""
+    parser = argparse.ArgumentParser(description="Poll ESPN scoreboard and apply delta updates")
+    parser.add_argument("--base-url", default=None, help="Override ESPN base URL (e.g. a local stub)")
+    parser.add_argument("--season", type=int, default=None, help="Season year (default: ESPN's current)")
+    parser.add_argument("--week", type=int, default=None, help="Week number (default: ESPN's current)")
+    parser.add_argument("--min-interval", type=float, default=LIVE_POLL_MIN_SECONDS)
+    parser.add_argument("--max-interval", type=float, default=LIVE_POLL_MAX_SECONDS)
+    parser.add_argument("--max-polls", type=int, default=None)
+    parser.add_argument("--until-final", action="store_true", help="Stop once every game is final")
+    parser.add_argument("--record", type=Path, default=None, help="Save each new payload for stub replay")
+    parser.add_argument("--db-path", type=Path, default=None, help="Database file (default: DB_BACKEND's)")
+    args = parser.parse_args()
+
+    scoreboard_url = f"{args.base_url.rstrip('/')}/scoreboard" if args.base_url else ESPN_SCOREBOARD_URL
+    params = scoreboard_params(args.season, args.week)
+
+    logger.info(f"Starting live scoreboard polling: {scoreboard_url} {params or '(current week)'}")
+    conn = create_database(args.db_path)
+    try:
+        poll_scoreboard(
+            conn, scoreboard_url, params,
+            min_interval=args.min_interval,
+            max_interval=args.max_interval,
+            max_polls=args.max_polls,
+            until_final=args.until_final,
+            record_dir=args.record
+        )
+    except KeyboardInterrupt:
+        logger.info("Polling stopped by user")
+    finally:
+        conn.close()
+
+
+def scoreboard_params(season=None, week=None):
+    """Query parameters for a specific week (empty = ESPN's current week)."""
+    params = {}
+    if season:
+        params.update({"dates": season, "seasontype": 2})
+    if week:
+        params.update({"week": week, "seasontype": 2})
+    return params
+
+
+def poll_scoreboard(conn, scoreboard_url, params, min_interval=LIVE_POLL_MIN_SECONDS,
+                    max_interval=LIVE_POLL_MAX_SECONDS, max_polls=None, until_final=False, record_dir=None):
+    """
+    Poll loop: fetch -> diff -> apply -> sleep(adaptive).
+
+    Returns:
+        dict: polls, rows_written (per table), not_modified (304 count)
+    """
+    session = requests.Session()  # keep-alive between polls
+    tables = games_tables()
+    snapshot, etag = None, None
+    events = []                 # last payload's events (a 304 means they are unchanged)
+    all_final = False
+    interval = min_interval
+    stats = {"polls": 0, "not_modified": 0, "rows_written": {}}
+
+    if record_dir:
+        record_dir.mkdir(parents=True, exist_ok=True)
+
+    while max_polls is None or stats["polls"] < max_polls:
+        started = time.perf_counter()
+        payload, etag = fetch_scoreboard(session, scoreboard_url, params, etag)
+        fetched = time.perf_counter()
+        stats["polls"] += 1
+
+        if payload is None:
+            stats["not_modified"] += 1
+            logger.info(f"Poll {stats['polls']}: not modified ({(fetched - started) * 1000:.0f} ms)")
+            if until_final and all_final:
+                logger.info("All games final - stopping")
+                break
+            interval = next_interval(events, False, interval, min_interval, max_interval)
+            if max_polls is None or stats["polls"] < max_polls:
+                time.sleep(interval)
+            continue
+
+        events = payload.get("events", [])
+        if record_dir:
+            record_payload(record_dir, payload, stats["polls"])
+
+        current = build_rows(events, tables)
+        if snapshot is None:
+            # Seed from what's already loaded so the first poll only writes real changes
+            snapshot = load_snapshot(conn, tables, [str(e.get("id")) for e in events])
+
+        deltas = diff_rows(snapshot, current)
+        written = apply_deltas(conn, deltas)
+        for table, rows in current.items():
+            snapshot.setdefault(table, {}).update(rows)
+        for table, count in written.items():
+            stats["rows_written"][table] = stats["rows_written"].get(table, 0) + count
+
+        applied = time.perf_counter()
+        states = [event_state(e) for e in events]
+        logger.info(
+            f"Poll {stats['polls']}: {len(events)} events "
+            f"({states.count('in')} live, {states.count('post')} final), "
+            f"{sum(written.values())} rows changed across {len(written)} tables | "
+            f"fetch {(fetched - started) * 1000:.0f} ms, apply {(applied - fetched) * 1000:.0f} ms"
+        )
+
+        all_final = bool(events) and all(s == "post" for s in states)
+        if until_final and all_final and not written:
+            logger.info("All games final - stopping")
+            break
+
+        interval = next_interval(events, bool(written), interval, min_interval, max_interval)
+        if max_polls is None or stats["polls"] < max_polls:
+            time.sleep(interval)
+
+    logger.info(f"Polling finished: {stats}")
+    return stats
+
+
+def games_tables():
+    """(table_name, schema) for every themed table built from espn_games.json."""
+    games_file = ESPN_FILES["games_core"]["filename"]
+    return [
+        (file_config["table_name"], getattr(config, file_config["schema"]))
+        for file_config in ESPN_FILES.values()
+        if file_config["filename"] == games_file
+    ]
+
+
+def fetch_scoreboard(session, url, params, etag=None):
+    """
+    Fetch the scoreboard, using If-None-Match so unchanged payloads cost a 304.
+
+    Returns:
+        tuple: (payload dict or None if not modified, etag)
+    """
+    headers = {"If-None-Match": etag} if etag else {}
+    response = session.get(url, params=params, headers=headers, timeout=LIVE_POLL_TIMEOUT_SECONDS)
+    if response.status_code == 304:
+        return None, etag
+    response.raise_for_status()
+    return response.json(), response.headers.get("ETag")
+
+
+def build_rows(events, tables):
+    """Flatten events into {table: {game_id: row}} using the themed schemas."""
+    rows = {}
+    for table, schema in tables:
+        rows[table] = {}
+        for event in events:
+            row = normalize_row(flatten_with_schema(event, schema))
+            rows[table][str(row["id"])] = row
+    return rows
+
+
+def normalize_row(row):
+    """Store values the way SQLite returns them (bool -> int) so snapshots compare cleanly."""
+    return {key: int(value) if isinstance(value, bool) else value for key, value in row.items()}
+
+
+def load_snapshot(conn, tables, ids):
+    """Read the currently stored rows for these game ids (empty if the tables don't exist yet)."""
+    snapshot = {}
+    placeholders = ",".join("?" for _ in ids)
+    for table, schema in tables:
+        columns = [name for name, _, _ in schema]
+        try:
+            cursor = conn.execute(
+                f"SELECT {', '.join(columns)} FROM {table} WHERE id IN ({placeholders})", ids
+            )
+            snapshot[table] = {str(row[0]): dict(zip(columns, row)) for row in cursor.fetchall()}
+        except DATABASE_ERRORS:
+            snapshot[table] = {}
+    return snapshot
+
+
+def diff_rows(snapshot, current):
+    """Rows that are new or differ from the snapshot, per table."""
+    deltas = {}
+    for table, rows in current.items():
+        previous = snapshot.get(table, {})
+        changed = [row for game_id, row in rows.items() if previous.get(game_id) != row]
+        if changed:
+            deltas[table] = changed
+    return deltas
+
+
+def apply_deltas(conn, deltas):
+    """
+    Upsert changed rows (delete-by-id + insert) in a single transaction.
+
+    Returns:
+        dict: table -> rows written
+    """
+    written = {}
+    # Delete + insert as one transaction: a failed delta must not drop the stored rows
+    if is_duckdb(conn):
+        conn.begin()
+    try:
+        for table, rows in deltas.items():
+            if not table_exists(conn, table):
+                write_table(conn, pd.DataFrame(rows), table)
+            else:
+                columns = list(rows[0])
+                conn.executemany(f"DELETE FROM {table} WHERE id = ?", [(row["id"],) for row in rows])
+                conn.executemany(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                    [tuple(row[c] for c in columns) for row in rows]
+                )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_id ON {table} (id)")
+            written[table] = len(rows)
+        conn.commit()
+    except DATABASE_ERRORS:
+        conn.rollback()
+        logger.error("  Delta write failed - stored rows left unchanged")
+        raise
+
+    # Content changed in place - the quality cache must re-check these tables
+    for table in written:
+        invalidate_fingerprint(conn, table)
+    return written
+
+
+def event_state(event):
+    """ESPN status state: 'pre', 'in' or 'post'."""
+    status = event.get("status", {}).get("type", {})
+    if "state" in status:
+        return status["state"]
+    return "post" if status.get("completed") else "pre"
+
+
+def next_interval(events, changed, previous, min_interval, max_interval):
+    """
+    Adaptive polling interval.
+
+    Live games or fresh changes -> poll at min_interval. Otherwise back off exponentially
+    up to max_interval, but never sleep past the next scheduled kickoff.
+    """
+    states = [event_state(e) for e in events]
+    if "in" in states or changed:
+        return min_interval
+
+    interval = min(max(previous * 2, min_interval), max_interval)
+    now = datetime.now(timezone.utc)
+    upcoming = [
+        (start - now).total_seconds()
+        for event, state in zip(events, states)
+        if state == "pre" and (start := parse_event_date(event.get("date"))) is not None and start > now
+    ]
+    if upcoming:
+        interval = max(min_interval, min(interval, min(upcoming)))
+    return interval
+
+
+def parse_event_date(value):
+    """Parse ESPN's '2024-09-08T17:00Z' timestamps (None if missing/invalid)."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%MZ").replace(tzinfo=timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+
+def record_payload(record_dir, payload, poll_number):
+    """Save a payload in the stub server's snapshot naming scheme."""
+    output_file = record_dir / f"scoreboard_{poll_number:04d}.json"
+    with open(output_file, "w") as f:
+        json.dump(payload, f)
+
+
+if __name__ == "__main__":
+    run_main(main)
@@ -0,0 +1,376 @@
+"""
+ETL Script: Streaming ESPN Schema Profiler
+Author: Linda B. Low-k-dielectric
+Date: Week 5
+Purpose: Profile every leaf path in raw ESPN event files in a single streaming pass
+         (coverage, types, null rate, samples) and flag drift against the saved profile
+Note: Replaces the in-memory recursive flattening from notebooks/02_view_design.ipynb.
+      Profiles are plain JSON dicts, so they merge across files and across pipeline runs.
+"""
+
+# Standard library
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Third-party
+import pandas as pd
+
+# Local
+from src.utils.logging_config import setup_logger
+from src.utils.profiling import run_main
+from src.utils.json_stream import iter_json_records
+from src.utils import config
+from src.utils.config import (
+    RAW_DATA_PATH,
+    ESPN_FILES,
+    ESPN_SCHEMA_PROFILE_PATH,
+    SCHEMA_PROFILE_SAMPLE_SIZE,
+    SCHEMA_PROFILE_DISTINCT_CAP,
+    SCHEMA_DRIFT_COVERAGE_TOLERANCE
+)
+
+# Logger
+logger = setup_logger(__name__)
+
+PROFILE_VERSION = 1
+
+
+def main():
+    """Profile raw ESPN event files and check them for drift against the saved profile."""
+    parser = argparse.ArgumentParser(description="Profile ESPN event JSON and check for schema drift")
+    parser.add_argument(
+        "files", nargs="*", type=Path,
+        help="Event files (.json array, .jsonl, optionally .gz); default: raw espn_games.json"
+    )
+    parser.add_argument(
+        "--baseline", type=Path, default=ESPN_SCHEMA_PROFILE_PATH, help="Saved profile to compare against"
+    )
+    parser.add_argument("--no-save", action="store_true", help="Don't merge this run into the saved profile")
+    parser.add_argument("--csv", default=None, help="Also write a per-path review CSV")
+    parser.add_argument("--fail-on-drift", action="store_true", help="Exit 1 if curated paths drifted")
+    args = parser.parse_args()
+
+    files = args.files or [RAW_DATA_PATH / ESPN_FILES["games_core"]["filename"]]
+    logger.info("Starting ESPN schema profiling")
+
+    current = profile_files(files)
+    if current["events"] == 0:
+        logger.warning("No events found - nothing to profile")
+        return
+
+    baseline = load_profile(args.baseline)
+    drift = detect_drift(baseline, current) if baseline else None
+    if drift:
+        log_drift(drift)
+    else:
+        logger.info("No saved profile - this run becomes the baseline")
+
+    if args.csv:
+        profile_to_frame(current).to_csv(args.csv, index=False)
+        logger.info(f"Wrote path review CSV to {args.csv}")
+
+    if not args.no_save:
+        save_accumulated_profile(baseline, current, args.baseline)
+
+    logger.info("Schema profiling complete")
+    if args.fail_on_drift and drift and drift_is_blocking(drift):
+        sys.exit(1)
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Profile construction (single pass, incremental)
+# ─────────────────────────────────────────────────────────────────────
+
+def new_profile():
+    """Create an empty profile."""
+    return {"version": PROFILE_VERSION, "events": 0, "sources": {}, "paths": {}}
+
+
+def profile_files(paths):
+    """
+    Profile each file in one streaming pass and merge the per-file profiles.
+
+    Args:
+        paths (list[Path]): Event files
+
+    Returns:
+        dict: Merged profile
+    """
+    merged = new_profile()
+    for path in paths:
+        if not path.exists():
+            logger.warning(f"  File not found: {path}")
+            continue
+
+        profile = new_profile()
+        for event in iter_json_records(path):
+            update_profile(profile, event)
+
+        source = source_fingerprint(path)
+        profile["sources"][source] = profile["events"]
+        logger.info(f"  Profiled {profile['events']} events, {len(profile['paths'])} paths from {path.name}")
+        merged = merge_profiles(merged, profile)
+
+    return merged
+
+
+def update_profile(profile, event):
+    """Fold one event's leaf values into the profile in place."""
+    profile["events"] += 1
+    paths = profile["paths"]
+
+    for path, value in iter_leaves(event):
+        stats = paths.get(path)
+        if stats is None:
+            stats = paths[path] = new_path_stats(len(paths))
+
+        stats["present"] += 1
+        type_name = json_type(value)
+        stats["types"][type_name] = stats["types"].get(type_name, 0) + 1
+
+        if value is None:
+            stats["nulls"] += 1
+            continue
+
+        if not stats["distinct_overflow"]:
+            add_distinct(stats, json.dumps(value))
+        if len(stats["samples"]) < SCHEMA_PROFILE_SAMPLE_SIZE and value not in stats["samples"]:
+            stats["samples"].append(value)
+
+
+def iter_leaves(record):
+    """
+    Yield (dotted_path, value) for every scalar leaf, in document order.
+
+    Paths keep list indexes ('competitions.0.competitors.1.team.id') to match the
+    ref_column convention used by the reviewed schema CSV and config.py schemas.
+    """
+    stack = [("", record)]
+    while stack:
+        prefix, value = stack.pop()
+        if isinstance(value, dict):
+            for key, child in reversed(list(value.items())):
+                stack.append((f"{prefix}.{key}" if prefix else key, child))
+        elif isinstance(value, list):
+            for idx in range(len(value) - 1, -1, -1):
+                stack.append((f"{prefix}.{idx}" if prefix else str(idx), value[idx]))
+        else:
+            yield prefix, value
+
+
+def new_path_stats(order):
+    """Empty per-path statistics."""
+    return {
+        "order": order,
+        "present": 0,
+        "nulls": 0,
+        "types": {},
+        "samples": [],
+        "distinct": [],
+        "distinct_overflow": False
+    }
+
+
+def json_type(value):
+    """JSON type name of a decoded value."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    return "str"
+
+
+def add_distinct(stats, key):
+    """Track a distinct value (JSON-encoded so True and 1 stay distinct) up to the cap."""
+    if key in stats["distinct"]:
+        return
+    if len(stats["distinct"]) >= SCHEMA_PROFILE_DISTINCT_CAP:
+        stats["distinct"] = []
+        stats["distinct_overflow"] = True
+    else:
+        stats["distinct"].append(key)
+
+
+def merge_profiles(base, other):
+    """
+    Merge two profiles into a new one.
+
+    Raises:
+        ValueError: If both profiles already include the same source file version
+    """
+    overlap = set(base["sources"]) & set(other["sources"])
+    if overlap:
+        raise ValueError(f"Profiles share sources: {sorted(overlap)}")
+
+    merged = json.loads(json.dumps(base))  # deep copy
+    merged["events"] += other["events"]
+    merged["sources"].update(other["sources"])
+
+    # Paths new to base are appended after existing ones, keeping other's relative order
+    for path, stats in sorted(other["paths"].items(), key=lambda item: item[1]["order"]):
+        target = merged["paths"].get(path)
+        if target is None:
+            target = merged["paths"][path] = new_path_stats(len(merged["paths"]))
+
+        target["present"] += stats["present"]
+        target["nulls"] += stats["nulls"]
+        for type_name, count in stats["types"].items():
+            target["types"][type_name] = target["types"].get(type_name, 0) + count
+        for value in stats["samples"]:
+            if len(target["samples"]) < SCHEMA_PROFILE_SAMPLE_SIZE and value not in target["samples"]:
+                target["samples"].append(value)
+
+        if stats["distinct_overflow"]:
+            target["distinct"], target["distinct_overflow"] = [], True
+        elif not target["distinct_overflow"]:
+            for key in stats["distinct"]:
+                add_distinct(target, key)
+
+    return merged
+
+
+def source_fingerprint(path):
+    """Identify a specific version of a file (name, size, mtime)."""
+    stat = path.stat()
+    return f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Reporting and drift detection
+# ─────────────────────────────────────────────────────────────────────
+
+def profile_to_frame(profile):
+    """
+    Tabulate a profile, one row per path in first-seen order.
+
+    Columns mirror the notebook review CSV (json_idx, ref_column, sample_data_1..N)
+    plus coverage, null rate, observed types and cardinality.
+    """
+    events = profile["events"] or 1
+    rows = []
+    for path, stats in sorted(profile["paths"].items(), key=lambda item: item[1]["order"]):
+        non_null = stats["present"] - stats["nulls"]
+        row = {
+            "json_idx": stats["order"],
+            "ref_column": path,
+            "present": stats["present"],
+            "coverage": round(stats["present"] / events, 4),
+            "null_rate": round(stats["nulls"] / stats["present"], 4) if stats["present"] else None,
+            "types": ",".join(sorted(stats["types"])),
+            "distinct": f">{SCHEMA_PROFILE_DISTINCT_CAP}" if stats["distinct_overflow"] else len(stats["distinct"]),
+            "is_constant": non_null > 0 and not stats["distinct_overflow"] and len(stats["distinct"]) == 1
+        }
+        for i in range(SCHEMA_PROFILE_SAMPLE_SIZE):
+            row[f"sample_data_{i + 1}"] = stats["samples"][i] if i < len(stats["samples"]) else None
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def curated_paths():
+    """Dotted paths referenced by the ESPN_GAMES_*_SCHEMA definitions in config.py."""
+    paths = set()
+    for file_config in ESPN_FILES.values():
+        if file_config["filename"] != ESPN_FILES["games_core"]["filename"]:
+            continue
+        for _, path, _ in getattr(config, file_config["schema"]):
+            paths.add(".".join(str(p) for p in path))
+    return paths
+
+
+def detect_drift(baseline, current, tolerance=SCHEMA_DRIFT_COVERAGE_TOLERANCE):
+    """
+    Compare a new profile against a baseline.
+
+    Returns:
+        dict: new_paths, missing_paths, type_changes, coverage_drops (curated paths only),
+              curated_missing (curated paths seen in the baseline but absent from the new data)
+    """
+    base_paths, cur_paths = baseline["paths"], current["paths"]
+    base_events, cur_events = baseline["events"] or 1, current["events"] or 1
+    curated = curated_paths()
+
+    type_changes = {}
+    for path in base_paths.keys() & cur_paths.keys():
+        base_types = set(base_paths[path]["types"]) - {"null"}
+        cur_types = set(cur_paths[path]["types"]) - {"null"}
+        if cur_types - base_types:
+            type_changes[path] = {"baseline": sorted(base_types), "current": sorted(cur_types)}
+
+    coverage_drops = {}
+    for path in curated & base_paths.keys() & cur_paths.keys():
+        before = base_paths[path]["present"] / base_events
+        after = cur_paths[path]["present"] / cur_events
+        if before - after > tolerance:
+            coverage_drops[path] = {"baseline": round(before, 4), "current": round(after, 4)}
+
+    return {
+        "new_paths": sorted(cur_paths.keys() - base_paths.keys()),
+        "missing_paths": sorted(base_paths.keys() - cur_paths.keys()),
+        "type_changes": type_changes,
+        "coverage_drops": coverage_drops,
+        "curated_missing": sorted((curated & base_paths.keys()) - cur_paths.keys())
+    }
+
+
+def drift_is_blocking(drift):
+    """Drift that affects curated columns (loader would silently fill defaults)."""
+    curated = curated_paths()
+    return bool(
+        drift["curated_missing"]
+        or drift["coverage_drops"]
+        or curated & drift["type_changes"].keys()
+    )
+
+
+def log_drift(drift):
+    """Log a drift report."""
+    if not any(drift.values()):
+        logger.info("No schema drift against saved profile")
+        return
+
+    logger.info(f"Schema drift: {len(drift['new_paths'])} new paths, {len(drift['missing_paths'])} missing paths")
+    for path in drift["new_paths"][:20]:
+        logger.info(f"  + {path}")
+    for path in drift["missing_paths"][:20]:
+        logger.info(f"  - {path}")
+    for path, change in drift["type_changes"].items():
+        logger.warning(f"  Type change {path}: {change['baseline']} -> {change['current']}")
+    for path, change in drift["coverage_drops"].items():
+        logger.warning(f"  Coverage drop {path}: {change['baseline']:.1%} -> {change['current']:.1%}")
+    for path in drift["curated_missing"]:
+        logger.error(f"  Curated path missing from new data: {path}")
+
+
+def load_profile(path):
+    """Load a saved profile, or None if it doesn't exist."""
+    if not path.exists():
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_accumulated_profile(baseline, current, path):
+    """Merge the current run into the saved profile (skipping sources already profiled)."""
+    if baseline is None:
+        merged = current
+    else:
+        already_seen = set(baseline["sources"]) & set(current["sources"])
+        if already_seen:
+            logger.info(f"Saved profile already includes {sorted(already_seen)} - not merging")
+            return
+        merged = merge_profiles(baseline, current)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(merged, f)
+    logger.info(f"Saved profile ({merged['events']} events, {len(merged['paths'])} paths) to {path}")
+
+
+if __name__ == "__main__":
+    run_main(main)
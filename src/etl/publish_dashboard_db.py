@@ -0,0 +1,142 @@
+"""
+ETL Script: Publish Dashboard Database
+Author: Linda B. Low-k-dielectric
+Date: Week 5
+Purpose: Publish the refreshed database to the location the Streamlit app reads and stamp it
+         with a run id derived from the dashboard marts' contents
+Note: Run after `dbt run` and forecast_attendance, before render_dashboard_figures. The
+      dashboard reads the marts and forecast_attendance from the published file. SQLite:
+      the pipeline database (data/processed/nfl_attendance.db) is copied with the backup API
+      to streamlit_app/nfl_attendance.db - the bundled copy deployments ship, since
+      data/processed/ is gitignored - and renamed into place. DuckDB: the app reads the
+      pipeline file directly, so it is stamped in place. The run id is a hash of the mart
+      rows, so it is the same on every checkout of the same data and the figure cache
+      (keyed by it) matches after a deploy re-renders; unchanged marts keep their id.
+"""
+
+# Standard library
+import argparse
+import hashlib
+import os
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Third-party
+import pandas as pd
+
+# Local
+from src.utils.logging_config import setup_logger
+from src.utils.profiling import run_main
+from src.utils.database import connect, default_db_path, backend_for, read_frame, table_exists, write_table
+from src.utils.config import DASHBOARD_DB_PATH, DB_BACKEND, FORECAST_TABLE
+from streamlit_app.figures import DASHBOARD_MARTS, DASHBOARD_RUN_TABLE
+
+# Logger
+logger = setup_logger(__name__)
+
+
+def main():
+    """Publish the pipeline database for the dashboard."""
+    parser = argparse.ArgumentParser(description="Publish the refreshed database to the dashboard")
+    parser.add_argument("--db-path", type=Path, default=None,
+                        help="Pipeline database (default: the DB_BACKEND database in data/processed)")
+    parser.add_argument("--target", type=Path, default=None,
+                        help="Database the dashboard reads (default: streamlit_app/nfl_attendance.db for SQLite)")
+    args = parser.parse_args()
+
+    source = args.db_path or default_db_path()
+    publish_dashboard_db(source, args.target or dashboard_db_path(backend_for(source)))
+
+
+def dashboard_db_path(backend=DB_BACKEND):
+    """Database the Streamlit app reads: its bundled SQLite copy, or the DuckDB file."""
+    return default_db_path(backend) if backend == "duckdb" else DASHBOARD_DB_PATH
+
+
+def content_run_id(conn):
+    """
+    Run id of a database: SHA-1 over the dashboard marts' columns and rows.
+
+    Raises:
+        ValueError: A mart has not been built yet
+    """
+    missing = [table for table in DASHBOARD_MARTS if not table_exists(conn, table)]
+    if missing:
+        raise ValueError(f"Marts not built yet: {', '.join(missing)} - run `dbt run` first")
+
+    digest = hashlib.sha1()
+    for table in DASHBOARD_MARTS:
+        df = read_frame(conn, f"SELECT * FROM {table}")
+        df = df.sort_values(list(df.columns), ignore_index=True)
+        digest.update(f"{table}:{','.join(df.columns)}".encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def stamp_run(conn, run_id, source):
+    """Record the run id (one row) the app and the figure renderer key their caches on."""
+    write_table(conn, pd.DataFrame([{
+        "run_id": run_id,
+        "source": str(source),
+        "published_at": datetime.now(timezone.utc).isoformat(timespec="seconds")
+    }]), DASHBOARD_RUN_TABLE, if_exists="replace")
+    conn.commit()
+
+
+def publish_dashboard_db(source, target):
+    """
+    Publish source as the dashboard database and stamp its run id.
+
+    Args:
+        source (Path): Pipeline database (after dbt run + forecast)
+        target (Path): Database the dashboard reads (same file for DuckDB)
+
+    Returns:
+        str: The published run id
+    """
+    source, target = Path(source), Path(target)
+    if not source.exists():
+        raise ValueError(f"{source} does not exist - run load_to_database and `dbt run` first")
+
+    conn = connect(source, read_only=True)
+    try:
+        run_id = content_run_id(conn)
+        if not table_exists(conn, FORECAST_TABLE):
+            logger.warning(f"  {FORECAST_TABLE} not in {source} - the outlook chart stays empty "
+                           f"(run forecast_attendance before publishing)")
+    finally:
+        conn.close()
+
+    if source.resolve() == target.resolve():
+        logger.info(f"Stamping run {run_id} into {target}")
+        conn = connect(target)
+        try:
+            stamp_run(conn, run_id, source)
+        finally:
+            conn.close()
+        return run_id
+
+    if backend_for(source) != "sqlite" or backend_for(target) != "sqlite":
+        raise ValueError("Only SQLite databases are copied; DuckDB is stamped in place (omit --target)")
+
+    logger.info(f"Publishing run {run_id}: {source} -> {target}")
+    tmp_path = target.with_name(target.name + ".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+    source_conn = sqlite3.connect(source)
+    tmp_conn = sqlite3.connect(tmp_path)
+    try:
+        # Page-level copy that stays consistent even if a loader still holds the file
+        source_conn.backup(tmp_conn)
+        stamp_run(tmp_conn, run_id, source)
+    finally:
+        tmp_conn.close()
+        source_conn.close()
+    os.replace(tmp_path, target)
+    logger.info(f"  Published {target.stat().st_size / 1024 ** 2:,.1f} MB")
+    return run_id
+
+
+if __name__ == "__main__":
+    run_main(main)
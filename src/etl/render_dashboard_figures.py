@@ -0,0 +1,127 @@
+"""
+ETL Script: Render Dashboard Figures
+Author: Linda B. Low-k-dielectric
+Date: Week 5
+Purpose: Build the dashboard's Plotly figures and summary panels once per data refresh and
+         store the serialized specs in the figure cache, keyed by pipeline run id
+Note: Run after publish_dashboard_db, against the database the dashboard reads
+      (streamlit_app/nfl_attendance.db, or the DuckDB file with GAMEDAY_DB_BACKEND=duckdb).
+      The bundle is keyed by the run id stamped into that database, so the app only uses a
+      bundle rendered from the same mart contents - also on a fresh checkout, once this has
+      run there (the cache is not committed). The figure code lives in streamlit_app/figures.py so the
+      app's no-cache fallback draws the same charts. The bundle is written to a temp file
+      and renamed into place, so a session never reads a half-written render.
+"""
+
+# Standard library
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Local
+from src.utils.logging_config import setup_logger
+from src.utils.profiling import run_main
+from src.utils.database import connect, read_frame, DATABASE_ERRORS
+from src.utils.config import FIGURE_CACHE_PATH, FIGURE_CACHE_KEEP_RUNS
+from src.etl.publish_dashboard_db import dashboard_db_path
+from streamlit_app.figures import (
+    build_dashboard,
+    bundle_path,
+    read_bundle,
+    DASHBOARD_MARTS,
+    DASHBOARD_RUN_TABLE
+)
+
+# Logger
+logger = setup_logger(__name__)
+
+
+def main():
+    """Render the dashboard figures for the current pipeline run."""
+    parser = argparse.ArgumentParser(description="Pre-render the dashboard's Plotly figures")
+    parser.add_argument("--db-path", type=Path, default=None,
+                        help="Database file (default: the one the dashboard reads for DB_BACKEND)")
+    parser.add_argument("--cache-dir", type=Path, default=FIGURE_CACHE_PATH, help="Figure cache directory")
+    parser.add_argument("--force", action="store_true", help="Re-render even if this run is already cached")
+    args = parser.parse_args()
+
+    render_dashboard_figures(args.db_path or dashboard_db_path(), args.cache_dir, args.force)
+
+
+def render_dashboard_figures(db_path, cache_dir=FIGURE_CACHE_PATH, force=False):
+    """
+    Render and cache the dashboard bundle for the database's current pipeline run.
+
+    Args:
+        db_path (Path): Database holding the marts
+        cache_dir (Path): Figure cache directory
+        force (bool): Re-render when the run already has a bundle
+
+    Returns:
+        Path: The run's bundle file
+
+    Raises:
+        ValueError: The database was never published (no run id stamped)
+    """
+    cache_dir = Path(cache_dir)
+    conn = connect(db_path, read_only=True)
+    try:
+        run_id = stored_run_id(conn)
+        if run_id is None:
+            raise ValueError(f"{db_path} has no run id - run `python -m src.etl.publish_dashboard_db` first")
+        path = bundle_path(run_id, cache_dir)
+        if not force and read_bundle(run_id, cache_dir) is not None:
+            logger.info(f"Figures for run {run_id} already cached - nothing to do")
+            return path
+
+        logger.info(f"Rendering dashboard figures for run {run_id}")
+        marts = [read_frame(conn, f"SELECT * FROM {table}") for table in DASHBOARD_MARTS]
+    finally:
+        conn.close()
+
+    bundle = build_dashboard(*marts)
+    bundle["run_id"] = run_id
+    bundle["rendered_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(path, bundle)
+    logger.info(f"  Cached {len(bundle['figures'])} figures ({path.stat().st_size / 1024:,.0f} KB) in {path.parent}")
+
+    prune_runs(cache_dir, keep=run_id)
+    return path
+
+
+def stored_run_id(conn):
+    """Run id publish_dashboard_db stamped into the database (None if it was never published)."""
+    try:
+        runs = read_frame(conn, f"SELECT run_id FROM {DASHBOARD_RUN_TABLE}")
+    except DATABASE_ERRORS:
+        return None
+    return runs["run_id"].iloc[0] if len(runs) else None
+
+
+def write_json_atomic(path, data):
+    """Write JSON next to path, then rename over it (readers see the old or new file, never half)."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def prune_runs(cache_dir, keep, keep_runs=FIGURE_CACHE_KEEP_RUNS):
+    """Drop all but the newest keep_runs run directories (never the current one)."""
+    runs = sorted(
+        (path for path in Path(cache_dir).iterdir() if path.is_dir() and path.name != keep),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True
+    )
+    for path in runs[max(keep_runs - 1, 0):]:
+        shutil.rmtree(path)
+        logger.info(f"  Pruned cached figures of run {path.name}")
+
+
+if __name__ == "__main__":
+    run_main(main)
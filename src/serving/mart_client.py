@@ -0,0 +1,92 @@
+"""
+Client helper for the mart server (src.serving.mart_server)
+
+Payloads are cached on disk as Arrow IPC streams next to their ETag. Every read is a
+conditional GET; on 304 the cached file is memory-mapped and its record batches are used
+in place - no row parsing, no copy into Python objects.
+
+Usage:
+    from src.serving.mart_client import fetch_mart, fetch_mart_frame
+    standings = fetch_mart("mart_win_attendance_correlation", season_year=[2018, 2019])
+    df = fetch_mart_frame("mart_playoff_momentum", columns=["team_name", "attendance_pct_change"])
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+import pyarrow as pa
+import requests
+
+from src.utils.config import MART_SERVER_URL, MART_CACHE_PATH
+
+REQUEST_TIMEOUT_SECONDS = 30
+
+
+def fetch_mart(table, base_url=MART_SERVER_URL, cache_dir=MART_CACHE_PATH, session=None, **params):
+    """
+    Fetch a mart (or filtered slice) as a pyarrow Table backed by a memory-mapped cache file.
+
+    Args:
+        table (str): Mart table name, e.g. 'mart_playoff_momentum'
+        base_url (str): Mart server URL
+        cache_dir (Path): Where payloads and ETags are kept
+        session (requests.Session): Optional session for connection reuse
+        **params: column=value (or list of values) filters, columns=[...], limit=N
+
+    Returns:
+        pyarrow.Table
+    """
+    query = {key: ",".join(map(str, value)) if isinstance(value, (list, tuple)) else str(value)
+             for key, value in sorted(params.items())}
+    payload_path, etag_path = cache_paths(table, query, cache_dir)
+
+    headers = {}
+    if payload_path.exists() and etag_path.exists():
+        headers["If-None-Match"] = etag_path.read_text()
+
+    response = (session or requests).get(
+        f"{base_url.rstrip('/')}/marts/{table}", params=query, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS
+    )
+    if response.status_code != 304:
+        response.raise_for_status()
+        store_payload(payload_path, etag_path, response.content, response.headers.get("ETag"))
+
+    return read_cached(payload_path)
+
+
+def fetch_mart_frame(table, **kwargs):
+    """fetch_mart(...) as a pandas DataFrame."""
+    return fetch_mart(table, **kwargs).to_pandas()
+
+
+def list_marts(base_url=MART_SERVER_URL, session=None):
+    """Server index: run id plus each mart's columns and row count."""
+    response = (session or requests).get(f"{base_url.rstrip('/')}/marts", timeout=REQUEST_TIMEOUT_SECONDS)
+    response.raise_for_status()
+    return response.json()
+
+
+def cache_paths(table, query, cache_dir=MART_CACHE_PATH):
+    """(payload, etag) file paths for a table + query."""
+    key = hashlib.sha1("&".join(f"{k}={v}" for k, v in query.items()).encode()).hexdigest()[:16]
+    payload_path = Path(cache_dir) / f"{table}-{key}.arrows"
+    return payload_path, payload_path.with_suffix(".etag")
+
+
+def store_payload(payload_path, etag_path, body, etag):
+    """Write a payload atomically (readers may still have the old file mapped)."""
+    payload_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = payload_path.with_name(payload_path.name + ".tmp")
+    tmp_path.write_bytes(body)
+    os.replace(tmp_path, payload_path)
+    if etag:
+        etag_path.write_text(etag)
+    elif etag_path.exists():
+        etag_path.unlink()
+
+
+def read_cached(payload_path):
+    """Open a cached IPC stream via mmap; the returned table's buffers point into the mapping."""
+    source = pa.memory_map(str(payload_path), "r")
+    return pa.ipc.open_stream(source).read_all()
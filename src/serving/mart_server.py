@@ -0,0 +1,301 @@
+"""
+Mart Serving: Arrow IPC over HTTP
+Author: Linda B. Low-k-dielectric
+Date: Week 5
+Purpose: Serve the dbt mart_* tables (and filtered slices) to notebooks, the dashboard and
+         internal tools as Arrow IPC streams instead of each client SELECT *-ing SQLite
+Note: Each mart is read into Arrow once per pipeline run; slices are column projections,
+      filters and zero-copy row slices of that table, and serialized payloads are kept
+      by ETag. The ETag is derived from the pipeline run id (dbt invocation id + database
+      file stamp), the table and the normalized query, so a repeat read is a 304 until the
+      next `dbt run`.
+
+Endpoints:
+    GET /marts                                      JSON: run id, tables, columns, row counts
+    GET /marts/<table>                              Arrow IPC stream (whole table)
+    GET /marts/<table>?season_year=2019,2018&team_name=Bills&columns=wins,season_year&limit=50
+
+Usage:
+    python -m src.serving.mart_server [--db-path data/processed/nfl_attendance.db] [--port 8766]
+"""
+
+# Standard library
+import argparse
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+# Third-party
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Local
+from src.utils.logging_config import setup_logger
+from src.utils.database import connect, default_db_path, list_tables, read_arrow
+from src.utils.config import (
+    MART_SERVER_HOST,
+    MART_SERVER_PORT,
+    MART_TABLE_PREFIX,
+    DBT_RUN_RESULTS_PATH
+)
+
+# Logger
+logger = setup_logger(__name__)
+
+PAYLOAD_CACHE_SIZE = 64           # serialized responses kept in memory
+RESERVED_PARAMS = {"columns", "limit"}
+ARROW_STREAM_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def main():
+    """Run the mart server in the foreground."""
+    parser = argparse.ArgumentParser(description="Serve mart tables as Arrow IPC streams")
+    parser.add_argument("--db-path", type=Path, default=None, help="SQLite or .duckdb file (default: DB_BACKEND's)")
+    parser.add_argument("--host", default=MART_SERVER_HOST)
+    parser.add_argument("--port", type=int, default=MART_SERVER_PORT)
+    args = parser.parse_args()
+
+    server, base_url = start_mart_server(args.db_path, args.host, args.port, background=False)
+    logger.info(f"Serving marts from {server.store.db_path} at {base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Mart server stopped")
+    finally:
+        server.server_close()
+
+
+def start_mart_server(db_path=None, host=MART_SERVER_HOST, port=MART_SERVER_PORT, background=True):
+    """
+    Create the server (and start it on a daemon thread unless background=False).
+
+    Returns:
+        tuple: (server, base_url)
+    """
+    server = ThreadingHTTPServer((host, port), MartHandler)
+    server.store = MartStore(Path(db_path or default_db_path()))
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def pipeline_run_id(db_path, run_results=DBT_RUN_RESULTS_PATH):
+    """
+    Identify the pipeline run that produced the marts.
+
+    dbt's invocation id (target/run_results.json) plus the database file's size/mtime, so
+    the id also moves if the file is rebuilt or swapped outside dbt.
+    """
+    invocation = "no-dbt-run"
+    if run_results.exists():
+        try:
+            with open(run_results, "r") as f:
+                invocation = json.load(f).get("metadata", {}).get("invocation_id") or invocation
+        except (OSError, ValueError):
+            pass
+    stat = Path(db_path).stat()
+    return f"{invocation}-{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+
+class MartStore:
+    """Arrow copies of the mart tables for the current run, plus serialized payloads by ETag."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.run_id = None
+        self.tables = {}
+        self.payloads = OrderedDict()
+
+    def current_run(self):
+        """Current run id; drops cached tables when a new run has landed."""
+        run_id = pipeline_run_id(self.db_path)
+        with self.lock:
+            if run_id != self.run_id:
+                if self.run_id is not None:
+                    logger.info(f"New pipeline run detected ({run_id}) - dropping cached marts")
+                self.run_id, self.tables = run_id, {}
+                self.payloads.clear()
+        return run_id
+
+    def mart_names(self):
+        """mart_* tables in the database."""
+        conn = connect(self.db_path, read_only=True)
+        try:
+            return list_tables(conn, prefix=MART_TABLE_PREFIX)
+        finally:
+            conn.close()
+
+    def table(self, name):
+        """Arrow table for a mart (read once per run)."""
+        with self.lock:
+            cached = self.tables.get(name)
+        if cached is not None:
+            return cached
+
+        if name not in self.mart_names():
+            raise KeyError(name)
+        conn = connect(self.db_path, read_only=True)
+        try:
+            table = read_arrow(conn, f"SELECT * FROM {name}")
+        finally:
+            conn.close()
+        with self.lock:
+            self.tables[name] = table
+        return table
+
+    def payload(self, etag, build):
+        """Serialized payload for an ETag, built once."""
+        with self.lock:
+            if etag in self.payloads:
+                self.payloads.move_to_end(etag)
+                return self.payloads[etag]
+        body = build()
+        with self.lock:
+            self.payloads[etag] = body
+            while len(self.payloads) > PAYLOAD_CACHE_SIZE:
+                self.payloads.popitem(last=False)
+        return body
+
+
+def normalize_query(query):
+    """Canonical (sorted) form of the query string, so equivalent requests share an ETag."""
+    return "&".join(f"{key}={','.join(values)}" for key, values in sorted(query.items()))
+
+
+def make_etag(run_id, table, query):
+    """Strong ETag for (run, table, query)."""
+    digest = hashlib.sha1(f"{run_id}|{table}|{normalize_query(query)}".encode()).hexdigest()[:24]
+    return f'"{digest}"'
+
+
+def entity_tags(header):
+    """Entity tags listed in an If-None-Match header, weak (W/) prefixes dropped (weak comparison)."""
+    tags = (tag.strip() for tag in header.split(","))
+    return {tag[2:] if tag.startswith("W/") else tag for tag in tags if tag}
+
+
+def slice_table(table, query):
+    """
+    Apply ?column=v1,v2 equality filters, ?columns= projection and ?limit= to an Arrow table.
+
+    Raises:
+        ValueError: Unknown column, bad value for a column's type, or bad limit
+    """
+    filters = {key: values for key, values in query.items() if key not in RESERVED_PARAMS}
+    mask = None
+    for column, values in filters.items():
+        if column not in table.column_names:
+            raise ValueError(f"Unknown column: {column}")
+        wanted = [v for value in values for v in value.split(",")]
+        try:
+            value_set = pa.array(wanted).cast(table.schema.field(column).type)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+            raise ValueError(f"Bad value for {column}: {e}")
+        condition = pc.is_in(table[column], value_set=value_set)
+        mask = condition if mask is None else pc.and_(mask, condition)
+    if mask is not None:
+        table = table.filter(mask)
+
+    if "columns" in query:
+        columns = [c for value in query["columns"] for c in value.split(",") if c]
+        unknown = [c for c in columns if c not in table.column_names]
+        if unknown:
+            raise ValueError(f"Unknown columns: {unknown}")
+        table = table.select(columns)
+
+    if "limit" in query:
+        try:
+            limit = int(query["limit"][-1])
+        except ValueError:
+            raise ValueError("limit must be an integer")
+        table = table.slice(0, max(limit, 0))
+    return table
+
+
+def to_ipc_stream(table):
+    """Serialize a table's record batches into an Arrow IPC stream buffer."""
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches():
+            writer.write_batch(batch)
+    return sink.getvalue()
+
+
+class MartHandler(BaseHTTPRequestHandler):
+    """Route /marts and /marts/<table> requests."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        query = parse_qs(url.query)
+        store = self.server.store
+
+        try:
+            run_id = store.current_run()
+        except FileNotFoundError:
+            self.send_json(503, {"error": f"Database not found: {store.db_path}"})
+            return
+
+        if parts == ["marts"]:
+            self.send_index(store, run_id)
+        elif len(parts) == 2 and parts[0] == "marts":
+            self.send_mart(store, run_id, parts[1], query)
+        else:
+            self.send_json(404, {"error": f"Unknown path: {url.path}"})
+
+    def send_index(self, store, run_id):
+        """List marts with their columns and row counts."""
+        marts = {}
+        for name in store.mart_names():
+            table = store.table(name)
+            marts[name] = {"rows": table.num_rows, "columns": table.column_names}
+        self.send_json(200, {"run_id": run_id, "marts": marts})
+
+    def send_mart(self, store, run_id, name, query):
+        """Stream a mart (or slice) as Arrow IPC, or 304 if the client already has it."""
+        etag = make_etag(run_id, name, query)
+        tags = entity_tags(self.headers.get("If-None-Match", ""))
+        if etag in tags or ("*" in tags and name in store.mart_names()):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        try:
+            body = store.payload(etag, lambda: to_ipc_stream(slice_table(store.table(name), query)))
+        except KeyError:
+            self.send_json(404, {"error": f"Unknown mart: {name}"})
+            return
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", ARROW_STREAM_TYPE)
+        self.send_header("Content-Length", str(body.size))
+        self.send_header("ETag", etag)
+        self.send_header("X-Pipeline-Run", run_id)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status, payload):
+        """Send a small JSON response."""
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Route access logs through the module logger at debug level."""
+        logger.debug(format % args)
+
+
+if __name__ == "__main__":
+    main()
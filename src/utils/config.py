@@ -2,6 +2,7 @@
 Shared configuration constants for ETL pipeline
 """
 
+import os
 from pathlib import Path
 
 # Project paths (relative to project root)
@@ -12,22 +13,115 @@ PROCESSED_DATA_PATH = DATA_ROOT / "processed"
 SAMPLE_DATA_PATH = DATA_ROOT / "sample"
 LOG_PATH = PROJECT_ROOT / "logs"
 SQL_SETUP_DIR = PROJECT_ROOT / "src" / "etl" / "sql"
+DBT_PROJECT_DIR = PROJECT_ROOT / "dbt_project"
+SYNTHETIC_DATA_PATH = DATA_ROOT / "synthetic"
+BENCHMARK_LOG_PATH = LOG_PATH / "benchmarks"
+PROFILE_LOG_PATH = LOG_PATH / "profiles"
 
 # Data collection parameters
 CURRENT_SEASON_YEARS = [2020, 2021, 2022, 2023, 2024]
 
 # Kaggle data source configuration
 KAGGLE_DATASET_ID = "sujaykapadnis/nfl-stadium-attendance-dataset"
+# Kaggle read dtypes - repeated strings as categoricals, counts downcast to the smallest
+# safe width. Floats stay float64: float32 would write rounding noise (6.1 -> 6.0999999)
+# into SQLite REAL columns. Nullable "Int32" where the source has NA (bye weeks).
+KAGGLE_ATTENDANCE_DTYPES = {
+    'team': 'category',
+    'team_name': 'category',
+    'year': 'int16',
+    'total': 'int32',
+    'home': 'int32',
+    'away': 'int32',
+    'week': 'int8',
+    'weekly_attendance': 'Int32'
+}
+
+KAGGLE_GAMES_DTYPES = {
+    'year': 'int16',
+    'week': 'category',  # '1'-'17' plus 'WildCard', 'Division', 'ConfChamp', 'SuperBowl'
+    'home_team': 'category',
+    'away_team': 'category',
+    'winner': 'category',
+    'tie': 'category',
+    'day': 'category',
+    'date': 'category',  # 'September 3' - parsed into game_date using year
+    'time': 'category',
+    'pts_win': 'int16',
+    'pts_loss': 'int16',
+    'yds_win': 'int16',
+    'turnovers_win': 'int8',
+    'yds_loss': 'int16',
+    'turnovers_loss': 'int8',
+    'home_team_name': 'category',
+    'home_team_city': 'category',
+    'away_team_name': 'category',
+    'away_team_city': 'category'
+}
+
+KAGGLE_STANDINGS_DTYPES = {
+    'team': 'category',
+    'team_name': 'category',
+    'year': 'int16',
+    'wins': 'int8',
+    'loss': 'int8',
+    'points_for': 'int16',
+    'points_against': 'int16',
+    'points_differential': 'int16',
+    'playoffs': 'category',
+    'sb_winner': 'category'
+}
+
+# Each file's read dtypes are the map itself, so loaders pass file_config["dtypes"] straight to pandas
 KAGGLE_FILES = [
-    {"name": "attendance", "filename": "attendance.csv"},
-    {"name": "games", "filename": "games.csv"},
-    {"name": "standings", "filename": "standings.csv"}
+    {"name": "attendance", "filename": "attendance.csv", "dtypes": KAGGLE_ATTENDANCE_DTYPES},
+    {"name": "games", "filename": "games.csv", "dtypes": KAGGLE_GAMES_DTYPES, "season_date": "date"},
+    {"name": "standings", "filename": "standings.csv", "dtypes": KAGGLE_STANDINGS_DTYPES}
 ]
 
-# ESPN API endpoints
-ESPN_BASE_URL = "https://site.api.espn.com/apis/site/v2/sports/football/nfl"
+# Files larger than this are streamed into SQLite in chunks to cap peak memory
+KAGGLE_CHUNK_THRESHOLD_MB = 50
+KAGGLE_CHUNK_ROWS = 250_000
+
+# ESPN API endpoints (override ESPN_BASE_URL to point at a local stub server)
+ESPN_BASE_URL = os.environ.get(
+    "ESPN_BASE_URL", "https://site.api.espn.com/apis/site/v2/sports/football/nfl"
+)
 ESPN_TEAMS_URL = f"{ESPN_BASE_URL}/teams"
 ESPN_SCOREBOARD_URL = f"{ESPN_BASE_URL}/scoreboard"
+ESPN_SUMMARY_URL = f"{ESPN_BASE_URL}/summary"
+
+# ESPN leagues (src/utils/leagues.py). A league's raw pulls live in RAW_DATA_PATH/<league>/ and
+# its tables carry table_prefix (cfb_espn_games_core); the default league keeps the original
+# unprefixed paths and table names. "weeks": None pulls one scoreboard page per season,
+# a list pulls one page per season week (college football pages are capped per request).
+ESPN_API_ROOT = os.environ.get("ESPN_API_ROOT", "https://site.api.espn.com/apis/site/v2/sports")
+DEFAULT_LEAGUE = "nfl"
+LEAGUES = {
+    "nfl": {
+        "path": "football/nfl",
+        "base_url": ESPN_BASE_URL,
+        "table_prefix": "",
+        "seasons": CURRENT_SEASON_YEARS,
+        "weeks": None,
+        "scoreboard_params": {"seasontype": 2, "limit": 300},
+        "teams_params": {},
+        "travel_features": True
+    },
+    "cfb": {
+        "path": "football/college-football",
+        "base_url": f"{ESPN_API_ROOT}/football/college-football",
+        "table_prefix": "cfb_",
+        "seasons": CURRENT_SEASON_YEARS,
+        "weeks": list(range(1, 16)),
+        "scoreboard_params": {"seasontype": 2, "groups": 80, "limit": 1000},  # groups=80: FBS
+        "teams_params": {"groups": 80, "limit": 1000},
+        "travel_features": False    # college towns aren't in GEOCODE_LOOKUP (NFL markets only)
+    }
+}
+PIPELINE_LEAGUES = os.environ.get("GAMEDAY_LEAGUES", DEFAULT_LEAGUE).split(",")    # opt in: GAMEDAY_LEAGUES=nfl,cfb
+LEAGUE_HTTP_CONNECTIONS = 8         # concurrent ESPN requests shared by all leagues
+LEAGUE_REQUEST_TIMEOUT_SECONDS = 30
 
 # ESPN data source configuration
 ESPN_FILES = {
@@ -181,6 +275,31 @@ ESPN_GAMES_VENUE_SCHEMA = [
     ('team_venue_id_away', ['competitions', 0, 'competitors', 1, 'team', 'venue', 'id'], ''),
 ]
 
+# ESPN schema profiling (drift checks on new pulls)
+ESPN_SCHEMA_PROFILE_PATH = PROCESSED_DATA_PATH / "espn_schema_profile.json"
+SCHEMA_PROFILE_SAMPLE_SIZE = 3      # first N distinct values kept per path (sample_data_1..3)
+SCHEMA_PROFILE_DISTINCT_CAP = 20    # distinct values tracked before a path counts as high-cardinality
+SCHEMA_DRIFT_COVERAGE_TOLERANCE = 0.10  # flag curated paths whose coverage drops by more than this
+
+# Live scoreboard polling (in-season mode)
+LIVE_POLL_MIN_SECONDS = 15       # while any game is in progress
+LIVE_POLL_MAX_SECONDS = 300      # back-off ceiling when nothing is live
+LIVE_POLL_TIMEOUT_SECONDS = 10
+
+# Compressed raw archive (append-only per-season segments + offset index, src/utils/raw_archive.py)
+RAW_ARCHIVE_PATH = RAW_DATA_PATH / "archive"
+RAW_ARCHIVE_CODEC = "gzip"          # or "zstd" (needs the zstandard package)
+RAW_ARCHIVE_LEVEL = 6
+
+# Per-game summary/boxscore backfill (resumable work queue)
+GAME_DETAIL_QUEUE_PATH = RAW_DATA_PATH / "espn_game_details.db"
+GAME_DETAIL_WORKERS = 8             # concurrent summary requests
+GAME_DETAIL_BATCH_SIZE = 100        # results per checkpoint transaction
+GAME_DETAIL_MAX_ATTEMPTS = 3        # runs before an event is parked as 'failed'
+GAME_DETAIL_RETRIES = 3             # in-request retries on 429/5xx
+GAME_DETAIL_TIMEOUT_SECONDS = 20
+GAME_DETAIL_TEAM_STATS_TABLE = 'espn_game_team_stats'
+
 # Team reference data configuration
 TEAM_REFERENCE_FILES = {
     "seed": {
@@ -198,6 +317,50 @@ TEAM_REFERENCE_FILES = {
 DB_NAME = "nfl_attendance.db"
 DB_PATH = PROCESSED_DATA_PATH / DB_NAME
 
+# Optional DuckDB backend (columnar, multi-threaded) - see src/utils/database.py
+DB_BACKENDS = ("sqlite", "duckdb")
+DB_BACKEND = os.environ.get("GAMEDAY_DB_BACKEND", "sqlite")
+DUCKDB_NAME = "nfl_attendance.duckdb"
+DUCKDB_PATH = PROCESSED_DATA_PATH / DUCKDB_NAME
+
+# Optional season-partitioned layout: one SQLite file per season range, ATTACHed on read
+PARTITION_PATH = PROCESSED_DATA_PATH / "partitions"
+PARTITION_SHARED_DB = "shared.db"    # tables without a season (espn_teams, team_reference)
+PARTITION_ORIGIN_YEAR = 2000
+PARTITION_SPAN_YEARS = 5             # seasons per file; SQLite attaches at most 10 files by default
+PARTITION_WORKERS = 4
+PARTITION_YEAR_COLUMNS = {           # partitioned tables that carry their season (indexed for pruning)
+    'kaggle_attendance': 'year',
+    'kaggle_games': 'year',
+    'kaggle_standings': 'year',
+    'espn_games_time': 'season_year'
+}
+
+# Mart serving: Arrow IPC over HTTP (src/serving), ETags keyed to the dbt run
+MART_SERVER_HOST = "127.0.0.1"
+MART_SERVER_PORT = 8766
+MART_SERVER_URL = os.environ.get("GAMEDAY_MART_URL", f"http://{MART_SERVER_HOST}:{MART_SERVER_PORT}")
+MART_TABLE_PREFIX = "mart_"
+MART_CACHE_PATH = DATA_ROOT / "cache" / "marts"    # client-side payload cache
+DBT_RUN_RESULTS_PATH = DBT_PROJECT_DIR / "target" / "run_results.json"
+
+# Dashboard figure cache (src/etl/render_dashboard_figures.py -> streamlit_app/figures.py):
+# serialized Plotly specs per run id (stamped by src/etl/publish_dashboard_db.py), read by the
+# app instead of rebuilding figures
+FIGURE_CACHE_PATH = Path(os.environ.get("GAMEDAY_FIGURE_CACHE", PROJECT_ROOT / "streamlit_app" / "figure_cache"))
+FIGURE_CACHE_KEEP_RUNS = 3          # renders kept (newest first); older run directories are pruned
+DASHBOARD_DB_PATH = PROJECT_ROOT / "streamlit_app" / DB_NAME    # bundled copy the app reads (SQLite), published from DB_PATH
+
+# Opt-in profiling of src.etl entry points (src/utils/profiling.py): --profile on the command
+# line, or GAMEDAY_PROFILE=1 (every module) / GAMEDAY_PROFILE=load_to_database,build_team_features
+PROFILE_FLAG = "--profile"
+PROFILE_MODULES = os.environ.get("GAMEDAY_PROFILE", "")
+PROFILE_TOP_FUNCTIONS = 30          # rows per hot-spot table in the summary
+PROFILE_TOP_ALLOCATIONS = 25
+PROFILE_TRACEMALLOC_FRAMES = 1      # frames kept per allocation; deeper stacks cost memory/time
+PROFILE_MEMORY_SAMPLE_SECONDS = 0.5 # how often traced memory is checked for a new peak
+PROFILE_SNAPSHOT_GROWTH = 0.10      # re-snapshot once memory is 10% above the last snapshot
+
 # SQL configuration
 VIEW_FILES = [
     'v_teams_unified.sql',
@@ -211,6 +374,130 @@ DB_TABLES = [
     'kaggle_games', 
     'kaggle_standings',
     'espn_teams',
-    'espn_games',
+    'espn_games_core',
+    'espn_games_publicity',
+    'espn_games_score_wins',
+    'espn_games_stats_data',
+    'espn_games_team_attributes',
+    'espn_games_time',
+    'espn_games_venue',
     'team_reference'
-]
\ No newline at end of file
+]
+
+# Data quality checks - compiled into ONE aggregate query per table (see src/etl/data_quality.py)
+# Check types:
+#   row_count          min rows (default 1)
+#   null_rate          column, max fraction of NULLs
+#   range              column, min/max allowed values, max_violations (default 0)
+#   unique             columns forming the key, max_duplicates (default 0)
+#   reference_coverage reference table, on {table_col: reference_col}, optional year_column
+#                      matched against reference active_years, max_unmatched (default 0)
+KAGGLE_TEAM_REFERENCE_CHECK = {
+    'check': 'reference_coverage',
+    'reference': 'team_reference',
+    'on': {'team': 'team_city', 'team_name': 'team_name'},
+    'year_column': 'year'
+}
+
+DATA_QUALITY_CHECKS = {
+    'kaggle_attendance': [
+        {'check': 'row_count'},
+        {'check': 'null_rate', 'column': 'weekly_attendance', 'max': 0.10},  # bye weeks are NULL
+        {'check': 'range', 'column': 'weekly_attendance', 'min': 0, 'max': 120000},
+        {'check': 'unique', 'columns': ['team', 'team_name', 'year', 'week']},
+        KAGGLE_TEAM_REFERENCE_CHECK
+    ],
+    'kaggle_games': [
+        {'check': 'row_count'},
+        {'check': 'null_rate', 'column': 'winner', 'max': 0.0},
+        {'check': 'range', 'column': 'pts_loss', 'min': 0, 'max': 100},
+        {'check': 'unique', 'columns': ['year', 'week', 'home_team', 'away_team']}
+    ],
+    'kaggle_standings': [
+        {'check': 'row_count'},
+        {'check': 'range', 'column': 'wins', 'min': 0, 'max': 17},
+        {'check': 'unique', 'columns': ['team', 'team_name', 'year']},
+        KAGGLE_TEAM_REFERENCE_CHECK
+    ],
+    'espn_teams': [
+        {'check': 'row_count'},
+        {'check': 'unique', 'columns': ['id']},
+        {'check': 'reference_coverage', 'reference': 'team_reference', 'on': {'id': 'espn_team_id'}}
+    ],
+    'espn_games_core': [
+        {'check': 'row_count'},
+        {'check': 'range', 'column': 'attendance', 'min': 0, 'max': 120000},
+        {'check': 'unique', 'columns': ['id']}
+    ],
+    'espn_games_publicity': [{'check': 'row_count'}, {'check': 'unique', 'columns': ['id']}],
+    'espn_games_score_wins': [{'check': 'row_count'}, {'check': 'unique', 'columns': ['id']}],
+    'espn_games_stats_data': [{'check': 'row_count'}, {'check': 'unique', 'columns': ['id']}],
+    'espn_games_team_attributes': [
+        {'check': 'row_count'},
+        {'check': 'unique', 'columns': ['id']},
+        {'check': 'reference_coverage', 'reference': 'team_reference', 'on': {'id_home': 'espn_team_id'}},
+        {'check': 'reference_coverage', 'reference': 'team_reference', 'on': {'id_away': 'espn_team_id'}}
+    ],
+    'espn_games_time': [
+        {'check': 'row_count'},
+        {'check': 'null_rate', 'column': 'season_year', 'max': 0.0},
+        {'check': 'unique', 'columns': ['id']}
+    ],
+    'espn_games_venue': [
+        {'check': 'row_count'},
+        {'check': 'null_rate', 'column': 'venue_id', 'max': 0.01},
+        {'check': 'unique', 'columns': ['id']}
+    ],
+    'team_reference': [
+        {'check': 'row_count'},
+        {'check': 'null_rate', 'column': 'espn_team_id', 'max': 0.0},
+        {'check': 'unique', 'columns': ['espn_team_id', 'active_years']}
+    ]
+}
+
+QUALITY_CHECK_WORKERS = 4
+TABLE_FINGERPRINTS_TABLE = '_etl_table_fingerprints'
+QUALITY_CACHE_TABLE = '_etl_quality_cache'
+
+# Stratified dev/test sample (python -m src.etl.create_sample_dataset)
+SAMPLE_OUTPUT_PATH = SAMPLE_DATA_PATH / "stratified"
+SAMPLE_FRACTION = 0.10              # target share of source rows
+SAMPLE_SEED = 42
+SAMPLE_MIN_TEAMS_PER_DIVISION = 2   # keeps division games (both teams sampled) in the sample
+SAMPLE_MIN_SEASONS = 2              # consecutive seasons, so prior-season LAGs have data
+SAMPLE_MANIFEST = "sample_manifest.json"
+
+# Synthetic data generation (scale-out testing)
+SYNTHETIC_START_YEAR = 2000
+SYNTHETIC_WEEKS_PER_SEASON = 17
+SYNTHETIC_BASE_GAME_ID = 400000000
+SYNTHETIC_BASE_VENUE_ID = 3000
+
+# Monte Carlo attendance forecast (python -m src.etl.forecast_attendance, after dbt run)
+FORECAST_TABLE = 'forecast_attendance'
+FORECAST_SIMULATIONS = 20000        # season scenarios per team
+FORECAST_BATCH_SIZE = 5000          # scenarios drawn per batch (bounds the teams x scenarios x games array)
+FORECAST_HORIZON_SEASONS = 3
+FORECAST_SEED = 2025
+FORECAST_PERCENTILES = [5, 25, 50, 75, 95]
+FORECAST_GAMES_PER_SEASON = 17
+FORECAST_HOME_GAMES = 8             # when a team has no ESPN home games to count
+FORECAST_GAME_SIGMA = 0.05          # per-game log-attendance spread when a team has no ESPN home games
+FORECAST_SHRINKAGE_SEASONS = 5      # pseudo-seasons pulling a team's volatility toward the league's
+FORECAST_SELLOUT_SHARE = 0.98       # season average at/above this share of capacity counts as a sellout
+
+# Travel-distance features (python -m src.etl.build_travel_features, before dbt run).
+# The lookup is read from disk by that step only (not a dbt seed) and covers NFL markets.
+GEOCODE_LOOKUP = {
+    "filename": "city_geocodes.csv",        # offline city/state -> lat/lon lookup
+    "path": DATA_ROOT / "reference"
+}
+TRAVEL_TABLE = 'espn_game_travel'
+VENUE_GEOCODE_TABLE = 'venue_geocodes'
+TRAVEL_REGIONAL_MILES = 300         # drivable for visiting fans: regional games / nearby venues
+TRAVEL_INDEX_CELL_DEGREES = 2.0     # grid cell size of the venue spatial index
+
+# Team feature store (python -m src.etl.build_team_features, before dbt run)
+FEATURE_TABLE = 'team_season_features'
+FEATURE_ROLLING_SEASONS = [3, 5]    # rolling-mean windows, current season included
+FEATURE_DELTA_SEASONS = [1, 3]      # year-over-year / multi-season changes
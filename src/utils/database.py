@@ -0,0 +1,122 @@
+"""
+Database backends for the raw/mart tables: SQLite (default) or embedded DuckDB
+
+The backend is picked from the file extension (.duckdb -> DuckDB, anything else -> SQLite),
+so the same loaders, quality checks and benchmarks work against either file. Set
+GAMEDAY_DB_BACKEND=duckdb to make DuckDB the default target.
+"""
+
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+from src.utils.config import DB_BACKEND, DB_PATH, DUCKDB_PATH
+
+try:
+    import duckdb
+except ImportError:  # optional: only needed for the duckdb backend
+    duckdb = None
+
+# Errors raised for missing tables/columns or bad SQL on either backend
+# (pandas re-raises SQLite errors from read_sql_query as its own DatabaseError)
+DATABASE_ERRORS = (sqlite3.OperationalError, pd.errors.DatabaseError) + ((duckdb.Error,) if duckdb else ())
+
+_FRAME_VIEW = "_gameday_frame"
+
+
+def default_db_path(backend=DB_BACKEND):
+    """Default database file for a backend."""
+    return DUCKDB_PATH if backend == "duckdb" else DB_PATH
+
+
+def backend_for(db_path):
+    """Backend implied by a database file name."""
+    return "duckdb" if Path(db_path).suffix == ".duckdb" else "sqlite"
+
+
+def connect(db_path=None, read_only=False):
+    """
+    Open a connection to a SQLite or DuckDB database file.
+
+    Args:
+        db_path (Path): Database file (default: the DB_BACKEND default path)
+        read_only (bool): Open without write access
+
+    Returns:
+        sqlite3.Connection or duckdb.DuckDBPyConnection
+    """
+    db_path = Path(db_path or default_db_path())
+    if backend_for(db_path) == "duckdb":
+        if duckdb is None:
+            raise ImportError("DuckDB backend requested but duckdb is not installed (pip install duckdb)")
+        return duckdb.connect(str(db_path), read_only=read_only)
+    if read_only:
+        return sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+    return sqlite3.connect(db_path)
+
+
+def is_duckdb(conn):
+    """Whether a connection is a DuckDB connection."""
+    return duckdb is not None and isinstance(conn, duckdb.DuckDBPyConnection)
+
+
+def write_table(conn, df, table_name, if_exists="replace"):
+    """
+    Write a DataFrame to a table (DataFrame.to_sql semantics for 'replace' / 'append').
+
+    DuckDB scans the frame in place (no row-by-row inserts); categoricals are written as
+    plain strings so both backends end up with the same column types.
+    """
+    if not is_duckdb(conn):
+        df.to_sql(table_name, conn, if_exists=if_exists, index=False)
+        return
+
+    categoricals = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+    if categoricals:
+        df = df.astype({c: object for c in categoricals})
+
+    conn.register(_FRAME_VIEW, df)
+    try:
+        if if_exists == "replace" or not table_exists(conn, table_name):
+            conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM {_FRAME_VIEW}")
+        else:
+            conn.execute(f"INSERT INTO {table_name} BY NAME SELECT * FROM {_FRAME_VIEW}")
+    finally:
+        conn.unregister(_FRAME_VIEW)
+
+
+def read_frame(conn, query, params=None):
+    """Run a query and return a DataFrame."""
+    if is_duckdb(conn):
+        return conn.execute(query, params or []).df()
+    return pd.read_sql_query(query, conn, params=params)
+
+
+def read_arrow(conn, query, params=None):
+    """Run a query and return a pyarrow Table (DuckDB hands its columns over without a pandas hop)."""
+    import pyarrow as pa
+
+    if is_duckdb(conn):
+        result = conn.execute(query, params or []).arrow()
+        # Newer DuckDB returns a RecordBatchReader, older versions a Table
+        return result.read_all() if hasattr(result, "read_all") else result
+    return pa.Table.from_pandas(read_frame(conn, query, params), preserve_index=False)
+
+
+def table_exists(conn, table_name):
+    """Whether a table exists in the database."""
+    if is_duckdb(conn):
+        query = "SELECT 1 FROM information_schema.tables WHERE table_name = ? AND table_type = 'BASE TABLE'"
+    else:
+        query = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?"
+    return conn.execute(query, [table_name]).fetchone() is not None
+
+
+def list_tables(conn, prefix=""):
+    """Names of base tables, optionally filtered by prefix."""
+    if is_duckdb(conn):
+        query = "SELECT table_name FROM information_schema.tables WHERE table_type = 'BASE TABLE'"
+    else:
+        query = "SELECT name FROM sqlite_master WHERE type = 'table'"
+    return sorted(row[0] for row in conn.execute(query).fetchall() if row[0].startswith(prefix))
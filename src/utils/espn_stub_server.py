@@ -0,0 +1,247 @@
+"""
+Local stub of the ESPN site API for offline runs of the live/ingest scripts
+
+Replays recorded payloads from a snapshot directory:
+    scoreboard_0000.json, scoreboard_0001.json, ...   served in order, one per request
+                                                      (the last snapshot repeats)
+    teams.json                                        served for .../teams
+    summaries/<event_id>.json                         served for .../summary?event=<id>
+    espn_games.json                                   otherwise, summaries are synthesized
+                                                      (deterministically) from these events;
+                                                      without scoreboard_*.json, scoreboards
+                                                      are too (filtered by ?dates= and ?week=)
+    espn_teams.json                                   without teams.json, served as .../teams
+
+Any URL prefix is accepted, so pointing ESPN_BASE_URL at http://127.0.0.1:<port>/nfl works.
+A subdirectory named like a segment of the URL path holds that league's payloads
+(<snapshots>/college-football/ answers .../football/college-football/scoreboard), so one
+server can stand in for every league; other URLs are answered from the directory itself.
+Responses carry an ETag and honour If-None-Match with 304, like the real CDN.
+
+Usage:
+    python -m src.utils.espn_stub_server --snapshots data/snapshots/week1 --port 8765
+    ESPN_BASE_URL=http://127.0.0.1:8765/nfl python -m src.etl.poll_live_scoreboard
+    python -m src.etl.ingest_current_season --api-root http://127.0.0.1:8765 --raw-path /tmp/raw
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+from src.utils.json_stream import iter_json_records
+from src.utils.logging_config import setup_logger
+from src.utils.raw_archive import event_season, event_week
+
+logger = setup_logger(__name__)
+
+# (name, label, low, high) team boxscore stats for synthesized summaries
+SUMMARY_STATS = [
+    ("firstDowns", "1st Downs", 10, 30),
+    ("totalYards", "Total Yards", 180, 520),
+    ("netPassingYards", "Passing", 90, 400),
+    ("rushingYards", "Rushing", 30, 220),
+    ("turnovers", "Turnovers", 0, 4),
+    ("totalPenaltiesYards", "Penalties", 2, 14),
+    ("possessionTime", "Possession", 24, 36),
+]
+
+
+def start_stub_server(snapshot_dir, host="127.0.0.1", port=0, latency_ms=0, error_rate=0.0):
+    """
+    Start the stub server on a background thread.
+
+    Args:
+        snapshot_dir (Path): Directory of recorded payloads
+        host (str): Interface to bind
+        port (int): Port (0 picks a free one)
+        latency_ms (int): Artificial delay per response
+        error_rate (float): Fraction of summary requests answered with a 503
+
+    Returns:
+        tuple: (server, base_url) - call server.shutdown() when done
+    """
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.snapshot_dir = Path(snapshot_dir)
+    server.latency = latency_ms / 1000
+    server.error_rate = error_rate
+    server.sources = {}
+    server.lock = threading.Lock()
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serve recorded ESPN payloads by the last path segment of the request."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        endpoint = url.path.rstrip("/").rsplit("/", 1)[-1]
+        query = parse_qs(url.query)
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if endpoint == "summary" and random.random() < self.server.error_rate:
+            self.send_error(503, "Injected failure")
+            return
+
+        body = self.resolve(self.source(url.path), endpoint, query)
+        if body is None:
+            self.send_error(404, f"No recorded payload for {url.path}?{url.query}")
+            return
+
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def source(self, path):
+        """Replay state of the snapshot directory serving a URL path (created on first use)."""
+        server = self.server
+        directory = server.snapshot_dir
+        for segment in path.strip("/").split("/")[:-1]:
+            if segment and (server.snapshot_dir / segment).is_dir():
+                directory = server.snapshot_dir / segment
+        with server.lock:
+            if directory not in server.sources:
+                server.sources[directory] = SnapshotSource(directory)
+            return server.sources[directory]
+
+    def resolve(self, source, endpoint, query):
+        """Map an endpoint (and query) to the response body, or None for a 404."""
+        payload_file = None
+        if endpoint == "scoreboard":
+            if not source.scoreboards:
+                events = source.events()
+                return json.dumps(scoreboard_payload(events.values(), query)).encode() if events else None
+            payload_file = source.next_scoreboard()
+        elif endpoint == "teams":
+            payload_file = source.directory / "teams.json"
+            if not payload_file.exists():
+                return teams_payload(source.directory / "espn_teams.json")
+        elif endpoint == "summary":
+            event_id = query.get("event", [""])[0]
+            payload_file = source.directory / "summaries" / f"{event_id}.json"
+            if not payload_file.exists():
+                event = source.events().get(event_id)
+                return json.dumps(summary_payload(event)).encode() if event else None
+
+        if payload_file is None or not payload_file.exists():
+            return None
+        return payload_file.read_bytes()
+
+    def log_message(self, format, *args):
+        """Keep test output quiet."""
+        pass
+
+
+class SnapshotSource:
+    """Payloads of one snapshot directory and its position in the scoreboard replay."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.scoreboards = sorted(directory.glob("scoreboard_*.json"))
+        self.position = 0
+        self._events = None
+        self.lock = threading.Lock()
+
+    def next_scoreboard(self):
+        """Next recorded scoreboard file (the last one repeats)."""
+        with self.lock:
+            payload_file = self.scoreboards[min(self.position, len(self.scoreboards) - 1)]
+            self.position += 1
+        return payload_file
+
+    def events(self):
+        """Index espn_games.json by event id (loaded once, on first use)."""
+        with self.lock:
+            if self._events is None:
+                events_file = self.directory / "espn_games.json"
+                self._events = {}
+                if events_file.exists():
+                    self._events = {str(e.get("id")): e for e in iter_json_records(events_file)}
+        return self._events
+
+
+def scoreboard_payload(events, query):
+    """Scoreboard-shaped payload of the events matching ?dates=<season> and ?week=<n>."""
+    season = query.get("dates", [""])[0][:4]
+    week = query.get("week", [""])[0]
+    return {"events": [
+        event for event in events
+        if (not season or event_season(event) == int(season))
+        and (not week or event_week(event) == int(week))
+    ]}
+
+
+def teams_payload(teams_file):
+    """Wrap a saved espn_teams.json list in the .../teams response shape (None if missing)."""
+    if not teams_file.exists():
+        return None
+    with open(teams_file, "r") as f:
+        teams = json.load(f)
+    return json.dumps({"sports": [{"leagues": [{"teams": teams}]}]}).encode()
+
+
+def summary_payload(event):
+    """Build a summary-shaped payload (header + boxscore team stats) for a scoreboard event."""
+    rng = random.Random(int(event["id"]))
+    competition = event.get("competitions", [{}])[0]
+    teams = []
+    for competitor in competition.get("competitors", []):
+        team = competitor.get("team", {})
+        teams.append({
+            "team": {"id": team.get("id"), "abbreviation": team.get("abbreviation")},
+            "homeAway": competitor.get("homeAway"),
+            "statistics": [
+                {"name": name, "label": label, "displayValue": str(rng.randint(low, high))}
+                for name, label, low, high in SUMMARY_STATS
+            ]
+        })
+    return {
+        "header": {"id": event["id"], "competitions": [competition]},
+        "boxscore": {"teams": teams}
+    }
+
+
+def main():
+    """Run the stub server in the foreground."""
+    parser = argparse.ArgumentParser(description="Replay recorded ESPN payloads locally")
+    parser.add_argument("--snapshots", type=Path, required=True, help="Directory of recorded payloads")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of summary requests to 503")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(
+        args.snapshots, args.host, args.port, args.latency_ms, args.error_rate
+    )
+    logger.info(f"Serving {args.snapshots} at {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        logger.info("Stub server stopped")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
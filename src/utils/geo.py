@@ -0,0 +1,91 @@
+"""
+Geography helpers: vectorized haversine distance and a grid spatial index over points
+
+Distances are great-circle miles. Game travel distances come straight from
+haversine_miles over the games array; the grid index only answers radius queries, which
+build_travel_features uses for each venue's regional_venue_count (other venues within
+driving range). It buckets points into lat/lon cells held as sorted NumPy arrays, so a
+radius query only measures points in the cells the radius can reach instead of every point.
+"""
+
+import numpy as np
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE_LAT = 69.05
+
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in miles; arguments are scalars or broadcastable arrays (degrees).
+
+    NaN coordinates give NaN distances.
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=float)) for a in (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class GridIndex:
+    """Points bucketed by (lat, lon) grid cell for radius queries."""
+
+    def __init__(self, keys, latitudes, longitudes, cell_degrees=2.0):
+        latitudes = np.asarray(latitudes, dtype=float)
+        longitudes = np.asarray(longitudes, dtype=float)
+        valid = ~(np.isnan(latitudes) | np.isnan(longitudes))
+
+        self.cell_degrees = cell_degrees
+        self.keys = np.asarray(keys)[valid]
+        self.latitudes = latitudes[valid]
+        self.longitudes = longitudes[valid]
+
+        # Points sorted by cell; each cell is a contiguous [start, end) run
+        cells = self._cells(self.latitudes, self.longitudes)
+        order = np.lexsort((cells[:, 1], cells[:, 0]))
+        self.keys, self.latitudes, self.longitudes = self.keys[order], self.latitudes[order], self.longitudes[order]
+        unique_cells, starts = np.unique(cells[order], axis=0, return_index=True)
+        ends = np.append(starts[1:], len(order))
+        self.cell_runs = {tuple(cell): (start, end) for cell, start, end in zip(unique_cells.tolist(), starts, ends)}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _cells(self, latitudes, longitudes):
+        """Grid cell (row, col) per point; columns wrap at the antimeridian."""
+        columns = int(np.ceil(360 / self.cell_degrees))
+        return np.column_stack([
+            np.floor(np.asarray(latitudes) / self.cell_degrees),
+            np.floor((np.asarray(longitudes) + 180) / self.cell_degrees) % columns
+        ]).astype(int)
+
+    def _candidates(self, lat, lon, miles):
+        """Positions of points in the cells a radius around (lat, lon) touches."""
+        columns = int(np.ceil(360 / self.cell_degrees))
+        lat_span = miles / MILES_PER_DEGREE_LAT
+        lon_span = lat_span / max(np.cos(np.radians(min(abs(lat) + lat_span, 90.0))), 1e-6)
+        row_lo, row_hi = (int(np.floor(x / self.cell_degrees)) for x in (lat - lat_span, lat + lat_span))
+        if lon_span >= 180:
+            cols = range(columns)
+        else:
+            col_lo, col_hi = (int(np.floor((x + 180) / self.cell_degrees)) for x in (lon - lon_span, lon + lon_span))
+            cols = sorted({col % columns for col in range(col_lo, col_hi + 1)})
+        runs = [self.cell_runs[(row, col)]
+                for row in range(row_lo, row_hi + 1)
+                for col in cols
+                if (row, col) in self.cell_runs]
+        if not runs:
+            return np.empty(0, dtype=int)
+        return np.concatenate([np.arange(start, end) for start, end in runs])
+
+    def query_radius(self, lat, lon, miles):
+        """
+        Points within `miles` of (lat, lon).
+
+        Returns:
+            tuple: (keys, distances) sorted by distance
+        """
+        positions = self._candidates(lat, lon, miles)
+        distances = haversine_miles(lat, lon, self.latitudes[positions], self.longitudes[positions])
+        inside = distances <= miles
+        order = np.argsort(distances[inside], kind="stable")
+        return self.keys[positions[inside][order]], distances[inside][order]
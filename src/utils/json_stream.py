@@ -0,0 +1,84 @@
+"""
+Streaming readers for raw JSON payloads
+"""
+
+import gzip
+import json
+
+STREAM_CHUNK_CHARS = 1 << 20  # 1M characters per read
+
+
+def iter_json_records(path):
+    """
+    Yield records from a raw JSON file one at a time.
+
+    Supports a top-level JSON array of objects (.json, as written by save_data),
+    JSON lines (.jsonl), and gzip-compressed variants of either (.json.gz, .jsonl.gz).
+
+    Args:
+        path (Path): File to read
+
+    Yields:
+        dict: One decoded record
+    """
+    suffixes = path.suffixes
+    opener = gzip.open if suffixes and suffixes[-1] == ".gz" else open
+
+    with opener(path, "rt") as f:
+        if ".jsonl" in suffixes:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from iter_json_array(f)
+
+
+def iter_json_array(f, chunk_chars=STREAM_CHUNK_CHARS):
+    """
+    Incrementally decode a top-level JSON array of objects from a text file handle.
+
+    Only one read buffer plus the record being decoded is held in memory, so a
+    multi-GB espn_games.json can be scanned without json.load()-ing it.
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(chunk_chars)
+    pos = _skip_whitespace(buffer, 0)
+
+    if pos >= len(buffer) or buffer[pos] != "[":
+        raise ValueError("Expected a JSON array")
+    pos += 1
+
+    while True:
+        pos = _skip_whitespace(buffer, pos, extra=",")
+        if pos >= len(buffer):
+            more = f.read(chunk_chars)
+            if not more:
+                raise ValueError("Unterminated JSON array")
+            buffer, pos = buffer[pos:] + more, 0
+            continue
+
+        if buffer[pos] == "]":
+            return
+
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Record straddles the buffer boundary - read more and retry
+            more = f.read(chunk_chars)
+            if not more:
+                raise
+            buffer, pos = buffer[pos:] + more, 0
+            continue
+
+        yield record
+        pos = end
+        if pos > chunk_chars:
+            buffer, pos = buffer[pos:], 0
+
+
+def _skip_whitespace(buffer, pos, extra=""):
+    """Advance pos past whitespace (and any characters in extra)."""
+    skip = " \t\r\n" + extra
+    while pos < len(buffer) and buffer[pos] in skip:
+        pos += 1
+    return pos
@@ -0,0 +1,137 @@
+"""
+League parameters for the ESPN pipeline: endpoints, namespaced tables/paths and a shared
+HTTP connection budget
+
+Every league in config.LEAGUES is pulled from its own ESPN site API path and lands in its own
+raw directory and tables. The default league (NFL) keeps the original unprefixed names, so
+single-league runs, the Kaggle joins and existing dbt models are unchanged; other leagues
+are namespaced by table_prefix (cfb_espn_games_core, data/raw/cfb/espn_games.json) and their
+marts are built with `dbt run --vars '{league_prefix: cfb_}'`.
+"""
+
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from src.utils.config import (
+    LEAGUES,
+    DEFAULT_LEAGUE,
+    RAW_DATA_PATH,
+    ESPN_FILES,
+    DATA_QUALITY_CHECKS
+)
+
+
+def parse_leagues(value):
+    """League keys from a comma-separated string (ValueError for unknown keys)."""
+    leagues = [league.strip() for league in value.split(",") if league.strip()]
+    unknown = sorted(set(leagues) - set(LEAGUES))
+    if unknown:
+        raise ValueError(f"Unknown league(s) {unknown}; configured: {sorted(LEAGUES)}")
+    return list(dict.fromkeys(leagues))
+
+
+def league_base_url(league=DEFAULT_LEAGUE, api_root=None):
+    """Site API base URL of a league, optionally under another root (e.g. a local stub)."""
+    if api_root:
+        return f"{api_root.rstrip('/')}/{LEAGUES[league]['path']}"
+    return LEAGUES[league]["base_url"]
+
+
+def league_table(table, league=DEFAULT_LEAGUE):
+    """Namespaced table name (unchanged for the default league)."""
+    return LEAGUES[league]["table_prefix"] + table
+
+
+def league_raw_path(raw_path=RAW_DATA_PATH, league=DEFAULT_LEAGUE):
+    """Raw directory of a league's pulls (and its archive); raw_path itself for the default league."""
+    return raw_path if league == DEFAULT_LEAGUE else raw_path / league
+
+
+def league_quality_checks(leagues):
+    """
+    DATA_QUALITY_CHECKS for the ESPN tables of each non-default league.
+
+    team_reference maps NFL franchises only, so reference coverage checks are dropped.
+    """
+    checks = {}
+    for league in leagues:
+        if league == DEFAULT_LEAGUE:
+            continue
+        for file_config in ESPN_FILES.values():
+            table = file_config["table_name"]
+            checks[league_table(table, league)] = [
+                check for check in DATA_QUALITY_CHECKS.get(table, [])
+                if check["check"] != "reference_coverage"
+            ]
+    return checks
+
+
+class ConnectionBudget:
+    """
+    Cap on concurrent HTTP requests shared by every league being fetched.
+
+    While several leagues are fetching, each is guaranteed an equal share of the budget.
+    A league may borrow beyond its share only while no other league is waiting, so a
+    league with many pages (college football, week by week) uses idle capacity without
+    starving a smaller one.
+
+    Usage:
+        budget = ConnectionBudget(8)
+        with budget.league("cfb"):          # per league, around its whole fetch
+            with budget.slot("cfb"):        # per request
+                session.get(...)
+    """
+
+    def __init__(self, connections):
+        self.connections = max(1, int(connections))
+        self.peak = 0
+        self.peak_by_league = Counter()
+        self._condition = threading.Condition()
+        self._active = Counter()
+        self._in_use = Counter()
+        self._waiting = Counter()
+
+    def share(self):
+        """Requests each active league is guaranteed."""
+        return max(1, self.connections // max(1, len(self._active)))
+
+    @contextmanager
+    def league(self, name):
+        """Register a league as fetching (fair shares are split among registered leagues)."""
+        with self._condition:
+            self._active[name] += 1
+        try:
+            yield self
+        finally:
+            with self._condition:
+                self._active[name] -= 1
+                if not self._active[name]:
+                    del self._active[name]
+                self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, name):
+        """Hold one connection for the duration of a request."""
+        with self._condition:
+            self._waiting[name] += 1
+            while not self._can_acquire(name):
+                self._condition.wait()
+            self._waiting[name] -= 1
+            self._in_use[name] += 1
+            self.peak = max(self.peak, sum(self._in_use.values()))
+            self.peak_by_league[name] = max(self.peak_by_league[name], self._in_use[name])
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._in_use[name] -= 1
+                self._condition.notify_all()
+
+    def _can_acquire(self, name):
+        """Free capacity, and either under the fair share or nobody else is waiting."""
+        if sum(self._in_use.values()) >= self.connections:
+            return False
+        if self._in_use[name] < self.share():
+            return True
+        return not any(count for other, count in self._waiting.items() if other != name)
@@ -0,0 +1,107 @@
+"""
+Season-partitioned storage: file layout and partition-pruned read connections
+
+Each season range lives in its own SQLite file (seasons_2000_2004.db, ...); tables without a
+season live in shared.db. open_partitioned() ATTACHes only the files covering the requested
+seasons and exposes every table as a TEMP view (UNION ALL over those files), so a query
+for 2019 never opens the 2020-2024 file. With all partitions attached, SQLite still pushes
+a year filter into each UNION ALL branch, where the per-partition year index makes the
+non-matching files a single index probe.
+"""
+
+import re
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+from src.utils.config import (
+    PARTITION_PATH,
+    PARTITION_SHARED_DB,
+    PARTITION_ORIGIN_YEAR,
+    PARTITION_SPAN_YEARS
+)
+
+PARTITION_FILE_PATTERN = re.compile(r"seasons_(\d{4})_(\d{4})\.db$")
+
+
+def partition_bounds(year, span=PARTITION_SPAN_YEARS, origin=PARTITION_ORIGIN_YEAR):
+    """First and last season of the partition holding `year`."""
+    first = origin + ((int(year) - origin) // span) * span
+    return first, first + span - 1
+
+
+def partition_file(first, last, partition_dir=PARTITION_PATH):
+    """Database file for a season range."""
+    return Path(partition_dir) / f"seasons_{first}_{last}.db"
+
+
+def list_partitions(partition_dir=PARTITION_PATH):
+    """All season partitions on disk as sorted (first, last, path) tuples."""
+    partitions = []
+    for path in Path(partition_dir).glob("seasons_*.db"):
+        match = PARTITION_FILE_PATTERN.search(path.name)
+        if match:
+            partitions.append((int(match.group(1)), int(match.group(2)), path))
+    return sorted(partitions)
+
+
+def partitions_for_years(years=None, partition_dir=PARTITION_PATH):
+    """Partitions overlapping any of `years` (all partitions when years is None)."""
+    partitions = list_partitions(partition_dir)
+    if years is None:
+        return partitions
+    years = {int(y) for y in years}
+    return [(first, last, path) for first, last, path in partitions
+            if any(first <= y <= last for y in years)]
+
+
+def open_partitioned(years=None, partition_dir=PARTITION_PATH):
+    """
+    Open a read-only connection over the partitions covering `years`.
+
+    Args:
+        years (iterable): Seasons the query needs (None = every partition)
+        partition_dir (Path): Partition directory
+
+    Returns:
+        sqlite3.Connection: shared.db as main, one TEMP view per partitioned table
+    """
+    partition_dir = Path(partition_dir)
+    shared = partition_dir / PARTITION_SHARED_DB
+    main_uri = f"{shared.resolve().as_uri()}?mode=ro" if shared.exists() else "file::memory:"
+    conn = sqlite3.connect(main_uri, uri=True)
+
+    selected = partitions_for_years(years, partition_dir)
+    limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    if len(selected) > limit:
+        conn.close()
+        raise ValueError(
+            f"{len(selected)} partitions requested but SQLite attaches at most {limit} - "
+            "pass the seasons you need or rebuild with a wider --span"
+        )
+
+    sources = {}
+    for first, last, path in selected:
+        schema = f"p{first}_{last}"
+        conn.execute(f"ATTACH DATABASE ? AS {schema}", (f"{path.resolve().as_uri()}?mode=ro",))
+        for (table,) in conn.execute(
+            f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table' AND name NOT LIKE '\\_%' ESCAPE '\\'"
+        ):
+            sources.setdefault(table, []).append(schema)
+
+    for table, schemas in sources.items():
+        columns = ", ".join(f'"{row[1]}"' for row in conn.execute(f"PRAGMA {schemas[0]}.table_info({table})"))
+        union = "\nUNION ALL\n".join(f"SELECT {columns} FROM {schema}.{table}" for schema in schemas)
+        conn.execute(f"CREATE TEMP VIEW {table} AS\n{union}")
+
+    return conn
+
+
+def read_partitioned(query, years=None, params=None, partition_dir=PARTITION_PATH):
+    """Run a query against only the partitions covering `years` and return a DataFrame."""
+    conn = open_partitioned(years, partition_dir)
+    try:
+        return pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
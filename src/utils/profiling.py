@@ -0,0 +1,189 @@
+"""
+Opt-in profiling for ETL entry points: CPU profile, allocation snapshot and hot-spot summary
+
+Every `python -m src.etl.*` module starts main() through run_main(). A run is profiled when
+its command line has --profile, or when GAMEDAY_PROFILE is 1/all or a comma-separated list
+naming the module (GAMEDAY_PROFILE=load_to_database,ingest_current_season) - the variable
+also reaches every step of run_pipeline.sh. Otherwise run_main() just calls main():
+cProfile and tracemalloc are never imported or started.
+
+A profiled run writes logs/profiles/<module>_<timestamp>.*:
+    .prof         cProfile stats (python -m pstats, snakeviz)
+    .tracemalloc  tracemalloc snapshot from the highest traced memory seen
+                  (tracemalloc.Snapshot.load)
+    .txt          wall time, memory peak, top functions by cumulative and own time
+                  (all code, then src/ only) and the top allocation sites
+"""
+
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from src.utils.logging_config import setup_logger
+from src.utils.config import (
+    PROFILE_FLAG,
+    PROFILE_MODULES,
+    PROFILE_LOG_PATH,
+    PROFILE_TOP_FUNCTIONS,
+    PROFILE_TOP_ALLOCATIONS,
+    PROFILE_TRACEMALLOC_FRAMES,
+    PROFILE_MEMORY_SAMPLE_SECONDS,
+    PROFILE_SNAPSHOT_GROWTH
+)
+
+logger = setup_logger(__name__)
+
+ENABLED_VALUES = {"1", "true", "yes", "on", "all"}
+DISABLED_VALUES = {"", "0", "false", "no", "off"}
+PROJECT_CODE = r"[/\\]src[/\\]"    # pstats restriction: functions defined under src/
+
+
+def module_label():
+    """Short name of the running module (load_to_database for python -m src.etl.load_to_database)."""
+    spec = getattr(sys.modules["__main__"], "__spec__", None)
+    name = spec.name if spec else Path(sys.argv[0]).stem
+    return name.rsplit(".", 1)[-1]
+
+
+def profiling_requested(label, argv=None, setting=PROFILE_MODULES):
+    """Whether --profile is on the command line or GAMEDAY_PROFILE selects this module."""
+    argv = sys.argv[1:] if argv is None else argv
+    if PROFILE_FLAG in argv:
+        return True
+    setting = setting.strip().lower()
+    if setting in DISABLED_VALUES:
+        return False
+    if setting in ENABLED_VALUES:
+        return True
+    return label.lower() in {name.strip() for name in setting.split(",")}
+
+
+def run_main(main):
+    """
+    Entry point: call main(), under the profiler when requested.
+
+    --profile is dropped from sys.argv first, so the module's own argparse never sees it.
+    """
+    label = module_label()
+    if not profiling_requested(label):
+        return main()
+    sys.argv = [sys.argv[0]] + [arg for arg in sys.argv[1:] if arg != PROFILE_FLAG]
+    return profile_call(main, label)
+
+
+def profile_call(func, label, output_dir=PROFILE_LOG_PATH):
+    """
+    Run func() under cProfile and tracemalloc and write the profile files.
+
+    The files are written even when func() raises (including SystemExit).
+
+    Returns:
+        Whatever func() returns
+    """
+    import cProfile
+    import time
+    import tracemalloc
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stem = output_dir / f"{label}_{datetime.now():%Y%m%d_%H%M%S}"
+    logger.info(f"Profiling {label} -> {stem}.*")
+
+    tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+    watcher = PeakSnapshotWatcher(PROFILE_MEMORY_SAMPLE_SECONDS, PROFILE_SNAPSHOT_GROWTH)
+    watcher.start()
+    profiler = cProfile.Profile()
+    status = "completed"
+    start = time.perf_counter()
+    try:
+        profiler.enable()
+        try:
+            return func()
+        finally:
+            profiler.disable()
+    except BaseException as exc:
+        status = f"raised {type(exc).__name__}: {exc}"
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        watcher.stop()
+        snapshot, snapshot_bytes = watcher.snapshot, watcher.snapshot_bytes
+        if snapshot is None:
+            snapshot, snapshot_bytes = tracemalloc.take_snapshot(), tracemalloc.get_traced_memory()[0]
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        write_profile(stem, label, profiler, snapshot, seconds, peak_bytes, snapshot_bytes, status)
+
+
+class PeakSnapshotWatcher(threading.Thread):
+    """
+    Background sampler that keeps a tracemalloc snapshot of the highest memory it has seen.
+
+    A new snapshot is taken only when traced memory has grown by `growth` over the last one,
+    so a steadily climbing load costs a handful of snapshots rather than one per sample.
+    """
+
+    def __init__(self, interval, growth):
+        super().__init__(name="profile-memory-watcher", daemon=True)
+        self.interval = interval
+        self.growth = growth
+        self.snapshot = None
+        self.snapshot_bytes = 0
+        self._stopped = threading.Event()
+
+    def run(self):
+        import tracemalloc
+
+        while not self._stopped.wait(self.interval):
+            current = tracemalloc.get_traced_memory()[0]
+            if current > self.snapshot_bytes * (1 + self.growth):
+                self.snapshot, self.snapshot_bytes = tracemalloc.take_snapshot(), current
+
+    def stop(self):
+        """Stop sampling and wait for an in-flight snapshot to finish."""
+        self._stopped.set()
+        self.join()
+
+
+def write_profile(stem, label, profiler, snapshot, seconds, peak_bytes, snapshot_bytes, status):
+    """Write the .prof, .tracemalloc and .txt files for one profiled run."""
+    import io
+    import pstats
+    import tracemalloc
+
+    profiler.dump_stats(f"{stem}.prof")
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")
+    ])
+    snapshot.dump(f"{stem}.tracemalloc")
+
+    lines = [
+        f"Profile: {label} ({status})",
+        f"Command: {' '.join(sys.argv)}",
+        f"Wall time: {seconds:,.2f}s",
+        f"Python memory peak (tracemalloc): {peak_bytes / 1e6:,.1f} MB",
+        f"Allocation snapshot at: {snapshot_bytes / 1e6:,.1f} MB traced",
+        ""
+    ]
+    sections = [
+        ("cumulative", "cumulative time", ()),
+        ("tottime", "own time", ()),
+        ("cumulative", "cumulative time, src/ only", (PROJECT_CODE,))
+    ]
+    for sort, title, restrictions in sections:
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.sort_stats(sort).print_stats(*restrictions, PROFILE_TOP_FUNCTIONS)
+        lines += [f"== Top {PROFILE_TOP_FUNCTIONS} functions by {title} ==", stream.getvalue().strip(), ""]
+
+    lines.append(f"== Top {PROFILE_TOP_ALLOCATIONS} allocation sites (live at snapshot) ==")
+    for stat in snapshot.statistics("lineno")[:PROFILE_TOP_ALLOCATIONS]:
+        frame = stat.traceback[0]
+        lines.append(f"{stat.size / 1e6:10,.2f} MB {stat.count:>10,} blocks  {frame.filename}:{frame.lineno}")
+
+    with open(f"{stem}.txt", "w") as f:
+        f.write("\n".join(lines) + "\n")
+    logger.info(f"Profile written: {stem}.txt ({seconds:,.2f}s, peak {peak_bytes / 1e6:,.1f} MB)")
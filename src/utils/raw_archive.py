@@ -0,0 +1,176 @@
+"""
+Compressed, append-only archive of raw ESPN pulls with a per-season/week offset index
+
+Layout (per dataset, e.g. data/raw/archive/espn_games/):
+    season_2023.seg     concatenated compressed blocks, one per (week, pull); never rewritten
+    index.jsonl         one line per block: season, week, pulled_at, segment, offset, length,
+                        records, codec, sha1
+
+A block is the JSON-lines text of one week's events from one pull, compressed on its own
+(gzip member or zstd frame), so any block can be read with one seek + read + decompress.
+Reading a season or week touches only the index and the bytes of the blocks it needs.
+Re-pulling a week appends a new block only when its content changed; readers take the
+latest block per (season, week), older pulls stay in the archive as history.
+
+Writes append the block and fsync it before its index line is written, so a crash leaves
+at most unreferenced bytes at the end of a segment, never an index entry to a torn block.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src.utils.config import RAW_ARCHIVE_PATH, RAW_ARCHIVE_CODEC, RAW_ARCHIVE_LEVEL
+
+try:
+    import zstandard
+except ImportError:  # optional: only needed for RAW_ARCHIVE_CODEC = "zstd"
+    zstandard = None
+
+INDEX_FILENAME = "index.jsonl"
+
+
+def event_season(event):
+    """Season year of an ESPN event."""
+    season = event.get("season", {}).get("year")
+    return int(season) if season else int(str(event.get("date", ""))[:4])
+
+
+def event_week(event):
+    """Week number of an ESPN event (0 when the payload has none)."""
+    return int(event.get("week", {}).get("number") or 0)
+
+
+def compress(data, codec=RAW_ARCHIVE_CODEC, level=RAW_ARCHIVE_LEVEL):
+    """Compress one block."""
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd archive codec requested but zstandard is not installed (pip install zstandard)")
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    raise ValueError(f"Unknown archive codec: {codec}")
+
+
+def decompress(data, codec):
+    """Decompress one block."""
+    if codec == "gzip":
+        return gzip.decompress(data)
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImportError("Archive block is zstd-compressed but zstandard is not installed (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unknown archive codec: {codec}")
+
+
+def dataset_dir(dataset, archive_dir=RAW_ARCHIVE_PATH):
+    """Directory holding one dataset's segments and index."""
+    return Path(archive_dir) / dataset
+
+
+def read_index(dataset, archive_dir=RAW_ARCHIVE_PATH):
+    """All index entries in append order ([] for a new archive)."""
+    index_path = dataset_dir(dataset, archive_dir) / INDEX_FILENAME
+    if not index_path.exists():
+        return []
+    with open(index_path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def latest_blocks(index, seasons=None, weeks=None):
+    """Newest block per (season, week), optionally restricted to some seasons/weeks."""
+    seasons = None if seasons is None else {int(s) for s in seasons}
+    weeks = None if weeks is None else {int(w) for w in weeks}
+    latest = {}
+    for entry in index:
+        if seasons is not None and entry["season"] not in seasons:
+            continue
+        if weeks is not None and entry["week"] not in weeks:
+            continue
+        latest[(entry["season"], entry["week"])] = entry  # later lines win
+    return [latest[key] for key in sorted(latest)]
+
+
+def append_events(events, dataset="espn_games", archive_dir=RAW_ARCHIVE_PATH, pulled_at=None,
+                  codec=RAW_ARCHIVE_CODEC):
+    """
+    Archive one pull: a compressed block per (season, week) whose content changed.
+
+    Args:
+        events (iterable): ESPN event dicts
+        dataset (str): Archive name
+        archive_dir (Path): Archive root
+        pulled_at (str): Pull timestamp (default: now, UTC)
+        codec (str): 'gzip' or 'zstd'
+
+    Returns:
+        list: Index entries written (unchanged weeks are skipped)
+    """
+    directory = dataset_dir(dataset, archive_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    pulled_at = pulled_at or datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    weeks = {}
+    for event in events:
+        weeks.setdefault((event_season(event), event_week(event)), []).append(event)
+
+    current = {(e["season"], e["week"]): e["sha1"] for e in latest_blocks(read_index(dataset, archive_dir))}
+    written = []
+    with open(directory / INDEX_FILENAME, "a") as index_file:
+        for (season, week), week_events in sorted(weeks.items()):
+            week_events.sort(key=lambda e: str(e.get("id", "")))
+            raw = "".join(json.dumps(e, separators=(",", ":")) + "\n" for e in week_events).encode()
+            sha1 = hashlib.sha1(raw).hexdigest()
+            if current.get((season, week)) == sha1:
+                continue
+
+            block = compress(raw, codec)
+            segment = f"season_{season}.seg"
+            with open(directory / segment, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(block)
+                f.flush()
+                os.fsync(f.fileno())
+
+            entry = {
+                "season": season, "week": week, "pulled_at": pulled_at, "segment": segment,
+                "offset": offset, "length": len(block), "records": len(week_events),
+                "raw_bytes": len(raw), "codec": codec, "sha1": sha1
+            }
+            index_file.write(json.dumps(entry) + "\n")
+            index_file.flush()
+            os.fsync(index_file.fileno())
+            written.append(entry)
+    return written
+
+
+def read_block(entry, dataset="espn_games", archive_dir=RAW_ARCHIVE_PATH):
+    """Decode the events of one indexed block (reads exactly its bytes)."""
+    with open(dataset_dir(dataset, archive_dir) / entry["segment"], "rb") as f:
+        f.seek(entry["offset"])
+        block = f.read(entry["length"])
+    if len(block) != entry["length"]:
+        raise ValueError(f"Truncated archive block: {entry['segment']} @ {entry['offset']}")
+    return [json.loads(line) for line in decompress(block, entry["codec"]).splitlines() if line]
+
+
+def iter_archive_events(seasons=None, weeks=None, dataset="espn_games", archive_dir=RAW_ARCHIVE_PATH):
+    """Yield the latest archived events for the given seasons/weeks (all when None)."""
+    for entry in latest_blocks(read_index(dataset, archive_dir), seasons, weeks):
+        yield from read_block(entry, dataset, archive_dir)
+
+
+def archive_summary(dataset="espn_games", archive_dir=RAW_ARCHIVE_PATH):
+    """Per-season block/record/byte totals for the latest blocks, plus total archived bytes."""
+    index = read_index(dataset, archive_dir)
+    seasons = {}
+    for entry in latest_blocks(index):
+        stats = seasons.setdefault(entry["season"], {"weeks": 0, "records": 0, "bytes": 0, "raw_bytes": 0})
+        stats["weeks"] += 1
+        stats["records"] += entry["records"]
+        stats["bytes"] += entry["length"]
+        stats["raw_bytes"] += entry["raw_bytes"]
+    return {"seasons": seasons, "blocks": len(index), "archived_bytes": sum(e["length"] for e in index)}
@@ -4,14 +4,16 @@ Interactive visualizations of NFL attendance patterns (2000-2019)
 Built on dbt mart tables from the GameDay Analytics pipeline.
 """
 
+import os
 import sqlite3
 from pathlib import Path
 
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 
+from figures import DASHBOARD_MARTS, DASHBOARD_RUN_TABLE, build_dashboard, bundle_path, read_bundle
+
 # --- Configuration ---
 
 st.set_page_config(
@@ -23,23 +25,65 @@ st.set_page_config(
 # Local development: reads from the full pipeline output
 # DB_PATH = Path(__file__).parent.parent / "data" / "processed" / "nfl_attendance.db"
 
-# Deployment (Streamlit Cloud): bundled copy since data/processed/ is gitignored
+# Deployment (Streamlit Cloud): bundled copy since data/processed/ is gitignored.
+# The pipeline refreshes it after every run (src.etl.publish_dashboard_db).
 DB_PATH = Path(__file__).parent / "nfl_attendance.db"
 
+# Optional DuckDB backend: GAMEDAY_DB_BACKEND=duckdb (GAMEDAY_DUCKDB_PATH to override the file)
+DB_BACKEND = os.environ.get("GAMEDAY_DB_BACKEND", "sqlite")
+DUCKDB_PATH = Path(os.environ.get(
+    "GAMEDAY_DUCKDB_PATH",
+    Path(__file__).parent.parent / "data" / "processed" / "nfl_attendance.duckdb",
+))
+
 @st.cache_data
 def load_table(table_name: str) -> pd.DataFrame:
-    """Load a mart table from the SQLite database."""
+    """Load a mart table from the SQLite (or DuckDB) database."""
+    if DB_BACKEND == "duckdb":
+        import duckdb
+
+        with duckdb.connect(str(DUCKDB_PATH), read_only=True) as conn:
+            return conn.execute(f"SELECT * FROM {table_name}").df()
+
     conn = sqlite3.connect(DB_PATH)
     df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
     conn.close()
     return df
 
 
+@st.cache_data
+def load_cached_dashboard(run_id: str):
+    """Pre-rendered figures + panels of one pipeline run (parsed once per run)."""
+    return read_bundle(run_id)
+
+
+@st.cache_data
+def build_live_dashboard(run_id: str) -> dict:
+    """Fallback when no figures were rendered from this database: build them from the marts."""
+    return build_dashboard(*(load_table(table) for table in DASHBOARD_MARTS))
+
+
+def load_run_id():
+    """Run id stamped into the database when it was published (None for an unpublished copy)."""
+    try:
+        runs = load_table(DASHBOARD_RUN_TABLE)
+    except Exception:  # table missing (sqlite3, pandas and duckdb each raise their own error)
+        return None
+    return runs["run_id"].iloc[0] if len(runs) else None
+
+
+def load_dashboard() -> dict:
+    """Figures rendered from the data this app reads (matched by the stamped run id)."""
+    run_id = load_run_id()
+    bundle = load_cached_dashboard(run_id) if run_id and bundle_path(run_id).exists() else None
+    return bundle or build_live_dashboard(run_id)
+
+
 # --- Data ---
 
-win_att = load_table("mart_win_attendance_correlation")
-playoff = load_table("mart_playoff_momentum")
-venue = load_table("mart_venue_attendance_patterns")
+dashboard = load_dashboard()
+figures = dashboard["figures"]
+panels = dashboard["panels"]
 
 
 # --- Header ---
@@ -61,56 +105,15 @@ st.header("Does winning drive attendance?")
 col1, col2 = st.columns([2, 1])
 
 with col1:
-    win_att_plot = win_att.copy()
-    win_att_plot["performance_tier"] = pd.cut(
-        win_att_plot["wins"],
-        bins=[0, 4, 7, 9, 12, 20],
-        labels=["Rebuild (0-4)", "Below Avg (5-7)", "Average (8-9)", "Contender (10-12)", "Elite (13+)"],
-    )
-
-    fig1 = px.violin(
-        win_att_plot,
-        x="performance_tier",
-        y="avg_weekly_attendance",
-        color="performance_tier",
-        box=True,
-        points="all",
-        labels={
-            "performance_tier": "Performance Tier",
-            "avg_weekly_attendance": "Avg Weekly Attendance",
-        },
-        color_discrete_sequence=["#d62728", "#ff7f0e", "#bcbd22", "#2ca02c", "#1f77b4"],
-        category_orders={
-            "performance_tier": [
-                "Rebuild (0-4)", "Below Avg (5-7)", "Average (8-9)",
-                "Contender (10-12)", "Elite (13+)",
-            ]
-        },
-    )
-
-    fig1.update_traces(opacity=0.7, pointpos=0, jitter=0.4, marker_size=3)
-    fig1.update_layout(
-        height=500,
-        yaxis_tickformat=",",
-        showlegend=False,
-        margin=dict(t=40),
-    )
-
-    st.plotly_chart(fig1, use_container_width=True)
+    st.plotly_chart(figures["win_attendance"], use_container_width=True)
 
 with col2:
     st.markdown("#### The Counterintuitive Finding")
 
-    tier_stats = (
-        win_att_plot.groupby("performance_tier", observed=True)["avg_weekly_attendance"]
-        .agg(["mean", "count"])
-        .round(0)
-    )
-
-    for tier, row in tier_stats.iterrows():
+    for tier in panels["tiers"]:
         st.metric(
-            label=f"{tier} ({int(row['count'])} seasons)",
-            value=f"{row['mean']:,.0f}",
+            label=f"{tier['tier']} ({tier['count']} seasons)",
+            value=f"{tier['mean']:,.0f}",
         )
 
     st.markdown(
@@ -120,14 +123,8 @@ with col2:
     )
 
     with st.expander("📊 Statistical Detail"):
-        from scipy import stats
-
-        tiers = win_att_plot.groupby("performance_tier", observed=True)["avg_weekly_attendance"]
-        groups = [group.values for _, group in tiers]
-        tier_names = [name for name, _ in tiers]
-
         # One-way ANOVA
-        f_stat, p_value = stats.f_oneway(*groups)
+        f_stat, p_value = panels["anova"]["f_stat"], panels["anova"]["p_value"]
         st.markdown(f"**One-way ANOVA:** F={f_stat:.2f}, p={p_value:.4f}")
 
         if p_value < 0.05:
@@ -136,15 +133,13 @@ with col2:
             st.markdown("No significant difference across tiers (p ≥ 0.05).")
 
         # Pairwise Tukey HSD
-        from scipy.stats import tukey_hsd
-        result = tukey_hsd(*groups)
-
         st.markdown("**Pairwise Tukey HSD** (p-values):")
+        tier_names = panels["tukey"]["tiers"]
         tukey_df = pd.DataFrame(
-            result.pvalue,
+            panels["tukey"]["pvalues"],
             index=tier_names,
             columns=tier_names,
-        ).round(4)
+        )
         st.dataframe(tukey_df, use_container_width=True)
 
         st.markdown(
@@ -164,67 +159,17 @@ st.header("Do playoff teams get an attendance boost?")
 col1, col2 = st.columns([2, 1])
 
 with col1:
-    # Filter to rows where we have prior season playoff data
-    playoff_valid = playoff.dropna(subset=["prior_season_made_playoffs", "attendance_pct_change"]).copy()
-    playoff_valid["prior_playoff_status"] = playoff_valid["prior_season_made_playoffs"].map(
-        {1: "Made Playoffs", 0: "Missed Playoffs"}
-    )
-
-    # Distribution of attendance changes by prior playoff status
-    fig2 = px.histogram(
-        playoff_valid,
-        x="attendance_pct_change",
-        color="prior_playoff_status",
-        nbins=40,
-        barmode="overlay",
-        labels={
-            "attendance_pct_change": "Year-over-Year Attendance Change (%)",
-            "prior_playoff_status": "Prior Season",
-            "count": "Number of Team-Seasons",
-        },
-        color_discrete_map={
-            "Made Playoffs": "#2ca02c",
-            "Missed Playoffs": "#aaaaaa",
-        },
-        opacity=0.7,
-    )
-
-    fig2.update_layout(
-        height=450,
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-        margin=dict(t=40),
-    )
-
-    # Add vertical lines for group means
-    for status, color, dash in [
-        ("Made Playoffs", "#2ca02c", "solid"),
-        ("Missed Playoffs", "#888888", "dash"),
-    ]:
-        mean_val = playoff_valid.loc[
-            playoff_valid["prior_playoff_status"] == status, "attendance_pct_change"
-        ].mean()
-        fig2.add_vline(
-            x=mean_val,
-            line_dash=dash,
-            line_color=color,
-            line_width=2,
-            annotation_text=f"{status}: {mean_val:+.1f}%",
-            annotation_position="top",
-        )
-
-    st.plotly_chart(fig2, use_container_width=True)
+    # Distribution of attendance changes by prior playoff status (with group means)
+    st.plotly_chart(figures["playoff_momentum"], use_container_width=True)
 
 with col2:
     st.markdown("#### Playoff Bump?")
 
-    for status in ["Made Playoffs", "Missed Playoffs"]:
-        subset = playoff_valid[playoff_valid["prior_playoff_status"] == status]
-        mean_change = subset["attendance_pct_change"].mean()
-        median_change = subset["attendance_pct_change"].median()
+    for group in panels["playoff"]:
         st.metric(
-            label=f"After {status} ({len(subset)} seasons)",
-            value=f"{mean_change:+.1f}% avg",
-            delta=f"{median_change:+.1f}% median",
+            label=f"After {group['status']} ({group['seasons']} seasons)",
+            value=f"{group['mean_change']:+.1f}% avg",
+            delta=f"{group['median_change']:+.1f}% median",
             delta_color="off",
         )
 
@@ -245,59 +190,16 @@ st.header("Does venue type affect attendance patterns?")
 col1, col2 = st.columns([2, 1])
 
 with col1:
-    venue_plot = venue.copy()
-    venue_plot["avg_attendance"] = venue_plot["avg_attendance"].round(0)
-
-    fig3 = px.scatter(
-        venue_plot,
-        x="avg_attendance",
-        y="attendance_variability_pct",
-        color="venue_type",
-        size="games_played",
-        hover_name="venue_name",
-        hover_data={
-            "venue_city": True,
-            "venue_state": True,
-            "games_played": True,
-            "avg_attendance": ":,.0f",
-            "attendance_variability_pct": ":.1f",
-            "venue_type": False,
-        },
-        labels={
-            "avg_attendance": "Avg Attendance",
-            "attendance_variability_pct": "Attendance Variability (%)",
-            "venue_type": "Venue Type",
-            "games_played": "Games Played",
-            "venue_city": "City",
-            "venue_state": "State",
-        },
-        color_discrete_map={
-            "Indoor": "#1f77b4",
-            "Outdoor": "#ff7f0e",
-        },
-        opacity=0.7,
-    )
-
-    fig3.update_layout(
-        height=450,
-        xaxis_tickformat=",",
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-        margin=dict(t=40),
-    )
-
-    st.plotly_chart(fig3, use_container_width=True)
+    st.plotly_chart(figures["venue_patterns"], use_container_width=True)
 
 with col2:
     st.markdown("#### Weather Factor?")
 
-    for vtype in ["Indoor", "Outdoor"]:
-        subset = venue_plot[venue_plot["venue_type"] == vtype]
-        avg_var = subset["attendance_variability_pct"].mean()
-        avg_att = subset["avg_attendance"].mean()
+    for group in panels["venues"]:
         st.metric(
-            label=f"{vtype} ({len(subset)} venues)",
-            value=f"{avg_var:.1f}% variability",
-            delta=f"{avg_att:,.0f} avg attendance",
+            label=f"{group['venue_type']} ({group['venues']} venues)",
+            value=f"{group['avg_variability']:.1f}% variability",
+            delta=f"{group['avg_attendance']:,.0f} avg attendance",
             delta_color="off",
         )
 
@@ -308,6 +210,94 @@ with col2:
     )
 
 
+st.divider()
+
+
+# --- Chart 4: Attendance outlook (Monte Carlo forecast) ---
+
+st.header("What does the next few seasons' attendance look like?")
+
+try:
+    forecast = load_table("forecast_attendance")
+except Exception:  # written by src.etl.forecast_attendance, copied here by src.etl.publish_dashboard_db
+    forecast = None
+
+if forecast is None or forecast.empty:
+    st.info(
+        "No forecast yet - run `python -m src.etl.forecast_attendance` after `dbt run`, "
+        "then `python -m src.etl.publish_dashboard_db`."
+    )
+else:
+    col1, col2 = st.columns([2, 1])
+
+    forecast["team"] = forecast["team_location"] + " " + forecast["team_name"]
+    team = col2.selectbox("Team", sorted(forecast["team"].unique()))
+    team_fc = forecast[forecast["team"] == team].sort_values("season_year")
+
+    with col1:
+        fig4 = go.Figure()
+        for low, high, opacity, label in [
+            ("attendance_p05", "attendance_p95", 0.15, "5th-95th percentile"),
+            ("attendance_p25", "attendance_p75", 0.3, "25th-75th percentile"),
+        ]:
+            fig4.add_trace(go.Scatter(
+                x=pd.concat([team_fc["season_year"], team_fc["season_year"][::-1]]),
+                y=pd.concat([team_fc[high], team_fc[low][::-1]]),
+                fill="toself",
+                fillcolor=f"rgba(31, 119, 180, {opacity})",
+                line=dict(width=0),
+                name=label,
+                hoverinfo="skip",
+            ))
+        fig4.add_trace(go.Scatter(
+            x=team_fc["season_year"],
+            y=team_fc["attendance_p50"],
+            mode="lines+markers",
+            line=dict(color="#1f77b4", width=2),
+            name="Median scenario",
+        ))
+        if team_fc["venue_capacity"].notna().any():
+            fig4.add_hline(
+                y=team_fc["venue_capacity"].iloc[0],
+                line_dash="dash",
+                line_color="#888888",
+                annotation_text="Venue capacity",
+                annotation_position="top left",
+            )
+
+        fig4.update_layout(
+            height=450,
+            xaxis=dict(title="Season", dtick=1),
+            yaxis=dict(title="Avg Home Attendance", tickformat=","),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+            margin=dict(t=40),
+        )
+
+        st.plotly_chart(fig4, use_container_width=True)
+
+    with col2:
+        next_season = team_fc.iloc[0]
+        st.metric(
+            label=f"{int(next_season['season_year'])} median forecast",
+            value=f"{next_season['attendance_p50']:,.0f}",
+            delta=f"{next_season['attendance_p05']:,.0f} – {next_season['attendance_p95']:,.0f} (90% band)",
+            delta_color="off",
+        )
+        if pd.notna(next_season["pct_capacity_p50"]):
+            st.metric(
+                label="Share of capacity (median)",
+                value=f"{next_season['pct_capacity_p50']:.1f}%",
+                delta=f"{next_season['prob_sellout']:.0%} chance of selling out",
+                delta_color="off",
+            )
+
+        st.markdown(
+            f"> **Method:** {int(next_season['simulations']):,} simulated seasons per team. "
+            "Win-driven demand swings are fit from 20 seasons of team history; "
+            "venue capacity caps every simulated home game."
+        )
+
+
 # --- Footer ---
 
 st.divider()
@@ -0,0 +1,239 @@
+"""
+Dashboard figures and summary panels, built from the dbt marts.
+
+The pipeline publishes the refreshed database for the app (python -m src.etl.publish_dashboard_db),
+which stamps it with a run id hashed from the marts (DASHBOARD_RUN_TABLE), then renders these
+once per run (python -m src.etl.render_dashboard_figures) into a figure cache keyed by that id:
+
+    figure_cache/<run_id>/dashboard.json  serialized figure specs + panel numbers for that run
+
+The app reads the run id stored in the database it reads and uses the bundle for that id, so
+it never shows charts built from other data; with no stamp or no matching bundle it falls
+back to build_dashboard(). Bump FIGURE_SPEC_VERSION whenever the figures or panels below
+change shape, so older caches are ignored.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+import plotly.express as px
+from plotly.io.json import to_json_plotly
+
+FIGURE_SPEC_VERSION = 1
+FIGURE_CACHE_DIR = Path(os.environ.get("GAMEDAY_FIGURE_CACHE", Path(__file__).parent / "figure_cache"))
+BUNDLE_FILENAME = "dashboard.json"
+DASHBOARD_RUN_TABLE = "dashboard_run"   # one row: run_id, source, published_at
+
+# Marts each render reads
+DASHBOARD_MARTS = [
+    "mart_win_attendance_correlation",
+    "mart_playoff_momentum",
+    "mart_venue_attendance_patterns",
+]
+
+PERFORMANCE_TIERS = ["Rebuild (0-4)", "Below Avg (5-7)", "Average (8-9)", "Contender (10-12)", "Elite (13+)"]
+PLAYOFF_STATUSES = ["Made Playoffs", "Missed Playoffs"]
+VENUE_TYPES = ["Indoor", "Outdoor"]
+
+
+def build_dashboard(win_att: pd.DataFrame, playoff: pd.DataFrame, venue: pd.DataFrame) -> dict:
+    """Build the dashboard figures and panel numbers from the three marts (JSON-ready dict)."""
+    win_att_plot = win_att.copy()
+    win_att_plot["performance_tier"] = pd.cut(
+        win_att_plot["wins"],
+        bins=[0, 4, 7, 9, 12, 20],
+        labels=PERFORMANCE_TIERS,
+    )
+
+    playoff_valid = playoff.dropna(subset=["prior_season_made_playoffs", "attendance_pct_change"]).copy()
+    playoff_valid["prior_playoff_status"] = playoff_valid["prior_season_made_playoffs"].map(
+        {1: "Made Playoffs", 0: "Missed Playoffs"}
+    )
+
+    venue_plot = venue.copy()
+    venue_plot["avg_attendance"] = venue_plot["avg_attendance"].round(0)
+
+    bundle = {
+        "version": FIGURE_SPEC_VERSION,
+        "figures": {
+            "win_attendance": win_attendance_figure(win_att_plot),
+            "playoff_momentum": playoff_momentum_figure(playoff_valid),
+            "venue_patterns": venue_patterns_figure(venue_plot),
+        },
+        "panels": {
+            **tier_panels(win_att_plot),
+            "playoff": [
+                {
+                    "status": status,
+                    "seasons": int(len(subset)),
+                    "mean_change": subset["attendance_pct_change"].mean(),
+                    "median_change": subset["attendance_pct_change"].median(),
+                }
+                for status in PLAYOFF_STATUSES
+                for subset in [playoff_valid[playoff_valid["prior_playoff_status"] == status]]
+            ],
+            "venues": [
+                {
+                    "venue_type": vtype,
+                    "venues": int(len(subset)),
+                    "avg_variability": subset["attendance_variability_pct"].mean(),
+                    "avg_attendance": subset["avg_attendance"].mean(),
+                }
+                for vtype in VENUE_TYPES
+                for subset in [venue_plot[venue_plot["venue_type"] == vtype]]
+            ],
+        },
+    }
+    # Round-trip through Plotly's encoder so live and cached bundles are the same plain dicts
+    return json.loads(to_json_plotly(bundle))
+
+
+def win_attendance_figure(win_att_plot: pd.DataFrame):
+    """Violin (all points) of weekly attendance by performance tier."""
+    fig = px.violin(
+        win_att_plot,
+        x="performance_tier",
+        y="avg_weekly_attendance",
+        color="performance_tier",
+        box=True,
+        points="all",
+        labels={
+            "performance_tier": "Performance Tier",
+            "avg_weekly_attendance": "Avg Weekly Attendance",
+        },
+        color_discrete_sequence=["#d62728", "#ff7f0e", "#bcbd22", "#2ca02c", "#1f77b4"],
+        category_orders={"performance_tier": PERFORMANCE_TIERS},
+    )
+
+    fig.update_traces(opacity=0.7, pointpos=0, jitter=0.4, marker_size=3)
+    fig.update_layout(
+        height=500,
+        yaxis_tickformat=",",
+        showlegend=False,
+        margin=dict(t=40),
+    )
+    return fig
+
+
+def playoff_momentum_figure(playoff_valid: pd.DataFrame):
+    """Overlaid histograms of attendance change by prior playoff status, with group means."""
+    fig = px.histogram(
+        playoff_valid,
+        x="attendance_pct_change",
+        color="prior_playoff_status",
+        nbins=40,
+        barmode="overlay",
+        labels={
+            "attendance_pct_change": "Year-over-Year Attendance Change (%)",
+            "prior_playoff_status": "Prior Season",
+            "count": "Number of Team-Seasons",
+        },
+        color_discrete_map={
+            "Made Playoffs": "#2ca02c",
+            "Missed Playoffs": "#aaaaaa",
+        },
+        opacity=0.7,
+    )
+
+    fig.update_layout(
+        height=450,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        margin=dict(t=40),
+    )
+
+    # Add vertical lines for group means
+    for status, color, dash in [
+        ("Made Playoffs", "#2ca02c", "solid"),
+        ("Missed Playoffs", "#888888", "dash"),
+    ]:
+        mean_val = playoff_valid.loc[
+            playoff_valid["prior_playoff_status"] == status, "attendance_pct_change"
+        ].mean()
+        fig.add_vline(
+            x=mean_val,
+            line_dash=dash,
+            line_color=color,
+            line_width=2,
+            annotation_text=f"{status}: {mean_val:+.1f}%",
+            annotation_position="top",
+        )
+    return fig
+
+
+def venue_patterns_figure(venue_plot: pd.DataFrame):
+    """Scatter of venue attendance vs variability, sized by games played."""
+    fig = px.scatter(
+        venue_plot,
+        x="avg_attendance",
+        y="attendance_variability_pct",
+        color="venue_type",
+        size="games_played",
+        hover_name="venue_name",
+        hover_data={
+            "venue_city": True,
+            "venue_state": True,
+            "games_played": True,
+            "avg_attendance": ":,.0f",
+            "attendance_variability_pct": ":.1f",
+            "venue_type": False,
+        },
+        labels={
+            "avg_attendance": "Avg Attendance",
+            "attendance_variability_pct": "Attendance Variability (%)",
+            "venue_type": "Venue Type",
+            "games_played": "Games Played",
+            "venue_city": "City",
+            "venue_state": "State",
+        },
+        color_discrete_map={
+            "Indoor": "#1f77b4",
+            "Outdoor": "#ff7f0e",
+        },
+        opacity=0.7,
+    )
+
+    fig.update_layout(
+        height=450,
+        xaxis_tickformat=",",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        margin=dict(t=40),
+    )
+    return fig
+
+
+def tier_panels(win_att_plot: pd.DataFrame) -> dict:
+    """Per-tier means/counts, one-way ANOVA and pairwise Tukey HSD p-values."""
+    from scipy import stats
+
+    tiers = win_att_plot.groupby("performance_tier", observed=True)["avg_weekly_attendance"]
+    tier_stats = tiers.agg(["mean", "count"]).round(0)
+    groups = [group.values for _, group in tiers]
+    tier_names = [name for name, _ in tiers]
+
+    f_stat, p_value = stats.f_oneway(*groups)
+    result = stats.tukey_hsd(*groups)
+    return {
+        "tiers": [
+            {"tier": tier, "mean": row["mean"], "count": int(row["count"])}
+            for tier, row in tier_stats.iterrows()
+        ],
+        "anova": {"f_stat": f_stat, "p_value": p_value},
+        "tukey": {"tiers": tier_names, "pvalues": result.pvalue.round(4)},
+    }
+
+
+def bundle_path(run_id: str, cache_dir: Path = FIGURE_CACHE_DIR) -> Path:
+    """Where the bundle of one run is cached."""
+    return Path(cache_dir) / run_id / BUNDLE_FILENAME
+
+
+def read_bundle(run_id: str, cache_dir: Path = FIGURE_CACHE_DIR):
+    """The cached bundle of one run, or None (missing, unreadable or an older format)."""
+    try:
+        with open(bundle_path(run_id, cache_dir), "r") as f:
+            bundle = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return bundle if bundle.get("version") == FIGURE_SPEC_VERSION else None